@@ -12,3 +12,4 @@ class BookAdmin(admin.ModelAdmin):
         "daily_fee",
         "cover_image",
     )
+    readonly_fields = ("cover_variants",)
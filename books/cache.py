@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import time
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+
+logger = logging.getLogger(__name__)
+
+CATALOG_GENERATION_KEY = "books:catalog:generation"
+BOOK_GENERATION_KEY = "books:book:{pk}:generation"
+STATS_KEY = "books:cache:stats:{name}"
+STATS = ("hits", "misses", "not_modified")
+
+
+def _new_generation():
+    # Seeded from the clock, so an evicted counter never restarts at a value
+    # that older cache entries were stored under.
+    return time.time_ns()
+
+
+def get_generation(key):
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_generation(), timeout=None)
+
+
+def invalidate_book(pk):
+    """Expire every cached catalog page and the cached detail of one book."""
+    try:
+        bump_generation(CATALOG_GENERATION_KEY)
+        bump_generation(BOOK_GENERATION_KEY.format(pk=pk))
+    except Exception:
+        logger.exception("Failed to invalidate the book catalog cache")
+
+
+def invalidate_catalog():
+    """Expire every cached catalog page, leaving book details cached."""
+    try:
+        bump_generation(CATALOG_GENERATION_KEY)
+    except Exception:
+        logger.exception("Failed to invalidate the book catalog cache")
+
+
+def invalidate_book_on_commit(pk):
+    """`invalidate_book` now, and again once the current transaction commits."""
+    invalidate_book(pk)
+    # Bump again once the change is visible, so a response rendered from
+    # pre-commit data in the meantime is never served.
+    transaction.on_commit(lambda: invalidate_book(pk))
+
+
+def record(name):
+    key = STATS_KEY.format(name=name)
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 0, timeout=None)
+            cache.incr(key)
+    except Exception:
+        logger.exception("Failed to record book catalog cache stats")
+
+
+def get_stats():
+    counts = cache.get_many([STATS_KEY.format(name=name) for name in STATS])
+    stats = {name: counts.get(STATS_KEY.format(name=name), 0) for name in STATS}
+    total = sum(stats.values())
+    served = stats["hits"] + stats["not_modified"]
+    stats["hit_rate"] = round(served / total, 4) if total else 0.0
+    return stats
+
+
+def normalize_params(query_params):
+    """Order-independent query string without empty values or `page=1`."""
+    items = []
+    for key in sorted(query_params):
+        values = sorted(value for value in query_params.getlist(key) if value)
+        if key == "page" and values == ["1"]:
+            continue
+        if values:
+            items.append((key, values))
+    return urlencode(items, doseq=True)
+
+
+class CatalogCacheMixin:
+    """
+    Caches rendered JSON `list` and `retrieve` responses, sync or async.
+
+    Keys carry a generation counter that `books.signals` bumps whenever a
+    book is saved or deleted: any change expires every list page, while a
+    detail entry only expires when its own book changes. The key doubles as
+    a weak ETag, so conditional requests are answered without touching the
+    database or the cached body. Cache outages fall back to uncached views.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(request, super().alist, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(request, super().aretrieve, *args, **kwargs)
+
+    def get_cache_key(self, request):
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if lookup is None:
+            generation = get_generation(CATALOG_GENERATION_KEY)
+        else:
+            generation = get_generation(BOOK_GENERATION_KEY.format(pk=lookup))
+        params = hashlib.md5(
+            normalize_params(request.query_params).encode()
+        ).hexdigest()
+        return (
+            f"books:response:{self.action}:{lookup or ''}:{generation}:"
+            f"{request.accepted_renderer.format}:{request.get_host()}:{params}"
+        )
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if request.accepted_renderer.format != "json":
+            return handler(request, *args, **kwargs)
+
+        try:
+            key, etag, response = self.get_cached_response(request)
+        except Exception:
+            logger.exception("Book catalog cache is unavailable")
+            return handler(request, *args, **kwargs)
+        if response is not None:
+            return response
+        return self.store_on_render(key, etag, handler(request, *args, **kwargs))
+
+    async def acached_response(self, request, handler, *args, **kwargs):
+        """`cached_response` for an async handler, with cache lookups in a thread."""
+        if request.accepted_renderer.format != "json":
+            return await handler(request, *args, **kwargs)
+
+        try:
+            key, etag, response = await sync_to_async(self.get_cached_response)(request)
+        except Exception:
+            logger.exception("Book catalog cache is unavailable")
+            return await handler(request, *args, **kwargs)
+        if response is not None:
+            return response
+        response = await handler(request, *args, **kwargs)
+        return self.store_on_render(key, etag, response)
+
+    def store_on_render(self, key, etag, response):
+        if response.status_code == 200:
+            response["ETag"] = etag
+            response.add_post_render_callback(
+                lambda rendered: self.store(key, rendered)
+            )
+        return response
+
+    def get_cached_response(self, request):
+        """The key, its ETag and, when the view need not run, the response."""
+        key = self.get_cache_key(request)
+        etag = f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+
+        if etag in request.headers.get("If-None-Match", ""):
+            record("not_modified")
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return key, etag, response
+
+        cached = cache.get(key)
+        if cached is None:
+            record("misses")
+            return key, etag, None
+
+        record("hits")
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        return key, etag, response
+
+    def store(self, key, response):
+        try:
+            cache.set(
+                key,
+                (response.content, response["Content-Type"]),
+                timeout=settings.BOOK_CACHE_TIMEOUT,
+            )
+        except Exception:
+            logger.exception("Failed to cache a book catalog response")
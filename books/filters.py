@@ -1,14 +1,17 @@
 import django_filters
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+from rest_framework.filters import OrderingFilter
+
 from books.models import Book
+from books.popularity import POPULARITY_ORDERINGS
 
 
 class BookFilter(django_filters.FilterSet):
-    title = django_filters.CharFilter(
-        field_name="title", lookup_expr="icontains"
-    )
-    author = django_filters.CharFilter(
-        field_name="author", lookup_expr="icontains"
-    )
+    search = django_filters.CharFilter(method="filter_search")
+    title = django_filters.CharFilter(field_name="title", lookup_expr="icontains")
+    author = django_filters.CharFilter(field_name="author", lookup_expr="icontains")
     cover = django_filters.ChoiceFilter(
         field_name="cover", choices=Book.CoverChoices.choices
     )
@@ -27,6 +30,62 @@ class BookFilter(django_filters.FilterSet):
         field_name="inventory", lookup_expr="lte"
     )
 
+    # Live inventory, like the book detail, rather than the `BookPopularity`
+    # snapshot of it.
+    available = django_filters.BooleanFilter(method="filter_available")
+    available_min = django_filters.NumberFilter(
+        field_name="inventory", lookup_expr="gte"
+    )
+    # Served by the `BookPopularity` view, as of its last refresh.
+    borrows_30d_min = django_filters.NumberFilter(
+        field_name="popularity__borrows_30d", lookup_expr="gte"
+    )
+
     class Meta:
         model = Book
         fields = ["title", "author", "cover"]
+
+    def filter_search(self, queryset, name, value):
+        """Full-text match on title and author, annotated with `rank`."""
+        query = SearchQuery(value, search_type="websearch", config="english")
+        # Cast from `real`, whose text form does not round-trip through a
+        # pagination cursor.
+        return queryset.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+        )
+
+    def filter_available(self, queryset, name, value):
+        if value:
+            return queryset.filter(inventory__gt=0)
+        return queryset.filter(inventory=0)
+
+
+class BookOrderingFilter(OrderingFilter):
+    """
+    Orders `search` results by relevance unless `ordering` is given.
+
+    Popularity orderings read the `BookPopularity` view through an inner
+    join, so its indexes serve the sort; books added since the last refresh
+    are left out of those listings until the next one.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view) or ()
+        names = [
+            name
+            for name in POPULARITY_ORDERINGS
+            if name in (term.lstrip("-") for term in ordering)
+        ]
+        if names:
+            queryset = queryset.filter(popularity__isnull=False).annotate(
+                **{name: F(f"popularity__{name}") for name in names}
+            )
+        return super().filter_queryset(request, queryset, view)
+
+    def get_ordering(self, request, queryset, view):
+        # A blank `search` is dropped by the filter set, leaving no `rank`.
+        if not request.query_params.get(self.ordering_param) and (
+            "rank" in queryset.query.annotations
+        ):
+            return ["-rank", "id"]
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,93 @@
+import hashlib
+import io
+import os
+
+from django.db.models import Q
+from PIL import Image, ImageOps
+
+from books.cache import invalidate_book
+from books.models import Book
+
+# Widths in pixels; covers are never scaled up.
+COVER_VARIANT_WIDTHS = {"small": 160, "medium": 320, "large": 640}
+COVER_VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+COVER_VARIANT_DIR = "covers/variants"
+
+
+def variant_name(source, width, extension, content):
+    """A name that changes whenever the content does, so it can be cached forever."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    return f"{COVER_VARIANT_DIR}/{stem}-{width}w.{digest}.{extension}"
+
+
+def render_variants(file):
+    """Yield (size, extension, width, content) for each thumbnail of `file`."""
+    with Image.open(file) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode != "RGB":
+            background = Image.new("RGB", image.size, "white")
+            rgba = image.convert("RGBA")
+            background.paste(rgba, mask=rgba.getchannel("A"))
+            image = background
+
+    for size, width in COVER_VARIANT_WIDTHS.items():
+        width = min(width, image.width)
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for extension, (format, options) in COVER_VARIANT_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, format, **options)
+            yield size, extension, width, buffer.getvalue()
+
+
+def variant_files(variants):
+    return {
+        name
+        for formats in variants.get("images", {}).values()
+        for name in formats.values()
+    }
+
+
+def generate_cover_variants(book_id):
+    """
+    Write the thumbnails of a book's current cover and record them on the book.
+
+    Nothing is recorded when the cover changes meanwhile; the save that
+    changed it queues its own run. Files of earlier covers are removed.
+    Returns the new `cover_variants`, or None when the book has moved on.
+    """
+    book = Book.objects.filter(pk=book_id).only("cover_image", "cover_variants").first()
+    if book is None:
+        return None
+    source = book.cover_image.name or ""
+    storage = book.cover_image.storage
+    variants = {"source": source, "images": {}} if source else {}
+
+    written = set()
+    if source:
+        with book.cover_image.open("rb") as file:
+            for size, extension, width, content in render_variants(file):
+                name = variant_name(source, width, extension, content)
+                if not storage.exists(name):
+                    name = storage.save(name, io.BytesIO(content))
+                    written.add(name)
+                variants["images"].setdefault(size, {})[extension] = name
+
+    unchanged = Q(cover_image=source) if source else Q(cover_image__isnull=True)
+    if not source:
+        unchanged |= Q(cover_image="")
+    updated = Book.objects.filter(unchanged, pk=book_id).update(
+        cover_variants=variants
+    )
+    if not updated:
+        stale, variants = written, None
+    else:
+        stale = variant_files(book.cover_variants) - variant_files(variants)
+        invalidate_book(book_id)
+    for name in stale:
+        storage.delete(name)
+    return variants
@@ -0,0 +1,49 @@
+from django.db.models import F
+
+from books.cache import invalidate_book_on_commit
+from books.models import Book
+from borrowings.models import Borrowing
+
+
+def take_copy(book_id):
+    """
+    Take one copy of a book off the shelf.
+
+    A single conditional UPDATE, so concurrent checkouts can never drive the
+    inventory below zero. Returns False when no copy was available.
+    """
+    taken = Book.objects.filter(pk=book_id, inventory__gt=0).update(
+        inventory=F("inventory") - 1
+    )
+    if taken:
+        invalidate_book_on_commit(book_id)
+    return bool(taken)
+
+
+def return_copy(book_id):
+    """Put one copy of a book back on the shelf."""
+    returned = Book.objects.filter(pk=book_id).update(inventory=F("inventory") + 1)
+    if returned:
+        invalidate_book_on_commit(book_id)
+    return bool(returned)
+
+
+def reserve_copy(borrowing_id, book_id):
+    """Take a copy for a loan that holds none. Returns False when out of stock."""
+    if not take_copy(book_id):
+        return False
+    Borrowing.objects.filter(pk=borrowing_id).update(has_copy=True)
+    return True
+
+
+def release_copy(borrowing_id, book_id):
+    """
+    Put back the copy a loan holds.
+
+    Clearing `has_copy` first makes returns and failed payments racing on
+    the same loan restock at most once. Returns False if the loan held none.
+    """
+    released = Borrowing.objects.filter(pk=borrowing_id, has_copy=True).update(
+        has_copy=False
+    )
+    return bool(released) and return_copy(book_id)
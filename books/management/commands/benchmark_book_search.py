@@ -0,0 +1,160 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from books.filters import BookFilter
+from books.models import Book
+
+WORDS = [
+    "adventure",
+    "ancient",
+    "autumn",
+    "bridge",
+    "castle",
+    "citadel",
+    "crimson",
+    "dragon",
+    "empire",
+    "forest",
+    "frontier",
+    "garden",
+    "harbor",
+    "history",
+    "island",
+    "journey",
+    "kingdom",
+    "library",
+    "lighthouse",
+    "memory",
+    "midnight",
+    "mountain",
+    "ocean",
+    "orchard",
+    "python",
+    "river",
+    "secret",
+    "shadow",
+    "silver",
+    "storm",
+    "summer",
+    "theory",
+    "thunder",
+    "valley",
+    "voyage",
+    "wanderer",
+    "whisper",
+    "winter",
+    "wizard",
+    "zephyr",
+]
+NAMES = [
+    "Adams",
+    "Baker",
+    "Carter",
+    "Dickens",
+    "Evans",
+    "Fischer",
+    "Garcia",
+    "Hughes",
+    "Ivanova",
+    "Jensen",
+    "Kowalski",
+    "Lopez",
+    "Morrison",
+    "Novak",
+    "Olsen",
+    "Petrenko",
+    "Quinn",
+    "Rossi",
+    "Schmidt",
+    "Tanaka",
+]
+QUERIES = ["dragon", "winter voyage", "lighthouse", "tanaka", "secret garden"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares catalogue search latency on a large book table: unindexed "
+        "`title` icontains, trigram-indexed icontains and ranked full-text "
+        "`search`. All seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--books", type=int, default=1_000_000)
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=20,
+            help="Timed runs per query and mode.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed_books(options["books"])
+            self.stdout.write(f"{'mode':>18} {'query':>15} {'p50 ms':>9} {'p99 ms':>9}")
+            for query in QUERIES:
+                for mode in ("icontains seqscan", "icontains trigram", "search"):
+                    p50, p99 = self.measure(mode, query, options["requests"])
+                    self.stdout.write(f"{mode:>18} {query:>15} {p50:>9.2f} {p99:>9.2f}")
+            transaction.set_rollback(True)
+
+    def seed_books(self, count):
+        words = "ARRAY[%s]" % ", ".join(f"'{word}'" for word in WORDS)
+        names = "ARRAY[%s]" % ", ".join(f"'{name}'" for name in NAMES)
+        # Titles and authors are derived from the row number, so every run
+        # searches the same data without shipping a million rows from Python.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Book._meta.db_table}
+                    (title, author, cover, inventory, daily_fee)
+                SELECT
+                    initcap(
+                        ({words})[1 + (i * 7) %% {len(WORDS)}] || ' ' ||
+                        ({words})[1 + (i * 13) %% {len(WORDS)}] || ' ' ||
+                        ({words})[1 + (i / {len(WORDS)}) %% {len(WORDS)}]
+                    ) || ' ' || i,
+                    initcap(({words})[1 + (i * 3) %% {len(WORDS)}]) || ' ' ||
+                        ({names})[1 + (i * 11) %% {len(NAMES)}],
+                    CASE WHEN i %% 2 = 0 THEN 'HARD' ELSE 'SOFT' END,
+                    i %% 10,
+                    1 + i %% 5
+                FROM generate_series(1, %s) AS i
+                """,
+                [count],
+            )
+            cursor.execute(f"ANALYZE {Book._meta.db_table}")
+
+    def get_queryset(self, mode, query):
+        if mode == "search":
+            return BookFilter(data={"search": query}).qs.order_by("-rank", "id")
+        return BookFilter(data={"title": query}).qs.order_by("title")
+
+    def measure(self, mode, query, requests):
+        # The seeded rows belong to the open transaction, so the index scans
+        # are disabled with SET/RESET rather than inside a savepoint, which
+        # would make every tuple visibility check slower.
+        scans = "off" if mode == "icontains seqscan" else "on"
+        with connection.cursor() as cursor:
+            cursor.execute(f"SET enable_indexscan = {scans}")
+            cursor.execute(f"SET enable_bitmapscan = {scans}")
+
+        timings = []
+        try:
+            for _ in range(requests):
+                queryset = self.get_queryset(mode, query)
+                start = time.perf_counter()
+                list(queryset[:10])
+                queryset.count()
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET enable_indexscan")
+                cursor.execute("RESET enable_bitmapscan")
+
+        return (
+            statistics.median(timings),
+            statistics.quantiles(timings, n=100)[-1],
+        )
@@ -0,0 +1,74 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from books.models import Book
+from books.popularity import refresh_popularity
+from borrowings.management.commands.explain_hot_queries import (
+    Command as ExplainHotQueries,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares a 'most borrowed this month' page aggregated over the "
+        "borrowings table with the same page read from the popularity view, "
+        "and times a view refresh. A large dataset is seeded and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--borrowings", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=50_000)
+        parser.add_argument("--books", type=int, default=200_000)
+        parser.add_argument("--requests", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ExplainHotQueries().seed(
+                options["users"], options["books"], options["borrowings"]
+            )
+            refreshed = refresh_popularity()
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE books_bookpopularity")
+
+            since = timezone.now().date() - timedelta(days=30)
+            aggregated = Book.objects.annotate(
+                borrows_30d=Count(
+                    "borrowings",
+                    filter=Q(
+                        borrowings__is_paid=True,
+                        borrowings__borrow_date__gt=since,
+                    ),
+                )
+            ).order_by("-borrows_30d", "-id")
+            materialized = (
+                Book.objects.filter(popularity__isnull=False)
+                .alias(borrows_30d=F("popularity__borrows_30d"))
+                .order_by("-borrows_30d", "-id")
+            )
+
+            self.stdout.write(f"view refresh: {refreshed * 1000:.2f} ms")
+            self.stdout.write(f"{'query':>14} {'p50 ms':>9} {'p95 ms':>9}")
+            for name, queryset in (
+                ("aggregate", aggregated),
+                ("materialized", materialized),
+            ):
+                p50, p95 = self.measure(queryset[:20], options["requests"])
+                self.stdout.write(f"{name:>14} {p50:>9.2f} {p95:>9.2f}")
+            transaction.set_rollback(True)
+
+    def measure(self, queryset, requests):
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        return (
+            statistics.median(timings),
+            statistics.quantiles(timings, n=20)[-1],
+        )
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+from django.db.models.fields.json import KT
+
+from books import images
+from books.models import Book
+from books.tasks import generate_cover_variants
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the cover thumbnails of every book whose cover has none yet, "
+        "or has changed since they were built."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true", help="Rebuild up-to-date covers too."
+        )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Build here instead of queueing a Celery task per book.",
+        )
+
+    def handle(self, *args, **options):
+        books = Book.objects.exclude(cover_image="").exclude(cover_image__isnull=True)
+        if not options["all"]:
+            books = books.alias(source=KT("cover_variants__source")).filter(
+                Q(source__isnull=True) | ~Q(source=F("cover_image"))
+            )
+
+        queued = failed = 0
+        for book_id in books.values_list("id", flat=True).iterator():
+            if not options["sync"]:
+                generate_cover_variants.delay(book_id)
+            else:
+                try:
+                    images.generate_cover_variants(book_id)
+                except OSError as error:
+                    failed += 1
+                    self.stderr.write(f"book {book_id}: {error}")
+                    continue
+            queued += 1
+
+        verb = "Built" if options["sync"] else "Queued"
+        self.stdout.write(f"{verb} cover variants for {queued} books.")
+        if failed:
+            self.stdout.write(f"{failed} covers could not be read.")
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+CREATE_VIEW = """
+CREATE MATERIALIZED VIEW books_bookpopularity AS
+SELECT
+    book.id AS book_id,
+    COALESCE(loans.borrows_7d, 0) AS borrows_7d,
+    COALESCE(loans.borrows_30d, 0) AS borrows_30d,
+    COALESCE(loans.borrows_total, 0) AS borrows_total,
+    COALESCE(loans.reserved, 0) AS reserved,
+    GREATEST(book.inventory - COALESCE(loans.reserved, 0), 0) AS available,
+    now() AS refreshed_at
+FROM books_book AS book
+LEFT JOIN (
+    SELECT
+        book_id,
+        (COUNT(*) FILTER (
+            WHERE is_paid AND borrow_date > CURRENT_DATE - 7
+        ))::integer AS borrows_7d,
+        (COUNT(*) FILTER (
+            WHERE is_paid AND borrow_date > CURRENT_DATE - 30
+        ))::integer AS borrows_30d,
+        (COUNT(*) FILTER (WHERE is_paid))::integer AS borrows_total,
+        (COUNT(*) FILTER (
+            WHERE NOT is_paid AND actual_return_date IS NULL
+        ))::integer AS reserved
+    FROM borrowings_borrowing
+    GROUP BY book_id
+) AS loans ON loans.book_id = book.id;
+
+-- REFRESH ... CONCURRENTLY needs a unique index.
+CREATE UNIQUE INDEX book_popularity_book_idx ON books_bookpopularity (book_id);
+CREATE INDEX book_popularity_7d_idx
+    ON books_bookpopularity (borrows_7d, book_id);
+CREATE INDEX book_popularity_30d_idx
+    ON books_bookpopularity (borrows_30d, book_id);
+CREATE INDEX book_popularity_total_idx
+    ON books_bookpopularity (borrows_total, book_id);
+CREATE INDEX book_popularity_available_idx
+    ON books_bookpopularity (available, book_id);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_title_id_idx"),
+        ("borrowings", "0006_borrowingstats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookPopularity",
+            fields=[
+                (
+                    "book",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="popularity",
+                        serialize=False,
+                        to="books.book",
+                    ),
+                ),
+                ("borrows_7d", models.IntegerField()),
+                ("borrows_30d", models.IntegerField()),
+                ("borrows_total", models.IntegerField()),
+                ("reserved", models.IntegerField()),
+                ("available", models.IntegerField()),
+                ("refreshed_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name_plural": "book popularity",
+                "db_table": "books_bookpopularity",
+                "managed": False,
+            },
+        ),
+        migrations.RunSQL(
+            CREATE_VIEW, "DROP MATERIALIZED VIEW IF EXISTS books_bookpopularity;"
+        ),
+    ]
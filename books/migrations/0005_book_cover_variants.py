@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_bookpopularity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="cover_variants",
+            field=models.JSONField(blank=True, db_default={}, default=dict),
+        ),
+    ]
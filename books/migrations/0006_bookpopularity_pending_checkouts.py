@@ -0,0 +1,66 @@
+from importlib import import_module
+
+from django.db import migrations
+
+# Checkouts now take their copy off `inventory` up front and a failed or
+# expired payment puts it back, so `reserved` counts only checkouts still
+# waiting on a pending payment and `available` is the inventory itself.
+CREATE_VIEW = """
+CREATE MATERIALIZED VIEW books_bookpopularity AS
+SELECT
+    book.id AS book_id,
+    COALESCE(loans.borrows_7d, 0) AS borrows_7d,
+    COALESCE(loans.borrows_30d, 0) AS borrows_30d,
+    COALESCE(loans.borrows_total, 0) AS borrows_total,
+    COALESCE(loans.reserved, 0) AS reserved,
+    book.inventory AS available,
+    now() AS refreshed_at
+FROM books_book AS book
+LEFT JOIN (
+    SELECT
+        book_id,
+        (COUNT(*) FILTER (
+            WHERE is_paid AND borrow_date > CURRENT_DATE - 7
+        ))::integer AS borrows_7d,
+        (COUNT(*) FILTER (
+            WHERE is_paid AND borrow_date > CURRENT_DATE - 30
+        ))::integer AS borrows_30d,
+        (COUNT(*) FILTER (WHERE is_paid))::integer AS borrows_total,
+        (COUNT(*) FILTER (
+            WHERE NOT is_paid AND actual_return_date IS NULL AND EXISTS (
+                SELECT 1 FROM payments_payment AS payment
+                WHERE payment.borrowing_id = borrowing.id
+                    AND payment.type = 'PAYMENT'
+                    AND payment.status = 'PENDING'
+            )
+        ))::integer AS reserved
+    FROM borrowings_borrowing AS borrowing
+    GROUP BY book_id
+) AS loans ON loans.book_id = book.id;
+
+-- REFRESH ... CONCURRENTLY needs a unique index.
+CREATE UNIQUE INDEX book_popularity_book_idx ON books_bookpopularity (book_id);
+CREATE INDEX book_popularity_7d_idx
+    ON books_bookpopularity (borrows_7d, book_id);
+CREATE INDEX book_popularity_30d_idx
+    ON books_bookpopularity (borrows_30d, book_id);
+CREATE INDEX book_popularity_total_idx
+    ON books_bookpopularity (borrows_total, book_id);
+CREATE INDEX book_popularity_available_idx
+    ON books_bookpopularity (available, book_id);
+"""
+DROP_VIEW = "DROP MATERIALIZED VIEW IF EXISTS books_bookpopularity;"
+PREVIOUS_VIEW = import_module("books.migrations.0004_bookpopularity").CREATE_VIEW
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0005_book_cover_variants"),
+        ("borrowings", "0007_borrowing_has_copy"),
+        ("payments", "0005_payment_session_id_unique"),
+    ]
+
+    operations = [
+        migrations.RunSQL([DROP_VIEW, CREATE_VIEW], [DROP_VIEW, PREVIOUS_VIEW]),
+    ]
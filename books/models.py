@@ -1,6 +1,9 @@
 import os
 import uuid
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils.text import slugify
 
 
@@ -24,8 +27,67 @@ class Book(models.Model):
         null=True,
         verbose_name="Cover",
     )
+    # Thumbnails of `cover_image`, written by `books.images`.
+    cover_variants = models.JSONField(default=dict, db_default={}, blank=True)
     inventory = models.PositiveIntegerField()
     daily_fee = models.DecimalField(max_digits=10, decimal_places=2)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector("author", weight="B", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="book_search_vector_idx"),
+            # `icontains` compiles to UPPER(column) LIKE UPPER(%s)
+            GinIndex(
+                OpClass(Upper("title"), name="gin_trgm_ops"),
+                name="book_title_trgm_idx",
+            ),
+            GinIndex(
+                OpClass(Upper("author"), name="gin_trgm_ops"),
+                name="book_author_trgm_idx",
+            ),
+            # The catalog's default ordering, with the pagination tie-breaker.
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author}"
+
+
+class BookPopularity(models.Model):
+    """
+    A row of the `books_bookpopularity` materialized view, which
+    `books.popularity.refresh_popularity` rebuilds on a schedule.
+
+    Borrow counts are of paid loans. `reserved` counts unpaid loans whose
+    checkout payment is still pending; their copies are already off the
+    inventory, so `available` is the inventory itself. Books added since the
+    last refresh have no row yet.
+    """
+
+    book = models.OneToOneField(
+        to=Book,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        related_name="popularity",
+    )
+    borrows_7d = models.IntegerField()
+    borrows_30d = models.IntegerField()
+    borrows_total = models.IntegerField()
+    reserved = models.IntegerField()
+    available = models.IntegerField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = "books_bookpopularity"
+        verbose_name_plural = "book popularity"
+
+    def __str__(self):
+        return f"Popularity of book {self.book_id}"
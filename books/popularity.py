@@ -0,0 +1,29 @@
+import logging
+import time
+
+from django.db import connection
+
+from books.cache import invalidate_catalog
+from books.models import BookPopularity
+
+logger = logging.getLogger(__name__)
+
+# `BookPopularity` columns that `BookViewSet` can order by.
+POPULARITY_ORDERINGS = ("borrows_7d", "borrows_30d", "borrows_total", "available")
+
+
+def refresh_popularity():
+    """
+    Rebuild the popularity view without blocking readers, then expire the
+    cached catalog pages so listings pick up the new numbers.
+    """
+    started = time.monotonic()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "REFRESH MATERIALIZED VIEW CONCURRENTLY "
+            f"{connection.ops.quote_name(BookPopularity._meta.db_table)}"
+        )
+    invalidate_catalog()
+    elapsed = time.monotonic() - started
+    logger.info(f"Book popularity refreshed in {elapsed:.2f}s")
+    return elapsed
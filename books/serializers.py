@@ -4,6 +4,8 @@ from books.models import Book
 
 
 class BookSerializer(serializers.ModelSerializer):
+    cover_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Book
         fields = [
@@ -14,4 +16,22 @@ class BookSerializer(serializers.ModelSerializer):
             "inventory",
             "daily_fee",
             "cover_image",
+            "cover_variants",
         ]
+
+    def get_cover_variants(self, book) -> dict:
+        """Thumbnail URLs by size and format, once built for the current cover."""
+        variants = book.cover_variants or {}
+        if not book.cover_image or variants.get("source") != book.cover_image.name:
+            return {}
+        storage = book.cover_image.storage
+        request = self.context.get("request")
+        urls = {}
+        for size, formats in variants.get("images", {}).items():
+            urls[size] = {}
+            for extension, name in formats.items():
+                url = storage.url(name)
+                urls[size][extension] = (
+                    request.build_absolute_uri(url) if request else url
+                )
+        return urls
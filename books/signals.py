@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from books.cache import invalidate_book_on_commit, invalidate_catalog
+from books.models import Book
+from books.tasks import generate_cover_variants
+
+# Sent once after `books.imports.BookImporter` commits, with `created`.
+books_imported = Signal()
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    invalidate_book_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=Book)
+def queue_cover_variants(sender, instance, **kwargs):
+    """Rebuild the thumbnails once a new or removed cover is committed."""
+    source = (instance.cover_variants or {}).get("source", "")
+    if (instance.cover_image.name or "") != source:
+        pk = instance.pk
+        transaction.on_commit(lambda: generate_cover_variants.delay(pk))
+
+
+@receiver(books_imported)
+def invalidate_catalog_after_import(sender, **kwargs):
+    invalidate_catalog()
@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from books import images
+from books.popularity import refresh_popularity
+
+
+@shared_task
+def refresh_book_popularity():
+    return refresh_popularity()
+
+
+@shared_task(autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def generate_cover_variants(book_id):
+    images.generate_cover_variants(book_id)
@@ -0,0 +1,166 @@
+import asyncio
+import json
+from datetime import timedelta
+from importlib import import_module, reload
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowings.models import Borrowing
+from config.async_views import request_slots
+from config.testing import LOCMEM_CACHE
+from payments.models import Payment
+
+ASYNC_URLS = ("books.urls", "borrowings.urls", "payments.urls", "config.urls")
+
+
+def reload_urls():
+    """Rebuild the URLconf, as viewsets pick their dispatch when imported."""
+    for name in ASYNC_URLS:
+        reload(import_module(name))
+    clear_url_caches()
+
+
+class DispatchModeTest(SimpleTestCase):
+    """Test suite for choosing the dispatch of the async viewsets."""
+
+    def test_views_are_sync_under_wsgi(self):
+        """Test that the default WSGI mode dispatches without an event loop."""
+        view = resolve(reverse("books:book-list")).func
+        self.assertFalse(iscoroutinefunction(view))
+
+    def test_views_are_async_under_asgi(self):
+        """Test that SERVER_MODE=asgi turns the viewsets into async views."""
+        self.addCleanup(reload_urls)
+        with override_settings(SERVER_MODE="asgi"):
+            reload_urls()
+            view = resolve(reverse("books:book-list")).func
+        self.assertTrue(iscoroutinefunction(view))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class AsyncReadViewsTest(TransactionTestCase):
+    """Test suite for the async read views served over ASGI.
+
+    This test suite covers:
+    - Book list and detail, borrowing list and payment list
+    - Page number and cursor pagination with the async ORM
+    - Bounded request concurrency per event loop
+    - Streaming exports from an async iterator, inside their slot
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.addClassCleanup(reload_urls)
+        cls.enterClassContext(override_settings(SERVER_MODE="asgi"))
+        reload_urls()
+
+    def setUp(self):
+        cache.clear()
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="adminpass123"
+        )
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.admin)}"}
+        today = timezone.now().date()
+        self.books = [
+            Book.objects.create(
+                title=f"Book {i:02}",
+                author="Author",
+                cover="HARD",
+                inventory=1,
+                daily_fee="1.00",
+            )
+            for i in range(12)
+        ]
+        for book in self.books[:3]:
+            borrowing = Borrowing.objects.create(
+                book=book,
+                user=self.admin,
+                expected_return_date=today + timedelta(days=7),
+                is_paid=True,
+            )
+            Payment.objects.create(borrowing=borrowing, money_to_pay="7.00")
+
+    async def test_book_list_and_detail(self):
+        """Test that the book list pages and the detail view work over ASGI."""
+        url = reverse("books:book-list")
+        response = await self.async_client.get(url, {"page": 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["count"], 12)
+        self.assertEqual(
+            [book["title"] for book in data["results"]], ["Book 10", "Book 11"]
+        )
+
+        response = await self.async_client.get(url, {"page": 3})
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.get(url, {"cursor": ""})
+        self.assertEqual(len(response.json()["results"]), 10)
+        response = await self.async_client.get(response.json()["next"])
+        self.assertEqual(len(response.json()["results"]), 2)
+
+        book = self.books[0]
+        response = await self.async_client.get(
+            reverse("books:book-detail", args=[book.id])
+        )
+        self.assertEqual(response.json()["title"], book.title)
+        response = await self.async_client.get(reverse("books:book-detail", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_borrowing_and_payment_lists(self):
+        """Test that the authenticated lists run over ASGI."""
+        response = await self.async_client.get(reverse("borrowings:borrowing-list"))
+        self.assertEqual(response.status_code, 401)
+
+        response = await self.async_client.get(
+            reverse("borrowings:borrowing-list"), headers=self.headers
+        )
+        self.assertEqual(response.json()["count"], 3)
+        self.assertIn("book_title", response.json()["results"][0])
+
+        response = await self.async_client.get(
+            reverse("payments:payment-list"), headers=self.headers
+        )
+        self.assertEqual(response.json()["count"], 3)
+
+    @override_settings(ASYNC_DB_CONCURRENCY=1)
+    async def test_concurrent_requests_share_the_slots(self):
+        """Test that requests beyond the limit wait instead of failing."""
+        url = reverse("books:book-list")
+        responses = await asyncio.gather(
+            *(self.async_client.get(url, {"page": page % 2 + 1}) for page in range(6))
+        )
+        self.assertEqual([response.status_code for response in responses], [200] * 6)
+
+    async def test_export_streams_asynchronously(self):
+        """Test that exports stream rows from an async iterator under ASGI."""
+        response = await self.async_client.get(
+            reverse("borrowings:borrowing-export"),
+            {"format": "ndjson"},
+            headers=self.headers,
+        )
+        self.assertTrue(response.is_async)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in content.decode().splitlines()]
+        self.assertEqual(len(rows), 3)
+
+    @override_settings(ASYNC_DB_CONCURRENCY=1)
+    async def test_export_holds_its_slot_until_streamed(self):
+        """Test that a streaming export keeps its slot until the last chunk."""
+        response = await self.async_client.get(
+            reverse("borrowings:borrowing-export"),
+            {"format": "ndjson"},
+            headers=self.headers,
+        )
+        self.assertTrue(request_slots().locked())
+
+        [chunk async for chunk in response.streaming_content]
+        self.assertFalse(request_slots().locked())
@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from books.models import Book
+from config.testing import LOCMEM_CACHE
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BookCatalogCacheTest(APITestCase):
+    """Test suite for the cached book catalog responses."""
+
+    def setUp(self):
+        """Set up an empty cache and a couple of books."""
+        cache.clear()
+        self.book1 = Book.objects.create(
+            title="Book One",
+            author="Author One",
+            cover="HARD",
+            inventory=5,
+            daily_fee="1.50",
+        )
+        self.book2 = Book.objects.create(
+            title="Book Two",
+            author="Author Two",
+            cover="SOFT",
+            inventory=3,
+            daily_fee="2.00",
+        )
+        self.list_url = reverse("books:book-list")
+
+    def test_list_is_served_from_cache(self):
+        """Test that a repeated list request makes no database queries."""
+        first = self.client.get(self.list_url, {"author": "one"})
+        with self.assertNumQueries(0):
+            second = self.client.get(self.list_url, {"author": "one"})
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_equivalent_query_strings_share_an_entry(self):
+        """Test that parameter order, empty values and page=1 are ignored."""
+        self.client.get(self.list_url, {"author": "one", "ordering": "title"})
+        with self.assertNumQueries(0):
+            self.client.get(f"{self.list_url}?ordering=title&cover=&page=1&author=one")
+
+    def test_save_invalidates_list_and_detail(self):
+        """Test that saving a book expires the list and its own detail."""
+        detail_url = reverse("books:book-detail", args=[self.book1.id])
+        self.client.get(self.list_url)
+        self.client.get(detail_url)
+
+        self.book1.title = "Renamed"
+        self.book1.save()
+
+        self.assertIn("Renamed", self.client.get(self.list_url).content.decode())
+        self.assertEqual(self.client.get(detail_url).data["title"], "Renamed")
+
+    def test_save_keeps_other_details_cached(self):
+        """Test that a change to one book leaves other details cached."""
+        other_url = reverse("books:book-detail", args=[self.book2.id])
+        self.client.get(other_url)
+
+        self.book1.inventory = 0
+        self.book1.save()
+
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+
+    def test_delete_invalidates_list(self):
+        """Test that deleting a book removes it from the cached list."""
+        self.client.get(self.list_url)
+        self.book2.delete()
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.json()["count"], 1)
+
+    def test_if_none_match_returns_304(self):
+        """Test that a matching ETag is answered with 304 Not Modified."""
+        etag = self.client.get(self.list_url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.book1.save()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_cache_stats(self):
+        """Test that hit rate metrics are exposed to admins only."""
+        url = reverse("books:book-cache-stats")
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="adminpass123"
+        )
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["hits"], 1)
+        self.assertEqual(response.data["misses"], 1)
+        self.assertEqual(response.data["hit_rate"], 0.5)
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://127.0.0.1:1/0",
+            }
+        }
+    )
+    def test_unavailable_cache_falls_back_to_database(self):
+        """Test that the catalog keeps working when Redis is down."""
+        with self.assertLogs("books.cache", level="ERROR"):
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 2)
@@ -65,3 +65,25 @@ class BookFilterTest(TestCase):
         qs = f.qs
         self.assertEqual(qs.count(), 2)
         self.assertTrue(all(4 <= book.inventory <= 8 for book in qs))
+
+    def test_search_matches_title_and_author_words(self):
+        """Test full-text search across title and author with stemming."""
+        f = BookFilter(data={"search": "programs"})
+        self.assertEqual([book.title for book in f.qs], ["Python Programming"])
+
+        f = BookFilter(data={"search": "doe"})
+        self.assertEqual(f.qs.count(), 2)
+
+    def test_search_ranks_title_matches_first(self):
+        """Test that a title match outranks an author match."""
+        Book.objects.create(
+            title="Collected Essays",
+            author="Django Reinhardt",
+            cover=Book.CoverChoices.SOFT,
+            inventory=1,
+            daily_fee=5.00,
+        )
+        f = BookFilter(data={"search": "django"})
+        ranked = list(f.qs.order_by("-rank", "id"))
+        self.assertEqual(len(ranked), 3)
+        self.assertEqual(ranked[-1].title, "Collected Essays")
@@ -0,0 +1,160 @@
+import io
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from books.images import COVER_VARIANT_WIDTHS, generate_cover_variants
+from books.models import Book
+from config.testing import LOCMEM_CACHE
+
+
+def make_image(size=(1200, 1800), color="navy", format="PNG", mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, format)
+    return SimpleUploadedFile(
+        f"cover.{format.lower()}", buffer.getvalue(), content_type="image/png"
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+@patch("books.signals.generate_cover_variants.delay", side_effect=generate_cover_variants)
+class CoverVariantsTest(APITestCase):
+    """Test suite for cover thumbnails.
+
+    This test suite covers:
+    - Building WebP and JPEG variants after an upload commits
+    - Content-hashed variant names and their URLs in BookSerializer
+    - Replacing and removing covers
+    - The backfill command
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        settings = override_settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="adminpass123"
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.book = Book.objects.create(
+            title="Cover Book",
+            author="Author",
+            cover="HARD",
+            inventory=1,
+            daily_fee="1.00",
+        )
+        self.url = reverse("books:book-detail", args=[self.book.id])
+
+    def upload(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                self.url, {"cover_image": image}, format="multipart"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.book.refresh_from_db()
+
+    def open_variant(self, size, extension):
+        name = self.book.cover_variants["images"][size][extension]
+        return Image.open(self.book.cover_image.storage.open(name))
+
+    def test_upload_builds_variants(self, mock_delay):
+        """Test that every size is written as WebP and JPEG after an upload."""
+        self.upload(make_image(mode="RGBA", color=(10, 20, 30, 0)))
+
+        mock_delay.assert_called_once_with(self.book.id)
+        variants = self.book.cover_variants
+        self.assertEqual(variants["source"], self.book.cover_image.name)
+        self.assertEqual(set(variants["images"]), set(COVER_VARIANT_WIDTHS))
+        for size, width in COVER_VARIANT_WIDTHS.items():
+            with self.open_variant(size, "webp") as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertEqual(image.size, (width, width * 3 // 2))
+            with self.open_variant(size, "jpeg") as image:
+                self.assertEqual(image.format, "JPEG")
+
+    def test_small_covers_are_not_scaled_up(self, mock_delay):
+        """Test that variants never exceed the original size."""
+        self.upload(make_image(size=(200, 300)))
+
+        with self.open_variant("large", "jpeg") as image:
+            self.assertEqual(image.size, (200, 300))
+
+    def test_serializer_returns_hashed_urls(self, mock_delay):
+        """Test that the API lists absolute, content-hashed variant URLs."""
+        self.upload(make_image())
+
+        data = self.client.get(self.url).json()
+        url = data["cover_variants"]["small"]["webp"]
+        self.assertTrue(url.startswith("http://testserver/media/covers/variants/"))
+        self.assertRegex(url, r"-160w\.[0-9a-f]{16}\.webp$")
+        listed = self.client.get(reverse("books:book-list")).json()["results"][0]
+        self.assertEqual(listed["cover_variants"], data["cover_variants"])
+
+    def test_same_content_gets_the_same_name(self, mock_delay):
+        """Test that names only change when the thumbnail content does."""
+        self.upload(make_image())
+        first = self.book.cover_variants["images"]
+
+        generate_cover_variants(self.book.id)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.cover_variants["images"], first)
+
+    def test_replacing_and_removing_a_cover(self, mock_delay):
+        """Test that old variants are removed and stale ones are never served."""
+        self.upload(make_image(color="navy"))
+        storage = self.book.cover_image.storage
+        old = self.book.cover_variants["images"]["small"]["jpeg"]
+
+        # Before the task runs, the old cover's variants are not served.
+        with patch("books.signals.generate_cover_variants.delay"):
+            self.upload(make_image(color="red"))
+        self.assertEqual(self.client.get(self.url).json()["cover_variants"], {})
+
+        generate_cover_variants(self.book.id)
+        self.book.refresh_from_db()
+        self.assertNotEqual(self.book.cover_variants["images"]["small"]["jpeg"], old)
+        self.assertFalse(storage.exists(old))
+
+        self.upload("")
+        self.assertEqual(self.book.cover_variants, {})
+        self.assertEqual(
+            storage.listdir("covers/variants")[1], [], "variants left behind"
+        )
+
+    def test_backfill_command(self, mock_delay):
+        """Test that the command builds only missing or outdated variants."""
+        self.book.cover_image = make_image()
+        Book.objects.filter(pk=self.book.pk).update(
+            cover_image=self.book.cover_image.storage.save(
+                "covers/existing.png", self.book.cover_image
+            )
+        )
+        Book.objects.create(
+            title="No Cover", author="A", cover="SOFT", inventory=1, daily_fee="1"
+        )
+
+        out = StringIO()
+        call_command("generate_cover_variants", "--sync", stdout=out)
+        self.assertIn("Built cover variants for 1 books", out.getvalue())
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.cover_variants["source"], "covers/existing.png")
+
+        out = StringIO()
+        call_command("generate_cover_variants", stdout=out)
+        self.assertIn("Queued cover variants for 0 books", out.getvalue())
+        call_command("generate_cover_variants", "--all", stdout=out)
+        mock_delay.assert_called_once_with(self.book.id)
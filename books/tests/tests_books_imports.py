@@ -0,0 +1,145 @@
+import json
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from books.imports import BookImporter
+from books.models import Book
+from config.testing import LOCMEM_CACHE
+
+CSV_ROWS = (
+    b"title,author,cover,inventory,daily_fee\n"
+    b"Dune,Frank Herbert,HARD,3,1.50\n"
+    b'"Title, with comma",Someone,SOFT,1,0.99\n'
+    b"Broken,Nobody,PAPER,-1,abc\n"
+    b",Anonymous,HARD,2,1.00\n"
+)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+@patch("notifications.signals.broadcast_telegram_message.delay")
+class BookImportTest(TestCase):
+    """Test suite for bulk book imports.
+
+    This test suite covers:
+    - CSV and JSON Lines parsing
+    - Per-row validation errors
+    - Batched COPY loading
+    - One summary notification instead of per-book signals
+    - The import endpoint and management command
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="adminpass123"
+        )
+        self.url = reverse("books:book-import")
+
+    def run_import(self, content, format, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return BookImporter(**kwargs).run(content.splitlines(True), format)
+
+    def test_csv_import_reports_row_errors(self, mock_broadcast):
+        """Test that valid rows load and invalid ones are reported by line."""
+        report = self.run_import(CSV_ROWS, "csv")
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual([error["line"] for error in report["errors"]], [4, 5])
+        self.assertEqual(
+            sorted(report["errors"][0]["errors"]), ["cover", "daily_fee", "inventory"]
+        )
+        self.assertEqual(list(report["errors"][1]["errors"]), ["title"])
+        book = Book.objects.get(title="Title, with comma")
+        self.assertEqual(str(book.daily_fee), "0.99")
+        self.assertEqual(book.cover, Book.CoverChoices.SOFT)
+
+    def test_jsonl_import_in_batches(self, mock_broadcast):
+        """Test that JSON Lines load across several COPY batches."""
+        lines = [
+            json.dumps(
+                {
+                    "title": f"Book {i}",
+                    "author": "Author",
+                    "cover": "HARD",
+                    "inventory": i,
+                    "daily_fee": "2.00",
+                }
+            )
+            for i in range(5)
+        ]
+        content = "\n".join(lines + ["not json", "[1, 2]", ""]).encode()
+
+        report = self.run_import(content, "jsonl", batch_size=2)
+
+        self.assertEqual(report["created"], 5)
+        self.assertEqual([error["line"] for error in report["errors"]], [6, 7])
+        self.assertEqual(Book.objects.count(), 5)
+        self.assertTrue(Book.objects.filter(search_vector="book").exists())
+
+    def test_one_summary_notification(self, mock_broadcast):
+        """Test that an import broadcasts once rather than per book."""
+        self.run_import(CSV_ROWS, "csv")
+
+        mock_broadcast.assert_called_once()
+        self.assertIn("Count: 2", mock_broadcast.call_args[0][0])
+
+    def test_missing_columns_are_rejected(self, mock_broadcast):
+        """Test that a header without required columns fails up front."""
+        with self.assertRaisesMessage(ValidationError, "daily_fee"):
+            self.run_import(b"title,author,cover,inventory\nA,B,HARD,1\n", "csv")
+        self.assertFalse(Book.objects.exists())
+        mock_broadcast.assert_not_called()
+
+    def test_import_endpoint(self, mock_broadcast):
+        """Test that admins can upload a file and get the report back."""
+        self.client.get(reverse("books:book-list"))
+        self.client.force_authenticate(user=self.admin)
+        upload = SimpleUploadedFile("books.csv", CSV_ROWS, content_type="text/csv")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {"file": upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(response.data["failed"], 2)
+        # The cached catalog was invalidated by the import.
+        self.assertEqual(self.client.get(reverse("books:book-list")).json()["count"], 2)
+
+    def test_import_endpoint_requires_admin(self, mock_broadcast):
+        """Test that regular users and missing files are rejected."""
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="userpass123"
+        )
+        self.client.force_authenticate(user=user)
+        upload = SimpleUploadedFile("books.csv", CSV_ROWS)
+        self.assertEqual(self.client.post(self.url, {"file": upload}).status_code, 403)
+
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(self.client.post(self.url, {}).status_code, 400)
+
+    def test_import_command(self, mock_broadcast):
+        """Test that the command loads a file and prints row errors."""
+        with tempfile.NamedTemporaryFile(suffix=".csv") as file:
+            file.write(CSV_ROWS)
+            file.flush()
+            out, err = StringIO(), StringIO()
+            call_command("import_books", file.name, stdout=out, stderr=err)
+
+        self.assertIn("Imported 2 books", out.getvalue())
+        self.assertIn("line 4:", err.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command("import_books", "/nonexistent.csv", stdout=StringIO())
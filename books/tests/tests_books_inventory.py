@@ -0,0 +1,102 @@
+import threading
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from books.inventory import return_copy, take_copy
+from books.models import Book
+
+
+def run_concurrently(target, threads):
+    """Start `threads` copies of `target` at once and collect their results."""
+    barrier = threading.Barrier(threads)
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            barrier.wait()
+            result = target()
+            with lock:
+                results.append(result)
+        finally:
+            connection.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+
+@patch("notifications.signals.broadcast_telegram_message.delay")
+class InventoryTest(TestCase):
+    """Test suite for the inventory service."""
+
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=1,
+            daily_fee=1,
+        )
+
+    def test_take_and_return_copy(self, _):
+        """Test that copies are taken until none are left and returned."""
+        self.assertTrue(take_copy(self.book.id))
+        self.assertFalse(take_copy(self.book.id))
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+        self.assertTrue(return_copy(self.book.id))
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 1)
+
+    def test_updates_only_inventory_without_save_signals(self, mock_broadcast):
+        """Test that inventory changes skip `Book.save` and its signals."""
+        with self.assertNumQueries(1):
+            take_copy(self.book.id)
+        mock_broadcast.assert_not_called()
+
+
+@patch("notifications.signals.broadcast_telegram_message.delay")
+class InventoryContentionTest(TransactionTestCase):
+    """Test suite for inventory changes made from many threads at once."""
+
+    def setUp(self):
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=1,
+        )
+
+    def test_concurrent_checkouts_never_oversell(self, _):
+        """Test that only as many checkouts succeed as there are copies."""
+        results = run_concurrently(lambda: take_copy(self.book.id), threads=20)
+
+        self.assertEqual(results.count(True), 5)
+        self.assertEqual(results.count(False), 15)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_concurrent_checkouts_and_returns_keep_exact_count(self, _):
+        """Test that interleaved checkouts and returns lose no updates."""
+
+        def borrow_and_return():
+            taken = 0
+            for _ in range(25):
+                if take_copy(self.book.id):
+                    taken += 1
+                    return_copy(self.book.id)
+            return taken
+
+        results = run_concurrently(borrow_and_return, threads=8)
+
+        self.assertGreater(sum(results), 0)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 5)
@@ -0,0 +1,176 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from books.inventory import return_copy, take_copy
+from books.models import Book, BookPopularity
+from books.tasks import refresh_book_popularity
+from borrowings.models import Borrowing
+from config.celery import app
+from config.pagination import KeysetPagination
+from config.testing import LOCMEM_CACHE
+from payments.models import Payment
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class BookPopularityTest(APITestCase):
+    """Test suite for the book popularity view.
+
+    This test suite covers:
+    - Rolling borrow counts and availability after a refresh
+    - Popularity orderings and filters on the book list
+    - Availability filters following the live inventory between refreshes
+    - Catalog cache invalidation and the beat schedule
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="userpass123"
+        )
+        # Inventories are net of the copies held by pending checkouts.
+        self.popular = self.create_book("Popular", inventory=3)
+        self.steady = self.create_book("Steady", inventory=0)
+        self.unread = self.create_book("Unread", inventory=1)
+
+        self.borrow(self.popular, days_ago=1)
+        self.borrow(self.popular, days_ago=10)
+        self.borrow(self.steady, days_ago=5)
+        self.borrow(self.steady, days_ago=60)
+        self.borrow(self.steady, days_ago=90)
+        self.borrow(self.steady, days_ago=0, payment=Payment.Status.PENDING)
+        self.borrow(self.unread, days_ago=0, payment=Payment.Status.PENDING)
+        # Abandoned checkouts gave their copy back.
+        self.borrow(self.popular, days_ago=3, payment=Payment.Status.FAILED)
+        self.list_url = reverse("books:book-list")
+
+    def create_book(self, title, inventory):
+        return Book.objects.create(
+            title=title,
+            author="Author",
+            cover="HARD",
+            inventory=inventory,
+            daily_fee="1.00",
+        )
+
+    def borrow(self, book, days_ago, payment=Payment.Status.PAID):
+        borrowing = Borrowing.objects.create(
+            book=book,
+            user=self.user,
+            expected_return_date=self.today + timedelta(days=7),
+        )
+        Payment.objects.create(borrowing=borrowing, money_to_pay="7.00", status=payment)
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            borrow_date=self.today - timedelta(days=days_ago),
+            is_paid=payment == Payment.Status.PAID,
+        )
+
+    def titles(self, **params):
+        response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, 200)
+        return [book["title"] for book in response.json()["results"]]
+
+    def test_refresh_counts_windows_and_availability(self):
+        """Test that a refresh counts only pending checkouts as reserved."""
+        refresh_book_popularity()
+
+        popular = BookPopularity.objects.get(book=self.popular)
+        self.assertEqual(
+            (popular.borrows_7d, popular.borrows_30d, popular.borrows_total),
+            (1, 2, 2),
+        )
+        self.assertEqual((popular.reserved, popular.available), (0, 3))
+
+        steady = BookPopularity.objects.get(book=self.steady)
+        self.assertEqual(
+            (steady.borrows_7d, steady.borrows_30d, steady.borrows_total),
+            (1, 1, 3),
+        )
+        self.assertEqual((steady.reserved, steady.available), (1, 0))
+        unread = BookPopularity.objects.get(book=self.unread)
+        self.assertEqual((unread.reserved, unread.available), (1, 1))
+
+    def test_popularity_orderings(self):
+        """Test ordering by borrow counts and availability."""
+        refresh_book_popularity()
+
+        self.assertEqual(
+            self.titles(ordering="-borrows_30d"), ["Popular", "Steady", "Unread"]
+        )
+        self.assertEqual(
+            self.titles(ordering="-borrows_total"), ["Steady", "Popular", "Unread"]
+        )
+        self.assertEqual(
+            self.titles(ordering="available"), ["Steady", "Unread", "Popular"]
+        )
+
+    @patch.object(KeysetPagination, "page_size", 2)
+    def test_popularity_ordering_with_cursor(self):
+        """Test that keyset pages walk a popularity ordering without gaps."""
+        refresh_book_popularity()
+
+        response = self.client.get(
+            self.list_url, {"ordering": "-borrows_7d", "cursor": ""}
+        )
+        titles = [book["title"] for book in response.json()["results"]]
+        response = self.client.get(response.json()["next"])
+        titles += [book["title"] for book in response.json()["results"]]
+
+        self.assertEqual(titles, ["Steady", "Popular", "Unread"])
+
+    def test_availability_filters(self):
+        """Test the availability and borrow count filters."""
+        refresh_book_popularity()
+
+        self.assertEqual(self.titles(available="true"), ["Popular", "Unread"])
+        self.assertEqual(self.titles(available="false"), ["Steady"])
+        self.assertEqual(self.titles(available_min=2), ["Popular"])
+        self.assertEqual(self.titles(borrows_30d_min=1), ["Popular", "Steady"])
+
+    def test_availability_filters_read_live_inventory(self):
+        """Test that availability filters agree with the detail before a refresh."""
+        refresh_book_popularity()
+        with self.captureOnCommitCallbacks(execute=True):
+            take_copy(self.unread.pk)
+            return_copy(self.steady.pk)
+
+        self.assertEqual(self.titles(available="true"), ["Popular", "Steady"])
+        self.assertEqual(self.titles(available="false"), ["Unread"])
+        self.assertEqual(self.titles(available_min=1), ["Popular", "Steady"])
+        detail = self.client.get(reverse("books:book-detail", args=[self.unread.pk]))
+        self.assertEqual(detail.json()["inventory"], 0)
+
+    def test_new_books_wait_for_refresh(self):
+        """Test that books added after a refresh join listings on the next one."""
+        refresh_book_popularity()
+        self.create_book("Newcomer", inventory=4)
+
+        self.assertNotIn("Newcomer", self.titles(ordering="-borrows_30d"))
+        self.assertIn("Newcomer", self.titles())
+
+        refresh_book_popularity()
+        self.assertIn("Newcomer", self.titles(ordering="-borrows_30d"))
+
+    def test_refresh_invalidates_cached_listings(self):
+        """Test that cached popularity pages expire when the view is refreshed."""
+        refresh_book_popularity()
+        self.assertEqual(self.titles(ordering="-borrows_7d")[0], "Steady")
+
+        self.borrow(self.popular, days_ago=2)
+        self.borrow(self.popular, days_ago=3)
+        self.assertEqual(self.titles(ordering="-borrows_7d")[0], "Steady")
+
+        refresh_book_popularity()
+        self.assertEqual(self.titles(ordering="-borrows_7d")[0], "Popular")
+
+    def test_refresh_is_scheduled(self):
+        """Test that Celery beat refreshes the view."""
+        tasks = [entry["task"] for entry in app.conf.beat_schedule.values()]
+        self.assertIn("books.tasks.refresh_book_popularity", tasks)
@@ -39,6 +39,62 @@ class BookViewSetTest(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.data["results"]), 2)
 
+    def test_search_books_orders_by_relevance(self):
+        """Test that search results are ranked unless an ordering is given."""
+        Book.objects.create(
+            title="A Guide",
+            author="Author Two",
+            cover="SOFT",
+            inventory=1,
+            daily_fee="1.00",
+        )
+        url = reverse("books:book-list")
+
+        response = self.client.get(url, {"search": "two"})
+        titles = [book["title"] for book in response.data["results"]]
+        self.assertEqual(titles, ["Book Two", "A Guide"])
+
+        response = self.client.get(url, {"search": "two", "ordering": "title"})
+        titles = [book["title"] for book in response.data["results"]]
+        self.assertEqual(titles, ["A Guide", "Book Two"])
+
+    def test_blank_search_lists_every_book(self):
+        """Test that a whitespace-only search is ignored rather than ranked."""
+        response = self.client.get(reverse("books:book-list"), {"search": " "})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_cursor_pages_follow_ordering_and_search(self):
+        """Test that cursor pages keep the ordering and break ties by id."""
+        for i in range(12):
+            Book.objects.create(
+                title=f"Extra {i % 3}",
+                author="Author Two",
+                cover="SOFT",
+                inventory=1,
+                daily_fee="2.00",
+            )
+        url = reverse("books:book-list")
+
+        for params in ({"ordering": "-daily_fee"}, {"search": "two"}):
+            page = self.client.get(url, {**params, "cursor": ""}).json()
+            ids = [book["id"] for book in page["results"]]
+            self.assertNotIn("count", page)
+            page = self.client.get(page["next"]).json()
+            ids += [book["id"] for book in page["results"]]
+            self.assertIsNone(page["next"])
+
+            expected = [
+                book["id"]
+                for number in (1, 2)
+                for book in self.client.get(url, {**params, "page": number}).json()[
+                    "results"
+                ]
+            ]
+            self.assertEqual(ids, expected)
+            self.assertEqual(len(set(ids)), len(ids))
+
     def test_retrieve_book(self):
         """Test retrieving a single book by ID."""
         url = reverse("books:book-detail", args=[self.book1.id])
@@ -1,17 +1,68 @@
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from books.cache import CatalogCacheMixin, get_stats
+from books.imports import BookImporter, guess_format
 from books.models import Book
+from books.popularity import POPULARITY_ORDERINGS
 from books.serializers import BookSerializer
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter
-from books.filters import BookFilter
+from books.filters import BookFilter, BookOrderingFilter
+from config.async_views import (
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+    AsyncViewSetMixin,
+)
 
 
-class BookViewSet(viewsets.ModelViewSet):
+class BookViewSet(
+    AsyncViewSetMixin,
+    CatalogCacheMixin,
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
 
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BookOrderingFilter]
     filterset_class = BookFilter
 
-    ordering_fields = ["title", "daily_fee", "inventory", "author"]
+    ordering_fields = [
+        "title",
+        "daily_fee",
+        "inventory",
+        "author",
+        *POPULARITY_ORDERINGS,
+    ]
     ordering = ["title"]
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="cache-stats",
+        permission_classes=[IsAdminUser],
+    )
+    def cache_stats(self, request):
+        return Response(get_stats())
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        permission_classes=[IsAdminUser],
+        parser_classes=[MultiPartParser],
+    )
+    def import_books(self, request):
+        """Bulk-load a CSV or JSON Lines `file`; returns per-row errors."""
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"file": ["No file was submitted."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        format = request.data.get("format") or guess_format(upload.name)
+        return Response(BookImporter().run(upload, format))
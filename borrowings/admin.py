@@ -1,5 +1,5 @@
 from django.contrib import admin
-from borrowings.models import Borrowing
+from borrowings.models import Borrowing, BorrowingStats
 
 
 @admin.register(Borrowing)
@@ -20,3 +20,19 @@ class BorrowingAdmin(admin.ModelAdmin):
     )
     search_fields = ("book__title", "user__email")
     ordering = ("-borrow_date",)
+
+
+@admin.register(BorrowingStats)
+class BorrowingStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "user",
+        "book",
+        "active_count",
+        "overdue_count",
+        "total_paid",
+        "pending_fines",
+        "updated_at",
+    )
+    list_select_related = ("user", "book")
+    search_fields = ("user__email", "book__title")
+    readonly_fields = list_display
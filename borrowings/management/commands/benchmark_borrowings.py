@@ -0,0 +1,128 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from books.models import Book
+from borrowings.models import Borrowing
+from borrowings.views import BorrowingsViewSet
+
+User = get_user_model()
+
+BATCH_SIZE = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures `GET /api/borrow/borrowings/?is_active=true` latency while "
+        "the returned-loan history grows around a fixed set of open loans. "
+        "All seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10000,100000,1000000",
+            help="Comma-separated borrowing counts to measure at.",
+        )
+        parser.add_argument(
+            "--open",
+            type=int,
+            default=5000,
+            help="Number of open (not yet returned) loans.",
+        )
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--books", type=int, default=500)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options["sizes"].split(","))
+
+        with transaction.atomic():
+            admin, users, books = self.seed_references(
+                options["users"], options["books"]
+            )
+            self.stdout.write(
+                f"{'rows':>10} {'view':>14} {'p50 ms':>9} {'p95 ms':>9}"
+            )
+            self.seed_borrowings(options["open"], users, books, is_open=True)
+            total = options["open"]
+            for size in sizes:
+                self.seed_borrowings(size - total, users, books, is_open=False)
+                total = size
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE borrowings_borrowing")
+
+                for label, user in (("admin", admin), ("user", users[0])):
+                    p50, p95 = self.measure(user, options["requests"])
+                    self.stdout.write(
+                        f"{size:>10} {label + ' active':>14} "
+                        f"{p50:>9.2f} {p95:>9.2f}"
+                    )
+            transaction.set_rollback(True)
+
+    def seed_references(self, user_count, book_count):
+        admin = User.objects.create_superuser(
+            email="benchmark-admin@example.com", password=None
+        )
+        users = User.objects.bulk_create(
+            User(email=f"benchmark-{i}@example.com", password="!")
+            for i in range(user_count)
+        )
+        books = Book.objects.bulk_create(
+            Book(
+                title=f"Benchmark Book {i}",
+                author=f"Author {i % 50}",
+                cover=Book.CoverChoices.HARD,
+                inventory=10,
+                daily_fee=1,
+            )
+            for i in range(book_count)
+        )
+        return admin, users, books
+
+    def seed_borrowings(self, count, users, books, is_open):
+        today = timezone.now().date()
+        batch = []
+        for _ in range(count):
+            batch.append(
+                Borrowing(
+                    user=random.choice(users),
+                    book=random.choice(books),
+                    expected_return_date=today + timedelta(days=7),
+                    actual_return_date=None if is_open else today,
+                    is_paid=True,
+                )
+            )
+            if len(batch) == BATCH_SIZE:
+                Borrowing.objects.bulk_create(batch)
+                batch = []
+        Borrowing.objects.bulk_create(batch)
+
+    def measure(self, user, requests):
+        factory = APIRequestFactory()
+        view = BorrowingsViewSet.as_view({"get": "list"})
+        url = reverse("borrowings:borrowing-list")
+
+        timings = []
+        for _ in range(requests):
+            request = factory.get(
+                url, {"is_active": "true"}, SERVER_NAME="localhost"
+            )
+            force_authenticate(request, user=user)
+            start = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return (
+            statistics.median(timings),
+            statistics.quantiles(timings, n=20)[-1],
+        )
@@ -0,0 +1,107 @@
+import copy
+import statistics
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+MODES = ("close", "persistent", "pool")
+USER_EMAIL = "db-connections-benchmark@example.com"
+
+
+class Command(BaseCommand):
+    help = (
+        "Serves the borrowing summary endpoint through Django's WSGI handler "
+        "with connections closed after each request, kept persistent and "
+        "taken from a psycopg pool, reporting latency and the share of it "
+        "spent opening database connections."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--warmup", type=int, default=20)
+
+    def handle(self, *args, **options):
+        User.objects.filter(email=USER_EMAIL).delete()
+        user = User.objects.create_user(
+            email=USER_EMAIL, password=None, is_verified=True
+        )
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": reverse("user:summary"),
+            "HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}",
+        }
+        setup_testing_defaults(environ)
+        handler = WSGIHandler()
+        settings_dict = connection.settings_dict
+        connection.settings_dict = copy.deepcopy(settings_dict)
+
+        self.stdout.write(
+            f"{'mode':>10} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'backends':>9} {'connect ms':>11} {'share':>6}"
+        )
+        try:
+            for mode in options["modes"]:
+                self.configure(mode)
+                for _ in range(options["warmup"]):
+                    self.request(handler, environ)
+                self.backends, self.connect_time = set(), 0.0
+                latencies = [
+                    self.request(handler, environ) for _ in range(options["requests"])
+                ]
+                percentiles = statistics.quantiles(latencies, n=100)
+                self.stdout.write(
+                    f"{mode:>10} {statistics.median(latencies):>8.2f} "
+                    f"{percentiles[94]:>8.2f} {len(self.backends):>9} "
+                    f"{self.connect_time / len(latencies):>11.3f} "
+                    f"{self.connect_time / sum(latencies):>6.0%}"
+                )
+        finally:
+            self.configure(None)
+            connection.settings_dict = settings_dict
+            user.delete()
+
+    def configure(self, mode):
+        """Close the current connection and pool and switch to `mode`."""
+        connection.close()
+        connection.close_pool()
+        connection.__dict__.pop("get_new_connection", None)
+        if mode is None:
+            return
+
+        settings_dict = connection.settings_dict
+        settings_dict["CONN_MAX_AGE"] = 600 if mode == "persistent" else 0
+        settings_dict["OPTIONS"].pop("pool", None)
+        if mode == "pool":
+            settings_dict["OPTIONS"]["pool"] = {"min_size": 1, "max_size": 2}
+
+        self.backends, self.connect_time = set(), 0.0
+        get_new_connection = connection.get_new_connection
+
+        def timed_get_new_connection(conn_params):
+            start = time.perf_counter()
+            conn = get_new_connection(conn_params)
+            self.connect_time += (time.perf_counter() - start) * 1000
+            # A pool hands out the same few server backends over and over.
+            self.backends.add(conn.info.backend_pid)
+            return conn
+
+        connection.get_new_connection = timed_get_new_connection
+
+    def request(self, handler, environ):
+        """Serve one request, with the signals that open and recycle connections."""
+        start = time.perf_counter()
+        response = handler({**environ, "wsgi.input": BytesIO()}, lambda *args: None)
+        response.close()
+        if response.status_code != 200:
+            self.stderr.write(f"Request failed with {response.status_code}.")
+        return (time.perf_counter() - start) * 1000
@@ -0,0 +1,107 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from books.views import BookViewSet
+from borrowings.management.commands.explain_hot_queries import (
+    Command as ExplainHotQueries,
+)
+from borrowings.views import BorrowingsViewSet
+from config.pagination import KeysetPagination
+from config.testing import LOCMEM_CACHE
+from payments.views import PaymentViewSet
+
+User = get_user_model()
+
+ENDPOINTS = (
+    ("books", BookViewSet, "books:book-list"),
+    ("borrowings", BorrowingsViewSet, "borrowings:borrowing-list"),
+    ("payments", PaymentViewSet, "payments:payment-list"),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares page-number and cursor pagination latency on the first and "
+        "a deep page of the admin book, borrowing and payment lists. A large "
+        "dataset is seeded and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--borrowings", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=50_000)
+        parser.add_argument("--books", type=int, default=200_000)
+        parser.add_argument("--page", type=int, default=10_000)
+        parser.add_argument("--requests", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(CACHES=LOCMEM_CACHE):
+            ExplainHotQueries().seed(
+                options["users"], options["books"], options["borrowings"]
+            )
+            admin = User.objects.create_superuser(
+                email="benchmark-admin@example.com", password=None
+            )
+
+            self.stdout.write(
+                f"{'endpoint':>12} {'mode':>8} {'page':>7} "
+                f"{'p50 ms':>9} {'p95 ms':>9}"
+            )
+            for name, viewset, url_name in ENDPOINTS:
+                url = reverse(url_name)
+                deep_cursor = self.cursor_for_page(viewset, admin, options["page"])
+                runs = (
+                    ("page", 1, {}),
+                    ("page", options["page"], {"page": options["page"]}),
+                    ("cursor", 1, {"cursor": ""}),
+                    ("cursor", options["page"], {"cursor": deep_cursor}),
+                )
+                for mode, page, params in runs:
+                    p50, p95 = self.measure(
+                        viewset, url, admin, params, options["requests"]
+                    )
+                    self.stdout.write(
+                        f"{name:>12} {mode:>8} {page:>7} {p50:>9.2f} {p95:>9.2f}"
+                    )
+            transaction.set_rollback(True)
+
+    def cursor_for_page(self, viewset, user, page):
+        """The cursor a client would hold after walking to `page`."""
+        request = Request(APIRequestFactory().get("/"))
+        request.user = user
+        view = viewset(request=request, action="list", kwargs={}, format_kwarg=None)
+        queryset = view.filter_queryset(view.get_queryset())
+
+        paginator = KeysetPagination()
+        ordering = paginator.get_keyset_ordering(queryset)
+        offset = (page - 1) * paginator.page_size - 1
+        last = queryset.order_by(*ordering)[offset]
+        return paginator.encode_cursor(paginator.get_position(last, ordering))
+
+    def measure(self, viewset, url, user, params, requests):
+        factory = APIRequestFactory()
+        view = viewset.as_view({"get": "list"})
+
+        timings = []
+        for _ in range(requests):
+            request = factory.get(url, params, SERVER_NAME="localhost")
+            force_authenticate(request, user=user)
+            # Measure the query, not the book catalog cache.
+            cache.clear()
+            start = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return (
+            statistics.median(timings),
+            statistics.quantiles(timings, n=20)[-1],
+        )
@@ -0,0 +1,224 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from books.models import Book
+from borrowings.models import Borrowing
+from borrowings.views import BorrowingsViewSet
+from notifications.reminders import chunk_users, loans_for_users
+from payments.models import Payment
+from payments.views import PaymentViewSet
+
+User = get_user_model()
+
+PAGE_SIZE = 10
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs EXPLAIN on the hot borrowing, payment, reminder and user "
+        "lookups and fails if any of them sequentially scans a large table. "
+        "By default a large dataset is seeded first and rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--borrowings", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=50_000)
+        parser.add_argument("--books", type=int, default=5_000)
+        parser.add_argument(
+            "--min-rows",
+            type=int,
+            default=10_000,
+            help="Sequential scans of tables smaller than this are allowed.",
+        )
+        parser.add_argument(
+            "--no-seed",
+            action="store_true",
+            help="Explain against the data already in the database.",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options["no_seed"]:
+                self.seed(options["users"], options["books"], options["borrowings"])
+            failures = self.explain_all(options["min_rows"])
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(
+                f"Sequential scans in {len(failures)} hot queries: "
+                + ", ".join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS("No hot query uses a sequential scan."))
+
+    def seed(self, user_count, book_count, borrowing_count):
+        User.objects.bulk_create(
+            (
+                User(
+                    email=f"explain-{i}@example.com",
+                    password="!",
+                    # Most users link a Telegram chat
+                    chat_id=1_000_000 + i if i % 7 else None,
+                )
+                for i in range(user_count)
+            ),
+            batch_size=10_000,
+        )
+        Book.objects.bulk_create(
+            (
+                Book(
+                    title=f"Explain Book {i}",
+                    author=f"Author {i % 100}",
+                    cover=Book.CoverChoices.HARD,
+                    inventory=10,
+                    daily_fee=1,
+                )
+                for i in range(book_count)
+            ),
+            batch_size=10_000,
+        )
+
+        # Two years of history: 95% returned, 90% paid, one payment each.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {Borrowing._meta.db_table} (
+                    book_id, user_id, borrow_date, expected_return_date,
+                    actual_return_date, is_paid
+                )
+                SELECT
+                    books.ids[1 + i %% array_length(books.ids, 1)],
+                    users.ids[1 + (i::bigint * 7919) %% array_length(users.ids, 1)],
+                    due - 14,
+                    due,
+                    CASE WHEN i %% 20 = 0 THEN NULL ELSE due - i %% 10 END,
+                    i %% 10 <> 0
+                FROM generate_series(1, %s) AS i
+                CROSS JOIN LATERAL (
+                    SELECT CURRENT_DATE + 7 - (i %% 730) AS due
+                ) AS dates
+                CROSS JOIN (
+                    SELECT array_agg(id) AS ids FROM {User._meta.db_table}
+                ) AS users
+                CROSS JOIN (
+                    SELECT array_agg(id) AS ids FROM {Book._meta.db_table}
+                ) AS books
+                """,
+                [borrowing_count],
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {Payment._meta.db_table} (
+                    status, type, borrowing_id, session_url, session_id,
+                    money_to_pay, created_at
+                )
+                SELECT
+                    CASE WHEN is_paid THEN 'PAID' ELSE 'PENDING' END,
+                    'PAYMENT',
+                    id,
+                    'https://checkout.stripe.com/c/pay/cs_explain_' || id,
+                    'cs_explain_' || id,
+                    14,
+                    NOW()
+                FROM {Borrowing._meta.db_table}
+                """
+            )
+            for model in (User, Book, Borrowing, Payment):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+    def get_hot_queries(self):
+        today = timezone.now().date()
+        admin = User.objects.filter(is_superuser=True).first() or User(
+            is_superuser=True, is_staff=True
+        )
+        user = (
+            User.objects.filter(borrowings__isnull=False, is_superuser=False)
+            .order_by("pk")
+            .first()
+        )
+        payment = Payment.objects.exclude(session_id=None).order_by("pk").first()
+        chat_id = (
+            User.objects.exclude(chat_id=None)
+            .order_by("pk")
+            .values_list("chat_id", flat=True)
+            .first()
+        )
+        user_ids = [user_id for user_id, _ in chunk_users(today, 0, 500)]
+
+        return [
+            ("borrowings list (user)", self.list_page(BorrowingsViewSet, user)),
+            (
+                "borrowings list (user, active)",
+                self.list_page(BorrowingsViewSet, user, is_active="true"),
+            ),
+            ("borrowings list (admin)", self.list_page(BorrowingsViewSet, admin)),
+            (
+                "borrowings list (admin, active)",
+                self.list_page(BorrowingsViewSet, admin, is_active="true"),
+            ),
+            ("payments list (user)", self.list_page(PaymentViewSet, user)),
+            ("reminder user chunk", chunk_users(today, 0, 500)),
+            ("reminder loans", loans_for_users(today, user_ids)),
+            (
+                "payment by session_id",
+                Payment.objects.filter(session_id=payment and payment.session_id),
+            ),
+            ("user by chat_id", User.objects.filter(chat_id=chat_id)),
+        ]
+
+    def list_page(self, viewset, user, **params):
+        """The first page of `viewset`'s list, filtered as in a real request."""
+        request = Request(APIRequestFactory().get("/", params))
+        request.user = user
+        view = viewset(request=request, action="list", kwargs={}, format_kwarg=None)
+        return view.filter_queryset(view.get_queryset())[:PAGE_SIZE]
+
+    def explain_all(self, min_rows):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT relname, reltuples FROM pg_class")
+            table_rows = dict(cursor.fetchall())
+
+        failures = []
+        for name, queryset in self.get_hot_queries():
+            plan = self.explain(queryset)
+            nodes = list(iter_nodes(plan))
+            seq_scans = [
+                node["Relation Name"]
+                for node in nodes
+                if node["Node Type"] == "Seq Scan"
+                and table_rows.get(node["Relation Name"], 0) >= min_rows
+            ]
+            indexes = sorted(
+                {node["Index Name"] for node in nodes if "Index Name" in node}
+            )
+
+            if seq_scans:
+                failures.append(name)
+                verdict = self.style.ERROR(f"SEQ SCAN on {', '.join(seq_scans)}")
+            else:
+                verdict = self.style.SUCCESS("ok")
+            self.stdout.write(
+                f"{name:<34} cost {plan['Total Cost']:>10.1f}  {verdict}  "
+                f"{', '.join(indexes) or '-'}"
+            )
+        return failures
+
+    def explain(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+
+def iter_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from iter_nodes(child)
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import aiohttp
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from books.models import Book
+from borrowings.management.commands.explain_hot_queries import (
+    Command as ExplainHotQueries,
+)
+from borrowings.models import Borrowing, BorrowingStats
+from payments.models import Payment
+
+User = get_user_model()
+
+MODES = ("wsgi", "asgi")
+ADMIN_EMAIL = "load-test-admin@example.com"
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts gunicorn in WSGI and then ASGI mode with config/gunicorn.conf.py "
+        "and drives the book list and detail, borrowing list and payment list "
+        "endpoints with many concurrent clients, reporting requests per "
+        "second and latency percentiles for each mode."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+        parser.add_argument("--concurrency", type=int, default=500)
+        parser.add_argument("--duration", type=float, default=30)
+        parser.add_argument("--warmup", type=float, default=5)
+        parser.add_argument("--workers", type=int, help="Gunicorn workers.")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=100,
+            help="List pages are picked at random from the first PAGES.",
+        )
+        parser.add_argument(
+            "--seed",
+            action="store_true",
+            help="Seed a dataset for the run and delete it afterwards.",
+        )
+        parser.add_argument("--borrowings", type=int, default=200_000)
+        parser.add_argument("--users", type=int, default=10_000)
+        parser.add_argument("--books", type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            if Book.objects.exists() or User.objects.exists():
+                raise CommandError("--seed needs an empty database.")
+            with transaction.atomic():
+                ExplainHotQueries().seed(
+                    options["users"], options["books"], options["borrowings"]
+                )
+        User.objects.filter(email=ADMIN_EMAIL).delete()
+        admin = User.objects.create_superuser(email=ADMIN_EMAIL, password=None)
+        try:
+            self.compare(admin, options)
+        finally:
+            admin.delete()
+            if options["seed"]:
+                self.delete_seed()
+
+    def compare(self, admin, options):
+        book_ids = list(Book.objects.values_list("id", flat=True)[:1000])
+        if not book_ids:
+            raise CommandError("There are no books; pass --seed.")
+        pages = options["pages"]
+        targets = (
+            lambda: f"{reverse('books:book-list')}?page={random.randint(1, pages)}",
+            lambda: reverse("books:book-detail", args=[random.choice(book_ids)]),
+            lambda: (
+                f"{reverse('borrowings:borrowing-list')}"
+                f"?page={random.randint(1, pages)}"
+            ),
+            lambda: (
+                f"{reverse('payments:payment-list')}?page={random.randint(1, pages)}"
+            ),
+        )
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(admin)}"}
+
+        self.stdout.write(
+            f"{'mode':>6} {'requests':>9} {'rps':>8} {'p50 ms':>9} "
+            f"{'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for mode in options["modes"]:
+            base_url = f"http://127.0.0.1:{options['port']}"
+            server = self.start_server(mode, options)
+            try:
+                self.wait_until_ready(base_url)
+                asyncio.run(
+                    self.drive(base_url, targets, headers, options["warmup"], options)
+                )
+                latencies, errors, elapsed = asyncio.run(
+                    self.drive(base_url, targets, headers, options["duration"], options)
+                )
+            finally:
+                self.stop_server(server)
+
+            percentiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(
+                f"{mode:>6} {len(latencies):>9} {len(latencies) / elapsed:>8.1f} "
+                f"{statistics.median(latencies):>9.1f} {percentiles[94]:>9.1f} "
+                f"{percentiles[98]:>9.1f} {errors:>7}"
+            )
+
+    def start_server(self, mode, options):
+        env = {
+            **os.environ,
+            "SERVER_MODE": mode,
+            "GUNICORN_BIND": f"127.0.0.1:{options['port']}",
+        }
+        if options["workers"]:
+            env["WEB_CONCURRENCY"] = str(options["workers"])
+        config = os.path.join(settings.BASE_DIR, "config", "gunicorn.conf.py")
+        return subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", config, "--log-level", "error"],
+            cwd=settings.BASE_DIR,
+            env=env,
+        )
+
+    def wait_until_ready(self, base_url, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                urllib.request.urlopen(f"{base_url}{reverse('books:book-list')}")
+                return
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.2)
+        raise CommandError(f"The server at {base_url} did not start.")
+
+    def stop_server(self, server):
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    async def drive(self, base_url, targets, headers, duration, options):
+        """Run `concurrency` clients back to back for `duration` seconds."""
+        latencies, errors = [], 0
+        deadline = time.monotonic() + duration
+
+        async def client(session):
+            nonlocal errors
+            while time.monotonic() < deadline:
+                url = base_url + random.choice(targets)()
+                start = time.perf_counter()
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors += 1
+                            continue
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        connector = aiohttp.TCPConnector(limit=options["concurrency"])
+        timeout = aiohttp.ClientTimeout(total=60)
+        started = time.monotonic()
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout
+        ) as session:
+            await asyncio.gather(
+                *(client(session) for _ in range(options["concurrency"]))
+            )
+        return latencies, errors, time.monotonic() - started
+
+    def delete_seed(self):
+        with connection.cursor() as cursor:
+            for model in (Payment, BorrowingStats, Borrowing, Book, User):
+                cursor.execute(f"DELETE FROM {model._meta.db_table}")
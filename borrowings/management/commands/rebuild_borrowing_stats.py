@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from borrowings.stats import SCOPES, rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the per-user and per-book borrowing stats from borrowings "
+        "and payments and corrects any rows that have drifted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scope", choices=SCOPES, action="append")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many rows have drifted.",
+        )
+
+    def handle(self, *args, **options):
+        for scope in options["scope"] or SCOPES:
+            drifted = rebuild_stats(scope, dry_run=options["dry_run"])
+            verb = "need" if options["dry_run"] else "were"
+            self.stdout.write(f"{drifted} {scope} stats rows {verb} corrected.")
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_book_search"),
+        ("borrowings", "0004_borrowing_open_loans_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("is_paid", True)),
+                fields=["user", "-borrow_date"],
+                name="borrowing_paid_user_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("is_paid", True)),
+                fields=["-borrow_date"],
+                name="borrowing_paid_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:19
+
+import borrowings.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_book_title_id_idx"),
+        ("borrowings", "0005_borrowing_paid_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BorrowingStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("active_count", models.IntegerField(default=0)),
+                ("overdue_count", models.IntegerField(default=0)),
+                ("overdue_as_of", models.DateField(default=borrowings.models.today)),
+                (
+                    "total_paid",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "pending_fines",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "book",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="borrowing_stats",
+                        to="books.book",
+                    ),
+                ),
+                (
+                    "user",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="borrowing_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "borrowing stats",
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(
+                            models.Q(("book__isnull", True), ("user__isnull", False)),
+                            models.Q(("book__isnull", False), ("user__isnull", True)),
+                            _connector="OR",
+                        ),
+                        name="borrowing_stats_user_or_book",
+                    )
+                ],
+            },
+        ),
+    ]
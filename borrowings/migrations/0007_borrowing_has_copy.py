@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 03:30
+
+from django.db import migrations, models
+
+
+def mark_open_paid_loans(apps, schema_editor):
+    # Until now a copy was taken off the shelf once the loan was paid.
+    Borrowing = apps.get_model("borrowings", "Borrowing")
+    Borrowing.objects.filter(is_paid=True, actual_return_date__isnull=True).update(
+        has_copy=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("borrowings", "0006_borrowingstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="borrowing",
+            name="has_copy",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_open_paid_loans, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,10 @@ from rest_framework.exceptions import ValidationError
 from books.models import Book
 
 
+def today():
+    return now().date()
+
+
 class Borrowing(models.Model):
     book = models.ForeignKey(
         to=Book,
@@ -21,6 +25,29 @@ class Borrowing(models.Model):
     expected_return_date = models.DateField()
     actual_return_date = models.DateField(null=True, blank=True)
     is_paid = models.BooleanField(default=False)
+    # Whether the loan keeps a copy off the shelf, from checkout until it is
+    # returned or its payment fails.
+    has_copy = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "-borrow_date"],
+                condition=models.Q(actual_return_date__isnull=True),
+                name="borrowing_open_loans_idx",
+            ),
+            # BorrowingsViewSet lists paid loans newest first, per user or all.
+            models.Index(
+                fields=["user", "-borrow_date"],
+                condition=models.Q(is_paid=True),
+                name="borrowing_paid_user_idx",
+            ),
+            models.Index(
+                fields=["-borrow_date"],
+                condition=models.Q(is_paid=True),
+                name="borrowing_paid_date_idx",
+            ),
+        ]
 
     def clean(self):
         super().clean()
@@ -41,3 +68,47 @@ class Borrowing(models.Model):
 
     def __str__(self):
         return self.book.title
+
+
+class BorrowingStats(models.Model):
+    """
+    Denormalized loan and payment totals for one user or one book.
+
+    Kept up to date by `borrowings.stats` as loans are paid and returned and
+    fines are charged and paid; `rebuild_borrowing_stats` reconciles drift.
+    `overdue_count` counts loans due before `overdue_as_of`.
+    """
+
+    user = models.OneToOneField(
+        to=settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="borrowing_stats",
+        null=True,
+        blank=True,
+    )
+    book = models.OneToOneField(
+        to=Book,
+        on_delete=models.CASCADE,
+        related_name="borrowing_stats",
+        null=True,
+        blank=True,
+    )
+    active_count = models.IntegerField(default=0)
+    overdue_count = models.IntegerField(default=0)
+    overdue_as_of = models.DateField(default=today)
+    total_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    pending_fines = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "borrowing stats"
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(user__isnull=False, book__isnull=True)
+                | models.Q(user__isnull=True, book__isnull=False),
+                name="borrowing_stats_user_or_book",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Stats for {self.user or self.book}"
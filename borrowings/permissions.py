@@ -0,0 +1,10 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsSuperUser(BasePermission):
+    """
+    Allows access only to superusers, who see every user's borrowings.
+    """
+
+    def has_permission(self, request, view):
+        return bool(request.user and request.user.is_superuser)
@@ -1,7 +1,9 @@
+from django.db import transaction
 from rest_framework import serializers
 
+from books.inventory import take_copy
 from books.serializers import BookSerializer
-from borrowings.models import Borrowing
+from borrowings.models import Borrowing, BorrowingStats
 from payments.serializers import PaymentNestedSerializer
 
 
@@ -25,13 +27,16 @@ class BorrowingSerializer(serializers.ModelSerializer):
             )
         return attrs
 
+    @transaction.atomic
     def create(self, validated_data):
         book = validated_data.get("book")
 
-        if book.inventory <= 0:
+        # Reserve the copy before the card is charged, so two checkouts can
+        # never pay for the same last copy.
+        if not take_copy(book.id):
             raise serializers.ValidationError("This book is currently not available.")
 
-        borrowing = super().create(validated_data)
+        borrowing = super().create({**validated_data, "has_copy": True})
 
         from payments.stripe_utils import create_stripe_payment_session
 
@@ -76,3 +81,15 @@ class BorrowingEmptySerializer(serializers.ModelSerializer):
     class Meta:
         model = Borrowing
         fields = []
+
+
+class BorrowingStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BorrowingStats
+        fields = (
+            "active_count",
+            "overdue_count",
+            "total_paid",
+            "pending_fines",
+            "updated_at",
+        )
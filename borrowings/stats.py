@@ -0,0 +1,169 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, When
+from django.utils import timezone
+
+from borrowings.models import Borrowing, BorrowingStats
+from payments.models import Payment
+
+SCOPES = ("user", "book")
+
+
+def empty_totals():
+    return {
+        "active_count": 0,
+        "overdue_count": 0,
+        "total_paid": Decimal(0),
+        "pending_fines": Decimal(0),
+    }
+
+
+def apply_changes(user_id, book_id, **changes):
+    """Apply `changes` to the stats of a user and a book, creating them if needed."""
+    BorrowingStats.objects.bulk_create(
+        [BorrowingStats(user_id=user_id), BorrowingStats(book_id=book_id)],
+        ignore_conflicts=True,
+    )
+    BorrowingStats.objects.filter(Q(user_id=user_id) | Q(book_id=book_id)).update(
+        **changes, updated_at=timezone.now()
+    )
+
+
+def record_loan_returned(user_id, book_id, expected_return_date):
+    apply_changes(
+        user_id,
+        book_id,
+        active_count=F("active_count") - 1,
+        # Only rows whose overdue count already includes this loan.
+        overdue_count=Case(
+            When(
+                overdue_as_of__gt=expected_return_date,
+                then=F("overdue_count") - 1,
+            ),
+            default=F("overdue_count"),
+        ),
+    )
+
+
+def record_fine(user_id, book_id, amount):
+    apply_changes(user_id, book_id, pending_fines=F("pending_fines") + amount)
+
+
+def record_payment_paid(user_id, book_id, amount, is_fine, loan_paid):
+    """A paid payment; `loan_paid` when it is the one that starts the loan."""
+    changes = {"total_paid": F("total_paid") + amount}
+    if is_fine:
+        changes["pending_fines"] = F("pending_fines") - amount
+    if loan_paid:
+        changes["active_count"] = F("active_count") + 1
+    apply_changes(user_id, book_id, **changes)
+
+
+def overdue_loans(today):
+    return Borrowing.objects.filter(
+        is_paid=True,
+        actual_return_date__isnull=True,
+        expected_return_date__lt=today,
+    )
+
+
+def get_user_stats(user_id):
+    """
+    The user's stats row, built on first use and with the overdue count
+    brought up to date at most once a day.
+    """
+    today = timezone.now().date()
+    stats = BorrowingStats.objects.filter(user_id=user_id).first()
+    if stats is None:
+        rebuild_stats("user", ids=[user_id])
+        stats = BorrowingStats.objects.get(user_id=user_id)
+    elif stats.overdue_as_of < today:
+        stats.overdue_count = overdue_loans(today).filter(user_id=user_id).count()
+        stats.overdue_as_of = today
+        stats.save(update_fields=["overdue_count", "overdue_as_of", "updated_at"])
+    return stats
+
+
+def compute_totals(scope, ids=None):
+    """Totals per user or book id, straight from borrowings and payments."""
+    today = timezone.now().date()
+    loans = Borrowing.objects.filter(is_paid=True, actual_return_date__isnull=True)
+    payments = Payment.objects.all()
+    if ids is not None:
+        loans = loans.filter(**{f"{scope}_id__in": ids})
+        payments = payments.filter(**{f"borrowing__{scope}_id__in": ids})
+
+    totals = {}
+
+    def add(key, **values):
+        totals.setdefault(key, empty_totals()).update(values)
+
+    for key, active, overdue in loans.values_list(f"{scope}_id").annotate(
+        active=Count("id"),
+        overdue=Count("id", filter=Q(expected_return_date__lt=today)),
+    ):
+        add(key, active_count=active, overdue_count=overdue)
+    for key, paid, fines in payments.values_list(f"borrowing__{scope}_id").annotate(
+        paid=Sum("money_to_pay", filter=Q(status=Payment.Status.PAID)),
+        fines=Sum(
+            "money_to_pay",
+            filter=Q(type=Payment.Type.FINE) & ~Q(status=Payment.Status.PAID),
+        ),
+    ):
+        add(key, total_paid=paid or Decimal(0), pending_fines=fines or Decimal(0))
+    return totals
+
+
+@transaction.atomic
+def rebuild_stats(scope, ids=None, dry_run=False):
+    """
+    Recompute the stats of every user or book (or just `ids`) and correct the
+    rows that have drifted. Returns the number of rows created or corrected.
+    """
+    now = timezone.now()
+    today = now.date()
+    totals = compute_totals(scope, ids)
+
+    existing = BorrowingStats.objects.select_for_update().filter(
+        **{f"{scope}__isnull": False}
+    )
+    if ids is not None:
+        existing = existing.filter(**{f"{scope}_id__in": ids})
+
+    changed, drifted = [], 0
+    for stats in existing.iterator():
+        expected = totals.pop(getattr(stats, f"{scope}_id"), empty_totals())
+        stale = stats.overdue_as_of != today
+        if any(
+            getattr(stats, name) != value
+            for name, value in expected.items()
+            # A count from an earlier day is out of date, not wrong.
+            if not (stale and name == "overdue_count")
+        ):
+            drifted += 1
+        elif not stale:
+            continue
+        for name, value in expected.items():
+            setattr(stats, name, value)
+        stats.overdue_as_of, stats.updated_at = today, now
+        changed.append(stats)
+    if ids is not None:
+        # Requested ids get a row even without any activity.
+        for key in ids:
+            totals.setdefault(key, empty_totals())
+    created = [
+        BorrowingStats(**{f"{scope}_id": key}, **values, overdue_as_of=today)
+        for key, values in totals.items()
+    ]
+
+    if not dry_run:
+        BorrowingStats.objects.bulk_update(
+            changed,
+            [*empty_totals(), "overdue_as_of", "updated_at"],
+            batch_size=1000,
+        )
+        BorrowingStats.objects.bulk_create(
+            created, batch_size=1000, ignore_conflicts=True
+        )
+    return drifted + len(created)
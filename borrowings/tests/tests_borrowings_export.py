@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing
+
+User = get_user_model()
+
+
+class BorrowingExportTest(TestCase):
+    """Test suite for the streaming borrowings export.
+
+    This test suite covers:
+    - NDJSON and CSV output
+    - Filters applied to the export
+    - Admin-only access, matching who sees every loan
+    - Chunked reads through a server-side cursor
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com", password="adminpass123"
+        )
+        self.user = User.objects.create_user(
+            email="user@example.com", password="userpass123"
+        )
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=100,
+            daily_fee="1.00",
+        )
+        self.borrowings = [
+            Borrowing.objects.create(
+                book=self.book,
+                user=self.user,
+                expected_return_date=timezone.now().date() + timedelta(days=7),
+                is_paid=True,
+            )
+            for _ in range(5)
+        ]
+        Borrowing.objects.filter(id=self.borrowings[0].id).update(
+            actual_return_date=timezone.now().date()
+        )
+        self.url = reverse("borrowings:borrowing-export")
+        self.client.force_authenticate(user=self.admin)
+
+    def read(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        """Test that the default export is one JSON object per line."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response["Content-Type"].startswith("application/x-ndjson"))
+        self.assertIn('filename="borrowings.ndjson"', response["Content-Disposition"])
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]["user_email"], "user@example.com")
+        self.assertEqual(rows[0]["book_title"], "Test Book")
+
+    def test_export_csv(self):
+        """Test that `format=csv` streams a header and one line per loan."""
+        response = self.client.get(self.url, {"format": "csv"})
+
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(
+            sorted(int(row["id"]) for row in rows),
+            sorted(borrowing.id for borrowing in self.borrowings),
+        )
+
+    def test_export_applies_filters(self):
+        """Test that list filters narrow the export too."""
+        response = self.client.get(self.url, {"is_active": "false"})
+
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row["id"] for row in rows], [self.borrowings[0].id])
+
+    def test_export_is_staff_only(self):
+        """Test that regular users cannot export."""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_export_needs_the_list_admin_check(self):
+        """Test that staff who only list their own loans cannot export."""
+        staff = User.objects.create_user(
+            email="staff@example.com", password="staffpass123", is_staff=True
+        )
+        self.client.force_authenticate(user=staff)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_export_reads_in_chunks(self):
+        """Test that rows are fetched from a named cursor in chunks."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {"format": "csv"})
+            chunks = list(response.streaming_content)
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(context.captured_queries), 1)
@@ -0,0 +1,124 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing
+
+User = get_user_model()
+
+
+class BorrowingKeysetPaginationTest(TestCase):
+    """Test suite for cursor pagination of the borrowings list.
+
+    This test suite covers:
+    - Walking every page forwards and backwards
+    - Ties on the ordering column and NULL values
+    - Compatibility with page numbers
+    - Invalid cursors
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="userpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("borrowings:borrowing-list")
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=100,
+            daily_fee="1.00",
+        )
+        today = timezone.now().date()
+        # 25 loans over 3 borrow dates, so most rows tie on the ordering.
+        for i in range(25):
+            borrowing = Borrowing.objects.create(
+                book=self.book,
+                user=self.user,
+                expected_return_date=today + timedelta(days=7),
+                is_paid=True,
+            )
+            Borrowing.objects.filter(id=borrowing.id).update(
+                borrow_date=today - timedelta(days=i % 3),
+                actual_return_date=today if i % 4 == 0 else None,
+            )
+        self.expected = list(
+            Borrowing.objects.order_by("-borrow_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def walk(self, params):
+        response = self.client.get(self.url, {**params, "cursor": ""})
+        pages = [response.json()]
+        while pages[-1]["next"]:
+            pages.append(self.client.get(pages[-1]["next"]).json())
+        return pages
+
+    def test_cursor_pages_cover_every_row_once(self):
+        """Test that following `next` visits all rows in order."""
+        pages = self.walk({})
+
+        self.assertEqual([len(page["results"]) for page in pages], [10, 10, 5])
+        ids = [item["id"] for page in pages for item in page["results"]]
+        self.assertEqual(ids, self.expected)
+        self.assertNotIn("count", pages[0])
+        self.assertIsNone(pages[0]["previous"])
+
+    def test_previous_link_returns_the_same_page(self):
+        """Test that `previous` from the last page gives back the middle one."""
+        pages = self.walk({})
+
+        previous = self.client.get(pages[2]["previous"]).json()
+        self.assertEqual(previous["results"], pages[1]["results"])
+        first = self.client.get(previous["previous"]).json()
+        self.assertEqual(first["results"], pages[0]["results"])
+        self.assertIsNone(first["previous"])
+
+    def test_cursor_follows_ordering_with_nulls(self):
+        """Test that a nullable ordering field is paged without gaps."""
+        pages = self.walk({"ordering": "actual_return_date"})
+
+        items = [item for page in pages for item in page["results"]]
+        self.assertEqual(sorted(item["id"] for item in items), sorted(self.expected))
+        today = timezone.now().date().isoformat()
+        self.assertEqual(
+            [item["actual_return_date"] for item in items], [today] * 7 + [None] * 18
+        )
+
+    def test_cursor_page_runs_one_query(self):
+        """Test that a cursor page skips the count query."""
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {"cursor": ""})
+
+    def test_page_numbers_still_work(self):
+        """Test that requests without a cursor keep the counted pages."""
+        response = self.client.get(self.url, {"page": 3})
+
+        self.assertEqual(response.data["count"], 25)
+        self.assertEqual(
+            [item["id"] for item in response.data["results"]], self.expected[20:]
+        )
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is answered with 404."""
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_wrong_value_types(self):
+        """Test that a cursor with values of the wrong type is answered with 404."""
+        for position in (["x", "abc"], ["2025-01-01", "abc"], [[1], 1]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({"p": position, "r": False}).encode()
+            ).decode()
+            response = self.client.get(self.url, {"cursor": cursor})
+            self.assertEqual(response.status_code, 404, position)
@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.models import Payment
+
+User = get_user_model()
+
+
+class BorrowingQueryCountTest(TestCase):
+    """Test suite pinning the number of queries per borrowing endpoint.
+
+    This test suite covers:
+    - List pages for users and admins, with and without filters
+    - Borrowing detail and book return
+    - Columns loaded for the list page
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="userpass123"
+        )
+        self.admin = User.objects.create_superuser(
+            email="admin@example.com", password="adminpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("borrowings:borrowing-list")
+
+    def create_borrowings(self, count, user=None):
+        borrowings = []
+        for i in range(count):
+            book = Book.objects.create(
+                title=f"Book {i}",
+                author="Author",
+                cover="HARD",
+                inventory=5,
+                daily_fee="1.00",
+            )
+            borrowing = Borrowing.objects.create(
+                book=book,
+                user=user or self.user,
+                expected_return_date=timezone.now().date() + timedelta(days=7),
+                is_paid=True,
+            )
+            Payment.objects.create(borrowing=borrowing, money_to_pay="7.00")
+            borrowings.append(borrowing)
+        return borrowings
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertLess(response.status_code, 300)
+        return len(context.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        """Test that a full page costs a count and a select, like one row."""
+        self.create_borrowings(1)
+        with self.assertNumQueries(2):
+            self.client.get(self.list_url)
+
+        self.create_borrowings(12)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertTrue(
+            all(item["book_title"] for item in response.data["results"])
+        )
+
+    def test_filtered_list_query_counts(self):
+        """Test that filters and the admin view keep the same shape."""
+        self.create_borrowings(3)
+        self.create_borrowings(3, user=self.admin)
+
+        self.assertEqual(self.count_queries(self.list_url, {"is_active": "true"}), 2)
+        self.assertEqual(
+            self.count_queries(self.list_url, {"ordering": "expected_return_date"}), 2
+        )
+
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(self.count_queries(self.list_url), 2)
+        self.assertEqual(self.count_queries(self.list_url, {"is_user": "true"}), 2)
+
+    def test_list_loads_only_rendered_columns(self):
+        """Test that the list page does not fetch unrendered book columns."""
+        self.create_borrowings(2)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.list_url)
+
+        select = context.captured_queries[-1]["sql"].split(" FROM ")[0]
+        self.assertIn('"books_book"."title"', select)
+        self.assertNotIn('"books_book"."inventory"', select)
+        self.assertNotIn('"borrowings_borrowing"."is_paid"', select)
+
+    def test_detail_query_count(self):
+        """Test that a detail view loads the borrowing and its book at once."""
+        (borrowing,) = self.create_borrowings(1)
+        url = reverse("borrowings:borrowing-detail", args=[borrowing.id])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data["book"]["title"], "Book 0")
+
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(self.count_queries(url), 1)
+
+    def test_book_return_query_count(self):
+        """Test that a return does not reload the user or the book."""
+        (borrowing,) = self.create_borrowings(1)
+        url = reverse("borrowings:borrowing-book-return", args=[borrowing.id])
+
+        # Load, then close the loan, restock and update the user and book
+        # stats inside a savepoint.
+        with self.assertNumQueries(7):
+            self.client.post(url)
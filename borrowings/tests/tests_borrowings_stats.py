@@ -0,0 +1,164 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from books.models import Book
+from borrowings.models import Borrowing, BorrowingStats
+from borrowings.stats import rebuild_stats
+from payments.events import complete_checkout_session
+from payments.models import Payment
+
+User = get_user_model()
+
+
+@patch("payments.tasks.create_checkout_session.delay")
+class BorrowingStatsTest(TestCase):
+    """Test suite for the per-user and per-book borrowing stats.
+
+    This test suite covers:
+    - Incremental updates on payment, return and fines
+    - The summary endpoint and its daily overdue refresh
+    - Rebuilding drifted rows
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.today = timezone.now().date()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="userpass123", is_verified=True
+        )
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee="2.00",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.summary_url = reverse("user:summary")
+
+    def borrow(self, session_id, days=7):
+        borrowing = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=self.today + timedelta(days=days),
+        )
+        Payment.objects.create(
+            borrowing=borrowing, money_to_pay="14.00", session_id=session_id
+        )
+        complete_checkout_session({"id": session_id})
+        return borrowing
+
+    def stats(self, **scope):
+        return BorrowingStats.objects.get(**scope)
+
+    def test_paid_loans_are_counted(self, _):
+        """Test that a completed checkout adds an active loan and the payment."""
+        self.borrow("cs_1")
+        self.borrow("cs_2")
+        complete_checkout_session({"id": "cs_2"})
+
+        for scope in ({"user": self.user}, {"book": self.book}):
+            stats = self.stats(**scope)
+            self.assertEqual(stats.active_count, 2)
+            self.assertEqual(stats.total_paid, Decimal("28.00"))
+
+    def test_overdue_return_and_fine(self, _):
+        """Test that an overdue return moves the loan to a pending fine."""
+        borrowing = self.borrow("cs_1")
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            expected_return_date=self.today - timedelta(days=3)
+        )
+        BorrowingStats.objects.update(overdue_as_of=self.today - timedelta(days=3))
+        self.assertEqual(self.client.get(self.summary_url).data["overdue_count"], 1)
+
+        url = reverse("borrowings:borrowing-book-return", args=[borrowing.id])
+        self.client.post(url)
+
+        stats = self.stats(user=self.user)
+        self.assertEqual((stats.active_count, stats.overdue_count), (0, 0))
+        self.assertEqual(stats.pending_fines, Decimal("12.00"))
+        self.assertEqual(self.stats(book=self.book).pending_fines, Decimal("12.00"))
+
+        fine = Payment.objects.get(type=Payment.Type.FINE)
+        Payment.objects.filter(pk=fine.pk).update(session_id="cs_fine")
+        complete_checkout_session({"id": "cs_fine"})
+
+        stats = self.stats(user=self.user)
+        self.assertEqual(stats.pending_fines, Decimal("0.00"))
+        self.assertEqual(stats.total_paid, Decimal("26.00"))
+        self.assertEqual(stats.active_count, 0)
+
+    def test_unpaid_return_leaves_counts(self, _):
+        """Test that returning a loan that was never paid does not uncount it."""
+        self.borrow("cs_1")
+        unpaid = Borrowing.objects.create(
+            book=self.book,
+            user=self.user,
+            expected_return_date=self.today + timedelta(days=7),
+        )
+
+        url = reverse("borrowings:borrowing-book-return", args=[unpaid.id])
+        self.client.post(url)
+
+        for scope in ({"user": self.user}, {"book": self.book}):
+            self.assertEqual(self.stats(**scope).active_count, 1)
+
+    def test_summary_is_one_query(self, _):
+        """Test that an up-to-date summary is read with a single query."""
+        self.borrow("cs_1")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.summary_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["active_count"], 1)
+        self.assertEqual(response.data["total_paid"], "14.00")
+
+    def test_summary_refreshes_overdue_once_a_day(self, _):
+        """Test that loans falling overdue are counted on the next day's read."""
+        borrowing = self.borrow("cs_1")
+        Borrowing.objects.filter(pk=borrowing.pk).update(
+            expected_return_date=self.today - timedelta(days=1)
+        )
+        BorrowingStats.objects.update(overdue_as_of=self.today - timedelta(days=1))
+
+        self.assertEqual(self.client.get(self.summary_url).data["overdue_count"], 1)
+        with self.assertNumQueries(1):
+            self.client.get(self.summary_url)
+
+    def test_summary_for_new_user(self, _):
+        """Test that a user without stats gets a zeroed row."""
+        response = self.client.get(self.summary_url)
+        self.assertEqual(response.data["active_count"], 0)
+        self.assertEqual(response.data["pending_fines"], "0.00")
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.summary_url).status_code, 401)
+
+    def test_rebuild_corrects_drift(self, _):
+        """Test that the rebuild command repairs drifted rows."""
+        self.borrow("cs_1")
+        self.borrow("cs_2")
+        BorrowingStats.objects.update(active_count=7, total_paid=0)
+
+        self.assertEqual(rebuild_stats("user", dry_run=True), 1)
+        self.assertEqual(self.stats(user=self.user).active_count, 7)
+
+        out = StringIO()
+        call_command("rebuild_borrowing_stats", stdout=out)
+        self.assertIn("1 user stats rows were corrected", out.getvalue())
+        self.assertIn("1 book stats rows were corrected", out.getvalue())
+        for scope in ({"user": self.user}, {"book": self.book}):
+            stats = self.stats(**scope)
+            self.assertEqual(stats.active_count, 2)
+            self.assertEqual(stats.total_paid, Decimal("28.00"))
+
+        self.assertEqual(rebuild_stats("user"), 0)
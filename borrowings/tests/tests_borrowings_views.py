@@ -63,6 +63,7 @@ class BorrowingsViewSetTest(TestCase):
             user=self.user,
             expected_return_date=timezone.now().date() + timedelta(days=7),
             is_paid=True,
+            has_copy=True,
         )
 
     def test_list_borrowings_unauthorized(self):
@@ -87,14 +88,9 @@ class BorrowingsViewSetTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["id"], self.borrowing.id)
 
-    @patch("payments.stripe_utils.stripe.checkout.Session.create")
-    def test_create_borrowing(self, mock_stripe):
-        """Test creating a new borrowing"""
-        # Mock Stripe response
-        mock_stripe.return_value = type(
-            "obj", (object,), {"url": "http://test.com", "id": "test_session_id"}
-        )
-
+    @patch("payments.tasks.create_checkout_session.delay")
+    def test_create_borrowing(self, mock_create_session):
+        """Test creating a new borrowing with a pending payment"""
         self.client.force_authenticate(user=self.user)
         url = reverse("borrowings:borrowing-list")
         data = {
@@ -103,10 +99,22 @@ class BorrowingsViewSetTest(TestCase):
                 timezone.now().date() + timedelta(days=7)
             ).isoformat(),
         }
-        response = self.client.post(url, data)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Borrowing.objects.count(), 2)
 
+        # The copy is reserved before the card is charged
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 4)
+        self.assertTrue(Borrowing.objects.get(pk=response.data["id"]).has_copy)
+
+        # The Checkout session is created in the background
+        payment = response.data["payments"][0]
+        self.assertEqual(payment["status"], "PENDING")
+        self.assertEqual(payment["session_url"], "")
+        self.assertEqual(mock_create_session.call_args[0][0], payment["id"])
+
     def test_book_return_own(self):
         """Test that users can return their own books"""
         self.client.force_authenticate(user=self.user)
@@ -122,6 +130,64 @@ class BorrowingsViewSetTest(TestCase):
         self.borrowing.refresh_from_db()
         self.assertIsNotNone(self.borrowing.actual_return_date)
 
+    @patch("payments.tasks.create_checkout_session.delay")
+    def test_create_borrowing_of_the_last_copy(self, mock_create_session):
+        """Test that only one of two checkouts of the last copy succeeds"""
+        Book.objects.filter(id=self.book.id).update(inventory=1)
+        self.client.force_authenticate(user=self.user)
+        url = reverse("borrowings:borrowing-list")
+        data = {
+            "book": self.book.id,
+            "expected_return_date": (
+                timezone.now().date() + timedelta(days=7)
+            ).isoformat(),
+        }
+        first = self.client.post(url, data)
+        second = self.client.post(url, data)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Borrowing.objects.count(), 2)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_book_return_without_a_copy(self):
+        """Test that returning a loan that holds no copy does not restock"""
+        Borrowing.objects.filter(id=self.borrowing.id).update(has_copy=False)
+        self.client.force_authenticate(user=self.user)
+        url = reverse("borrowings:borrowing-book-return", args=[self.borrowing.id])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 5)
+
+    def test_book_return_twice_restocks_once(self):
+        """Test that a repeated return is rejected and restocks only once"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("borrowings:borrowing-book-return", args=[self.borrowing.id])
+        self.client.post(url)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 6)
+
+    @patch("borrowings.views.create_stripe_payment_session")
+    def test_book_return_overdue_creates_fine(self, mock_fine):
+        """Test that an overdue return restocks the book and charges a fine"""
+        Borrowing.objects.filter(id=self.borrowing.id).update(
+            expected_return_date=timezone.now().date() - timedelta(days=2)
+        )
+        self.client.force_authenticate(user=self.user)
+        url = reverse("borrowings:borrowing-book-return", args=[self.borrowing.id])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 6)
+        self.assertEqual(mock_fine.call_args.kwargs["overdue_days"], 2)
+
     def test_filter_borrowings_by_active(self):
         """Test filtering borrowings by active status"""
         self.client.force_authenticate(user=self.user)
@@ -138,3 +204,12 @@ class BorrowingsViewSetTest(TestCase):
         response = self.client.get(f"{url}?is_active=false")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["results"]), 1)
+
+    def test_filter_borrowings_by_active_invalid_value(self):
+        """Test that an unknown is_active value matches no borrowings"""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("borrowings:borrowing-list")
+
+        response = self.client.get(f"{url}?is_active=maybe")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 0)
@@ -5,7 +5,7 @@ from borrowings.views import BorrowingsViewSet
 
 
 router = DefaultRouter()
-router.register("borrowings", BorrowingsViewSet)
+router.register("borrowings", BorrowingsViewSet, basename="borrowing")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, status
@@ -8,7 +9,14 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from books.inventory import release_copy
+from books.serializers import BookSerializer
 from borrowings.models import Borrowing
+from borrowings.permissions import IsSuperUser
+from borrowings.stats import record_loan_returned
+from config.async_views import AsyncListModelMixin, AsyncViewSetMixin
+from config.exports import ExportMixin
+from notifications.loans import invalidate_loans_on_commit
 from borrowings.serializers import (
     BorrowingDetailSerializer,
     BorrowingSerializer,
@@ -17,10 +25,36 @@ from borrowings.serializers import (
 )
 from payments.stripe_utils import create_stripe_payment_session
 
+LIST_FIELDS = (
+    "id",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    "book__title",
+)
+DETAIL_FIELDS = (
+    "id",
+    "user",
+    "borrow_date",
+    "expected_return_date",
+    "actual_return_date",
+    *(f"book__{field}" for field in BookSerializer.Meta.fields),
+)
+# The owner check, the restock and a possible fine.
+RETURN_FIELDS = (
+    "id",
+    "user",
+    "expected_return_date",
+    "is_paid",
+    "book__daily_fee",
+)
+
 
 class BorrowingsViewSet(
+    AsyncViewSetMixin,
+    ExportMixin,
     mixins.CreateModelMixin,
-    mixins.ListModelMixin,
+    AsyncListModelMixin,
     mixins.RetrieveModelMixin,
     GenericViewSet,
 ):
@@ -28,14 +62,28 @@ class BorrowingsViewSet(
 
     filter_backends = [DjangoFilterBackend, OrderingFilter]
 
+    export_filename = "borrowings"
+    export_permission_classes = [IsSuperUser]
+    export_fields = (
+        ("id", "id"),
+        ("user_id", "user_id"),
+        ("user_email", "user__email"),
+        ("book_id", "book_id"),
+        ("book_title", "book__title"),
+        ("borrow_date", "borrow_date"),
+        ("expected_return_date", "expected_return_date"),
+        ("actual_return_date", "actual_return_date"),
+    )
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         if not request.user.is_superuser:
-            if instance.user != request.user:
+            if instance.user_id != request.user.id:
                 raise PermissionDenied(
                     "You do not have permission to view this borrowing."
                 )
-        return super().retrieve(request, *args, **kwargs)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -54,11 +102,27 @@ class BorrowingsViewSet(
 
         is_active = self.request.query_params.get("is_active", None)
         if is_active:
+            is_active = is_active.lower()
+            if is_active not in ("true", "false"):
+                return queryset.none()
             queryset = queryset.filter(
-                id__in=[obj.id for obj in queryset if obj.is_active() == is_active]
+                actual_return_date__isnull=(is_active == "true")
             )
 
-        return queryset
+        return self.shape_queryset(queryset)
+
+    def shape_queryset(self, queryset):
+        """Load exactly the rows and columns the action's serializer renders."""
+        if self.action == "list":
+            return queryset.select_related("book").only(*LIST_FIELDS)
+        if self.action == "retrieve":
+            return queryset.select_related("book").only(*DETAIL_FIELDS)
+        if self.action == "book_return":
+            return queryset.select_related("book").only(*RETURN_FIELDS)
+        if self.action == "export":
+            # Projected with `values_list` by ExportMixin.
+            return queryset
+        return queryset.prefetch_related("payments")
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -73,29 +137,39 @@ class BorrowingsViewSet(
     def book_return(self, request, pk=None):
         borrowing = self.get_object()
 
-        if request.user != borrowing.user:
+        if borrowing.user_id != request.user.id:
             return Response(
                 {"detail": "You are not the owner of this book"},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        if borrowing.actual_return_date is not None:
-            return Response(
-                {"detail": "Book already returned."}, status=status.HTTP_400_BAD_REQUEST
-            )
-
-        borrowing.book.inventory += 1
-        borrowing.book.save()
-
-        borrowing.actual_return_date = timezone.now()
-        borrowing.save()
-
-        if borrowing.actual_return_date > borrowing.expected_return_date:
-            overdue_days = (
-                borrowing.actual_return_date - borrowing.expected_return_date
-            ).days
-            create_stripe_payment_session(
-                borrowing, request, is_fine=True, overdue_days=overdue_days
-            )
+        return_date = timezone.now().date()
+        with transaction.atomic():
+            # Only the request that actually closes the loan restocks the book.
+            returned = Borrowing.objects.filter(
+                pk=borrowing.pk, actual_return_date__isnull=True
+            ).update(actual_return_date=return_date)
+            if not returned:
+                return Response(
+                    {"detail": "Book already returned."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            # Only loans that kept a copy off the shelf put one back.
+            release_copy(borrowing.pk, borrowing.book_id)
+            # Loans only count as active once paid.
+            if borrowing.is_paid:
+                record_loan_returned(
+                    borrowing.user_id, borrowing.book_id, borrowing.expected_return_date
+                )
+            invalidate_loans_on_commit(pk=borrowing.user_id)
+            borrowing.actual_return_date = return_date
+
+            if borrowing.actual_return_date > borrowing.expected_return_date:
+                overdue_days = (
+                    borrowing.actual_return_date - borrowing.expected_return_date
+                ).days
+                create_stripe_payment_session(
+                    borrowing, request, is_fine=True, overdue_days=overdue_days
+                )
 
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,168 @@
+import asyncio
+import weakref
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+from django.http import Http404
+from django.utils.decorators import classonlymethod
+from rest_framework.mixins import ListModelMixin, RetrieveModelMixin
+from rest_framework.response import Response
+
+
+_request_slots = weakref.WeakKeyDictionary()
+
+
+def request_slots():
+    """The semaphore bounding this event loop's requests in `dispatch`."""
+    loop = asyncio.get_running_loop()
+    if loop not in _request_slots:
+        _request_slots[loop] = asyncio.Semaphore(settings.ASYNC_DB_CONCURRENCY)
+    return _request_slots[loop]
+
+
+async def release_slot(slots):
+    """Hand the request's connection back, then its slot."""
+    try:
+        await sync_to_async(close_old_connections)()
+    finally:
+        slots.release()
+
+
+async def hold_slot(content, slots):
+    """Stream `content` while still holding the request's slot."""
+    try:
+        if hasattr(content, "__aiter__"):
+            async for chunk in content:
+                yield chunk
+        else:
+            chunks = iter(content)
+            while (chunk := await sync_to_async(next)(chunks, None)) is not None:
+                yield chunk
+    finally:
+        await release_slot(slots)
+
+
+class AsyncViewSetMixin:
+    """
+    Dispatches a viewset's requests as an async view under ASGI.
+
+    With `SERVER_MODE=asgi` the view is a coroutine: `alist` and the other
+    `a`-prefixed handlers stand in for their action and are awaited on the
+    event loop, so an ASGI worker keeps serving other requests while their
+    queries run. The remaining handlers, and the authentication, permission
+    and throttle checks, run in a thread through `sync_to_async`. Under WSGI
+    the viewset dispatches synchronously, as DRF does, without any thread
+    hops.
+
+    Each request dispatched from an event loop holds its own database
+    connection, so under ASGI at most `ASYNC_DB_CONCURRENCY` requests per
+    worker are dispatched at once, each closing its connection on the way
+    out, and the rest wait their turn. A streaming response keeps its slot
+    until the last chunk is sent.
+    """
+
+    async_dispatch = False
+
+    @classonlymethod
+    def as_view(cls, actions=None, **initkwargs):
+        if settings.SERVER_MODE != "asgi":
+            return super().as_view(actions, **initkwargs)
+        view = super().as_view(actions, async_dispatch=True, **initkwargs)
+        return markcoroutinefunction(view)
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.async_dispatch:
+            return super().dispatch(request, *args, **kwargs)
+        return self.adispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        if not isinstance(request, ASGIRequest):
+            return await self.dispatch_request(request, *args, **kwargs)
+        slots = request_slots()
+        await slots.acquire()
+        try:
+            response = await self.dispatch_request(request, *args, **kwargs)
+        except BaseException:
+            await release_slot(slots)
+            raise
+        if response.streaming:
+            response.streaming_content = hold_slot(response.streaming_content, slots)
+        else:
+            # Hand the connection back before the slot, not once the
+            # response has been sent.
+            await release_slot(slots)
+        return response
+
+    async def dispatch_request(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            handler = getattr(self, f"a{self.action}", handler)
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncListModelMixin(ListModelMixin):
+    """`ListModelMixin` reading its page with the async ORM under ASGI."""
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+
+class AsyncRetrieveModelMixin(RetrieveModelMixin):
+    """`RetrieveModelMixin` fetching its object with the async ORM under ASGI."""
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**filter_kwargs)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -19,11 +19,31 @@ app.conf.result_backend = "redis://localhost:6379/0"
 app.autodiscover_tasks()
 
 # Configure periodic tasks
+BOOK_POPULARITY_REFRESH_SECONDS = float(
+    os.getenv("BOOK_POPULARITY_REFRESH_SECONDS", 300)
+)
+
 app.conf.beat_schedule = {
     "check-book-returns": {
         "task": "notifications.tasks.check_and_send_return_reminders",
         "schedule": crontab(hour=9, minute=0),  # Run at 9:00 AM every day
     },
+    "refresh-book-popularity": {
+        "task": "books.tasks.refresh_book_popularity",
+        "schedule": BOOK_POPULARITY_REFRESH_SECONDS,
+        # A refresh still queued when the next one is due is dropped.
+        "options": {"expires": BOOK_POPULARITY_REFRESH_SECONDS},
+    },
+    "flush-expired-tokens": {
+        "task": "user.tasks.flush_expired_tokens",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "send-queued-emails": {
+        "task": "user.tasks.send_queued_emails",
+        # Picks up emails whose task was lost or ran out of retries.
+        "schedule": 60,
+        "options": {"expires": 60},
+    },
 }
 
 # Windows-specific settings
@@ -0,0 +1,21 @@
+"""
+Gunicorn settings for `gunicorn -c config/gunicorn.conf.py`.
+
+`SERVER_MODE=wsgi` (the default) runs `config.wsgi` on sync workers;
+`SERVER_MODE=asgi` runs `config.asgi` on uvicorn workers, where the async
+book, borrowing and payment read views share an event loop per worker.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+backlog = 2048
+
+if os.getenv("SERVER_MODE", "wsgi") == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
@@ -0,0 +1,317 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+
+from django.core.exceptions import (
+    FieldDoesNotExist,
+    ImproperlyConfigured,
+    ValidationError,
+)
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"Cannot put {type(value).__name__} in a cursor")
+
+
+def flip(term):
+    return term[1:] if term.startswith("-") else f"-{term}"
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Page numbers by default; `?cursor=` switches to keyset pagination.
+
+    A cursor carries the ordering values of the row it points at, so each
+    page is a single range query that an index can serve however deep the
+    client has scrolled, and no `COUNT(*)` is run. The queryset's ordering,
+    including anything `OrderingFilter` applied, is extended with the primary
+    key as a tie-breaker so rows sharing a value are never skipped or
+    repeated. NULLs are placed as PostgreSQL sorts them: last ascending,
+    first descending.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_query_description = (
+        "Keyset pagination cursor. Pass it empty for the first page, then "
+        "follow the `next` and `previous` links. Responses have no `count`."
+    )
+    invalid_cursor_message = "Invalid cursor."
+
+    use_cursor = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(
+                self.with_tie_breaker(queryset), request, view
+            )
+
+        queryset = self.get_cursor_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.get_cursor_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """`paginate_queryset` for async views, with its queries awaited."""
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return await self.apaginate_numbered(
+                self.with_tie_breaker(queryset), request, view
+            )
+
+        queryset = self.get_cursor_queryset(queryset, request)
+        if queryset is None:
+            return None
+        return self.get_cursor_page([row async for row in queryset])
+
+    async def apaginate_numbered(self, queryset, request, view=None):
+        """`PageNumberPagination.paginate_queryset` with awaited queries."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            )
+        bottom = (number - 1) * paginator.per_page
+        top = bottom + paginator.per_page
+        if top + paginator.orphans >= paginator.count:
+            top = paginator.count
+        rows = [row async for row in queryset[bottom:top]]
+        self.page = paginator._get_page(rows, number, paginator)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def with_tie_breaker(self, queryset):
+        # The tie-breaker keeps rows from moving between numbered pages too.
+        try:
+            return queryset.order_by(*self.get_keyset_ordering(queryset))
+        except ImproperlyConfigured:
+            return queryset
+
+    def get_cursor_queryset(self, queryset, request):
+        """The slice holding the cursor's page plus one row to spot a next page."""
+        self.request = request
+        self.display_page_controls = False
+        self.limit = self.get_page_size(request)
+        if not self.limit:
+            return None
+
+        self.ordering = self.get_keyset_ordering(queryset)
+        self.position, self.reverse = self.decode_cursor(request, queryset)
+        ordering = self.ordering
+        if self.reverse:
+            ordering = [flip(term) for term in self.ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(
+                self.after(queryset.model, ordering, self.position)
+            )
+        return queryset[: self.limit + 1]
+
+    def get_cursor_page(self, rows):
+        has_more = len(rows) > self.limit
+        rows = rows[: self.limit]
+        if self.reverse:
+            rows.reverse()
+
+        if self.reverse:
+            self.has_next, self.has_previous = self.position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        self.first_position = self.get_position(rows[0]) if rows else None
+        self.last_position = self.get_position(rows[-1]) if rows else None
+        if not rows:
+            self.has_next = self.has_previous = False
+        return rows
+
+    def get_keyset_ordering(self, queryset):
+        """The queryset's ordering as field names, ending in the primary key."""
+        model = queryset.model
+        terms = list(queryset.query.order_by or model._meta.ordering)
+        if not all(isinstance(term, str) for term in terms) or "?" in terms:
+            raise ImproperlyConfigured(
+                f"{self.__class__.__name__} needs an ordering by field names."
+            )
+
+        pk_name = model._meta.pk.name
+        terms = [
+            term.replace("pk", pk_name) if term.lstrip("-") == "pk" else term
+            for term in terms
+        ]
+        if pk_name not in (term.lstrip("-") for term in terms):
+            descending = bool(terms) and terms[-1].startswith("-")
+            terms.append(f"-{pk_name}" if descending else pk_name)
+        return terms
+
+    def get_position(self, obj, ordering=None):
+        """The values of `obj` for each ordering term, ready for a cursor."""
+        position = []
+        for term in ordering or self.ordering:
+            value = obj
+            *path, name = term.lstrip("-").split("__")
+            for part in path:
+                value = getattr(value, part)
+            try:
+                name = value._meta.get_field(name).attname
+            except (AttributeError, FieldDoesNotExist):
+                pass
+            position.append(getattr(value, name))
+        return position
+
+    def after(self, model, ordering, position):
+        """Rows that come strictly after `position` in `ordering`."""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for term, value in zip(ordering, position):
+            field = term.lstrip("-")
+            descending = term.startswith("-")
+            nullable = self.is_nullable(model, field)
+
+            if value is None:
+                beyond = Q(**{f"{field}__isnull": False}) if descending else None
+                same = Q(**{f"{field}__isnull": True})
+            else:
+                beyond = Q(**{f"{field}__{'lt' if descending else 'gt'}": value})
+                if nullable and not descending:
+                    beyond |= Q(**{f"{field}__isnull": True})
+                same = Q(**{field: value})
+
+            if beyond is not None:
+                condition |= equal & beyond
+            equal &= same
+
+        # A plain range on the leading column lets an index start the scan
+        # at the cursor instead of filtering every row before it.
+        field, value = ordering[0].lstrip("-"), position[0]
+        if value is not None and not self.is_nullable(model, field):
+            lookup = "lte" if ordering[0].startswith("-") else "gte"
+            condition = Q(**{f"{field}__{lookup}": value}) & condition
+        return condition
+
+    def is_nullable(self, model, field):
+        *path, name = field.split("__")
+        try:
+            for part in path:
+                model = model._meta.get_field(part).related_model
+            return model._meta.get_field(name).null
+        except (AttributeError, FieldDoesNotExist):
+            # Annotations such as the search `rank` are never NULL.
+            return False
+
+    def encode_cursor(self, position, reverse=False):
+        data = json.dumps({"p": position, "r": reverse}, default=encode_value)
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    def get_output_field(self, queryset, field):
+        """The model field or annotation an ordering term sorts by."""
+        *path, name = field.split("__")
+        model = queryset.model
+        try:
+            for part in path:
+                model = model._meta.get_field(part).related_model
+            return model._meta.get_field(name)
+        except (AttributeError, FieldDoesNotExist):
+            annotation = queryset.query.annotations.get(field)
+            return annotation and annotation.output_field
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params[self.cursor_query_param]
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, reverse = data["p"], data["r"]
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        # A tampered cursor must not reach the database with the wrong types.
+        values = []
+        for term, value in zip(self.ordering, position):
+            field = self.get_output_field(queryset, term.lstrip("-"))
+            if value is not None and field is not None:
+                try:
+                    value = field.to_python(value)
+                except (TypeError, ValueError, ValidationError):
+                    raise NotFound(self.invalid_cursor_message)
+            values.append(value)
+        return values, bool(reverse)
+
+    def get_cursor_link(self, position, reverse):
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(position, reverse)
+        )
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self.get_cursor_link(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous:
+            return None
+        return self.get_cursor_link(self.first_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema["required"] = ["results"]
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": self.cursor_query_description,
+                "schema": {"type": "string"},
+            }
+        ]
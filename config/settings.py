@@ -22,6 +22,45 @@ STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", None)
 STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY", None)
 DOMAIN = os.getenv("DOMAIN", "http://127.0.0.1:8000")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", None)
+# Base URL of a stub Stripe API, e.g. http://localhost:12111
+STRIPE_API_BASE = os.getenv("STRIPE_API_BASE", None)
+STRIPE_SESSION_MAX_RETRIES = int(os.getenv("STRIPE_SESSION_MAX_RETRIES", 5))
+
+# TELEGRAM
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", None)
+# Base URL of a self-hosted or stub Bot API server, e.g. http://localhost:8081
+TELEGRAM_API_SERVER = os.getenv("TELEGRAM_API_SERVER", None)
+TELEGRAM_BROADCAST_CONCURRENCY = int(os.getenv("TELEGRAM_BROADCAST_CONCURRENCY", 20))
+# Messages per second across all chats (0 disables the limit)
+TELEGRAM_BROADCAST_RATE = float(os.getenv("TELEGRAM_BROADCAST_RATE", 30))
+# Minimum seconds between two messages to the same chat
+TELEGRAM_CHAT_INTERVAL = float(os.getenv("TELEGRAM_CHAT_INTERVAL", 1))
+TELEGRAM_BROADCAST_CHUNK_SIZE = int(os.getenv("TELEGRAM_BROADCAST_CHUNK_SIZE", 500))
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", 3))
+# Login state shared by bot processes, and seconds an unfinished login is kept
+TELEGRAM_FSM_REDIS_URL = os.getenv("TELEGRAM_FSM_REDIS_URL", "redis://redis:6379/2")
+TELEGRAM_FSM_TTL = int(os.getenv("TELEGRAM_FSM_TTL", 600))
+# Threads the bot checks passwords on
+TELEGRAM_AUTH_WORKERS = int(os.getenv("TELEGRAM_AUTH_WORKERS", 2))
+# "polling" for a single bot process, "webhook" to run replicas behind nginx
+TELEGRAM_BOT_MODE = os.getenv("TELEGRAM_BOT_MODE", "polling")
+# Public base URL Telegram posts updates to, e.g. https://library.example.com
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL", None)
+TELEGRAM_WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook/")
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", None)
+TELEGRAM_WEBHOOK_HOST = os.getenv("TELEGRAM_WEBHOOK_HOST", "0.0.0.0")
+TELEGRAM_WEBHOOK_PORT = int(os.getenv("TELEGRAM_WEBHOOK_PORT", 8080))
+# Concurrent connections Telegram opens to the webhook, across replicas
+TELEGRAM_WEBHOOK_MAX_CONNECTIONS = int(
+    os.getenv("TELEGRAM_WEBHOOK_MAX_CONNECTIONS", 40)
+)
+# Worker tasks per replica, and updates each may have waiting
+TELEGRAM_WEBHOOK_WORKERS = int(os.getenv("TELEGRAM_WEBHOOK_WORKERS", 16))
+TELEGRAM_WEBHOOK_QUEUE_SIZE = int(os.getenv("TELEGRAM_WEBHOOK_QUEUE_SIZE", 100))
+# Seconds a /loans, /overdue or /fines reply is cached unless a loan changes
+TELEGRAM_LOANS_CACHE_TTL = int(os.getenv("TELEGRAM_LOANS_CACHE_TTL", 60))
+# Users per reminder batch task
+REMINDER_CHUNK_SIZE = int(os.getenv("REMINDER_CHUNK_SIZE", 500))
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -46,11 +85,20 @@ USE_X_FORWARDED_HOST = True
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND")
-EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "False") == "True"
 EMAIL_HOST = os.getenv("EMAIL_HOST")
 EMAIL_PORT = os.getenv("EMAIL_PORT")
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", 10))
+# Queued emails sent per SMTP connection by the `send_queued_emails` task
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 100))
+# Emails per second a worker sends; 0 disables the limit
+EMAIL_RATE = float(os.getenv("EMAIL_RATE", 10))
+# Deliveries tried before a queued email is left unsent
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+# Seconds before emails claimed by a worker that never finished are sent again
+EMAIL_CLAIM_TIMEOUT = int(os.getenv("EMAIL_CLAIM_TIMEOUT", 600))
 
 
 # Application definition
@@ -62,6 +110,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt.token_blacklist",
     "drf_spectacular",
@@ -118,9 +167,31 @@ DATABASES = {
         "OPTIONS": {
             "client_encoding": "UTF8",
         },
+        # Seconds a connection is reused across requests or tasks (0 closes it
+        # after each one); checked before reuse so a dropped one is replaced
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+        # Behind pgbouncer in transaction mode a cursor can't outlive its
+        # transaction, so exports fetch with client-side cursors instead
+        "DISABLE_SERVER_SIDE_CURSORS": os.getenv("DB_PGBOUNCER", "False") == "True",
     }
 }
 
+# `wsgi` (sync workers) or `asgi` (uvicorn workers), see config/gunicorn.conf.py
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+
+# A psycopg connection pool per process, shared by all threads. Always on
+# under ASGI, where each async request runs its queries on a new thread that
+# must not keep a persistent connection
+if os.getenv("DB_POOL", "False") == "True" or SERVER_MODE == "asgi":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 20)),
+        # Seconds to wait for a free connection before the request fails
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -174,22 +245,57 @@ REST_FRAMEWORK = {
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.OrderingFilter",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "config.pagination.KeysetPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "books.permissions.IsAdminOrReadOnly",
     ],
 }
 
+# Requests per ASGI worker that async views dispatch at once, each holding a
+# database connection; keep workers * this below PostgreSQL's max_connections
+ASYNC_DB_CONCURRENCY = int(os.getenv("ASYNC_DB_CONCURRENCY", 20))
+
+# Rows fetched per server-side cursor round trip by the `export` actions
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+# Expired token_blacklist rows deleted per statement by `flush_expired_tokens`
+TOKEN_FLUSH_BATCH_SIZE = int(os.getenv("TOKEN_FLUSH_BATCH_SIZE", 5000))
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
     "ROTATE_REFRESH_TOKENS": True,
+    "BLACKLIST_AFTER_ROTATION": True,
+    # Tokens carry the user's flags, so requests skip loading the user row
+    "TOKEN_OBTAIN_SERIALIZER": "user.tokens.ClaimsTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "user.tokens.ClaimsTokenRefreshSerializer",
+    # Blacklisted refresh tokens live in the cache rather than PostgreSQL
+    "TOKEN_VERIFY_SERIALIZER": "user.tokens.ClaimsTokenVerifySerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "user.tokens.ClaimsTokenBlacklistSerializer",
+}
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_REDIS_URL", "redis://redis:6379/1"),
+        "OPTIONS": {
+            "socket_connect_timeout": 1,
+            "socket_timeout": 1,
+        },
+    }
 }
 
+# Seconds a rendered book list/detail response stays cached
+BOOK_CACHE_TIMEOUT = int(os.getenv("BOOK_CACHE_TIMEOUT", 300))
+
+# Rows sent to PostgreSQL per COPY by `books.imports.BookImporter`
+BOOK_IMPORT_BATCH_SIZE = int(os.getenv("BOOK_IMPORT_BATCH_SIZE", 10_000))
+
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
@@ -0,0 +1,4 @@
+"""Settings overrides shared by the test suites and benchmarks."""
+
+# A per-process cache, so cache-backed views run without Redis.
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
@@ -1,69 +1,139 @@
-import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
+
 import django
 from dotenv import load_dotenv
-from aiogram import Bot, Dispatcher, types, F
-from aiogram.filters import Command
-from django.contrib.auth import authenticate
+from aiogram import Dispatcher, F, Router, types
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.redis import RedisStorage
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.db import close_old_connections
 from asgiref.sync import sync_to_async
 
+from notifications.loans import COMMANDS, forget_replies, get_reply
+from notifications.runtime import create_bot
+
 load_dotenv()
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 django.setup()
 
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-bot = Bot(token=TELEGRAM_BOT_TOKEN)
-dp = Dispatcher()
+# Password hashing is deliberately slow; a login burst queues here instead of
+# tying up the executor that the bot's other database calls run on.
+auth_executor = ThreadPoolExecutor(
+    max_workers=settings.TELEGRAM_AUTH_WORKERS, thread_name_prefix="bot-auth"
+)
+
+
+class AuthForm(StatesGroup):
+    email = State()
+    password = State()
+
 
-auth_sessions = {}
+def check_credentials(email, password):
+    # Runs on an `auth_executor` thread, outside `recycle_db_connection`.
+    close_old_connections()
+    try:
+        return authenticate(username=email, password=password)
+    finally:
+        close_old_connections()
 
 
-@dp.message(Command("start"))
-async def start_handler(message: types.Message):
-    auth_sessions[message.chat.id] = {"step": "email"}
+async def start_handler(message: types.Message, state: FSMContext):
+    await state.set_state(AuthForm.email)
     await message.answer("👤 Please enter your email:")
 
 
-@dp.message(F.text)
-async def handle_auth(message: types.Message):
-    chat_id = message.chat.id
-    session = auth_sessions.get(chat_id)
-
-    if not session:
-        await message.answer("Please type /start to begin authentication.")
-        return
-
-    # Step 1: receive username
-    if session["step"] == "email":
-        session["email"] = message.text.strip()
-        session["step"] = "password"
-        await message.answer("🔐 Now enter your password:")
-
-    # Step 2: receive password and authenticate
-    elif session["step"] == "password":
-        email = session["email"]
-        password = message.text.strip()
-
-        user = await sync_to_async(authenticate)(username=email, password=password)
-
-        if user:
-            user.chat_id = chat_id
-            await sync_to_async(user.save)()
-            if not user.is_staff:
-                await message.answer(
-                    "✅ Auth successful. You will now receive notifications about your books and borrowings."
-                )
-            else:
-                await message.answer(
-                    "✅ Auth successful. Since you are admin, you will receive notifications about all "
-                    " books and borrowings changes in database🗣️."
-                )
-        else:
-            await message.answer("❌ Invalid credentials. Type /start to try again.")
+async def handle_email(message: types.Message, state: FSMContext):
+    await state.update_data(email=message.text.strip())
+    await state.set_state(AuthForm.password)
+    await message.answer("🔐 Now enter your password:")
+
+
+async def handle_password(message: types.Message, state: FSMContext):
+    email = (await state.get_data())["email"]
+    await state.clear()
 
-        auth_sessions.pop(chat_id, None)
+    user = await sync_to_async(
+        check_credentials, thread_sensitive=False, executor=auth_executor
+    )(email, message.text.strip())
+
+    if user:
+        await get_user_model().objects.filter(pk=user.pk).aupdate(
+            chat_id=message.chat.id
+        )
+        # Replies cached before the login are for no user or the previous one.
+        await forget_replies(message.chat.id)
+        if not user.is_staff:
+            await message.answer(
+                "✅ Auth successful. You will now receive notifications about your books and borrowings."
+            )
+        else:
+            await message.answer(
+                "✅ Auth successful. Since you are admin, you will receive notifications about all "
+                " books and borrowings changes in database🗣️."
+            )
+    else:
+        await message.answer("❌ Invalid credentials. Type /start to try again.")
+
+
+async def loans_handler(message: types.Message, command: CommandObject):
+    await message.answer(await get_reply(message.chat.id, command.command))
+
+
+async def handle_unknown(message: types.Message):
+    await message.answer("Please type /start to begin authentication.")
+
+
+def create_router():
+    router = Router()
+    router.message.register(start_handler, Command("start"))
+    router.message.register(loans_handler, Command(*COMMANDS))
+    router.message.register(handle_email, AuthForm.email, F.text)
+    router.message.register(handle_password, AuthForm.password, F.text)
+    router.message.register(handle_unknown, F.text)
+    return router
+
+
+async def recycle_db_connection(handler, event, data):
+    """
+    Check the database connection around each update as Django does around a
+    request, so the long-running bot replaces one the server dropped.
+    """
+    await sync_to_async(close_old_connections)()
+    try:
+        return await handler(event, data)
+    finally:
+        await sync_to_async(close_old_connections)()
+
+
+def create_dispatcher(storage=None):
+    """
+    A dispatcher keeping login state in Redis, so any bot process can take
+    the next message of a login another one started.
+    """
+    dp = Dispatcher(
+        storage=storage
+        or RedisStorage.from_url(
+            settings.TELEGRAM_FSM_REDIS_URL,
+            state_ttl=settings.TELEGRAM_FSM_TTL,
+            data_ttl=settings.TELEGRAM_FSM_TTL,
+        )
+    )
+    dp.update.outer_middleware(recycle_db_connection)
+    dp.include_router(create_router())
+    return dp
 
 
 async def main():
-    await dp.start_polling(bot)
+    dp = create_dispatcher()
+    bot = create_bot()
+    try:
+        # Telegram refuses getUpdates while a webhook is registered.
+        await bot.delete_webhook()
+        await dp.start_polling(bot)
+    finally:
+        await dp.storage.close()
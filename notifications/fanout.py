@@ -0,0 +1,185 @@
+import asyncio
+import logging
+
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+)
+from django.conf import settings
+
+from notifications.runtime import runtime
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+
+def iter_recipient_batches(chunk_size=None, exclude=()):
+    """Stream chat ids of linked users in lists of at most `chunk_size`."""
+    chunk_size = chunk_size or settings.TELEGRAM_BROADCAST_CHUNK_SIZE
+    exclude = set(exclude)
+    chat_ids = (
+        User.objects.exclude(chat_id__isnull=True)
+        .order_by()
+        .values_list("chat_id", flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    batch = []
+    for chat_id in chat_ids:
+        if chat_id in exclude:
+            continue
+        batch.append(chat_id)
+        if len(batch) == chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class RateLimiter:
+    """Spaces out sends so that at most `rate` start per second."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self._next_slot = 0.0
+        self._lock = None
+
+    async def wait(self):
+        if not self.interval:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class ChatThrottle:
+    """Keeps at least `interval` seconds between messages to one chat."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._next_slot = {}
+
+    async def wait(self, chat_id):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot.get(chat_id, 0.0))
+        self._next_slot[chat_id] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def delay(self, chat_id, seconds):
+        now = asyncio.get_running_loop().time()
+        self._next_slot[chat_id] = max(self._next_slot.get(chat_id, 0.0), now + seconds)
+
+    def prune(self):
+        now = asyncio.get_running_loop().time()
+        self._next_slot = {
+            chat_id: slot for chat_id, slot in self._next_slot.items() if slot > now
+        }
+
+
+class Broadcaster:
+    """
+    Sends one text to many chats through a shared bot with bounded
+    concurrency, a global rate limit and per-chat throttling.
+    Flood-control errors are retried after the delay Telegram asks for.
+    """
+
+    def __init__(
+        self,
+        bot,
+        concurrency=None,
+        rate=None,
+        chat_interval=None,
+        max_retries=None,
+    ):
+        self.bot = bot
+        self.concurrency = concurrency or settings.TELEGRAM_BROADCAST_CONCURRENCY
+        self.limiter = RateLimiter(
+            settings.TELEGRAM_BROADCAST_RATE if rate is None else rate
+        )
+        self.throttle = ChatThrottle(
+            settings.TELEGRAM_CHAT_INTERVAL if chat_interval is None else chat_interval
+        )
+        self.max_retries = (
+            settings.TELEGRAM_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.stats = {"sent": 0, "failed": 0, "retried": 0}
+
+    async def send_many(self, chat_ids, text):
+        await self.send_each((chat_id, text) for chat_id in chat_ids)
+
+    async def send_each(self, messages):
+        """Send every `(chat_id, text)` pair in `messages`."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded_send(chat_id, text):
+            async with semaphore:
+                await self.send(chat_id, text)
+
+        await asyncio.gather(*(bounded_send(*message) for message in messages))
+        self.throttle.prune()
+
+    async def send(self, chat_id, text):
+        for attempt in range(self.max_retries + 1):
+            await self.throttle.wait(chat_id)
+            await self.limiter.wait()
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text)
+            except TelegramRetryAfter as e:
+                if attempt == self.max_retries:
+                    break
+                self.stats["retried"] += 1
+                self.throttle.delay(chat_id, e.retry_after)
+                await asyncio.sleep(e.retry_after)
+            except TelegramNetworkError:
+                if attempt == self.max_retries:
+                    break
+                self.stats["retried"] += 1
+                await asyncio.sleep(2**attempt)
+            except (TelegramForbiddenError, TelegramBadRequest):
+                logger.warning(f"Telegram rejected message to chat_id={chat_id}")
+                break
+            except Exception:
+                logger.exception(
+                    f"Failed to send telegram message to chat_id={chat_id}"
+                )
+                break
+            else:
+                self.stats["sent"] += 1
+                return True
+
+        self.stats["failed"] += 1
+        return False
+
+
+def broadcast(text, chat_ids=(), include_linked_users=True):
+    """
+    Send `text` to `chat_ids` and, optionally, every user with a linked chat.
+    Recipients are streamed from the database in the calling thread and each
+    chunk is handed to the worker's async runtime.
+    """
+    broadcaster = Broadcaster(runtime.bot)
+    chat_ids = list(dict.fromkeys(chat_ids))
+    if chat_ids:
+        runtime.run(broadcaster.send_many(chat_ids, text))
+    if include_linked_users:
+        for batch in iter_recipient_batches(exclude=chat_ids):
+            runtime.run(broadcaster.send_many(batch, text))
+    return broadcaster.stats
+
+
+def send_batch(messages):
+    """Send a list of `(chat_id, text)` pairs through the worker's runtime."""
+    broadcaster = Broadcaster(runtime.bot)
+    runtime.run(broadcaster.send_each(messages))
+    return broadcaster.stats
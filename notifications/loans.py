@@ -0,0 +1,180 @@
+"""
+Replies to the bot's /loans, /overdue and /fines commands. Each is built
+from one query joining the chat's user to their loans or fines, and cached
+per chat until the user's borrowings or payments change, or the chat is
+linked to an account.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import FilteredRelation, Q
+from django.utils import timezone
+
+from payments.models import Payment
+from user.models import User
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = ("loans", "overdue", "fines")
+REPLY_KEY = "notifications:loans:{chat_id}:{command}"
+# Rows listed per reply, well inside Telegram's 4096 character limit.
+REPLY_LIMIT = 30
+
+NOT_LINKED = "Please type /start to link this chat to your account first."
+
+
+def linked_rows(chat_id, relation, condition, *fields, order_by):
+    """
+    The chat's user left joined to `relation` filtered by `condition`, as
+    rows of `fields` on it: none when the chat is not linked, one of NULLs
+    when nothing matches.
+    """
+    return (
+        User.objects.filter(chat_id=chat_id)
+        .annotate(row=FilteredRelation(relation, condition=condition))
+        .order_by(f"row__{order_by}")
+        .values_list(*(f"row__{field}" for field in fields))[: REPLY_LIMIT + 1]
+    )
+
+
+def render(rows, title, empty, line, footer=None):
+    if not rows:
+        return NOT_LINKED
+    # Rows of NULLs (no match, or per unrelated join on the way) sort last.
+    rows = [row for row in rows if row[0] is not None]
+    if not rows:
+        return empty
+    lines = [title, *(line(*row) for row in rows[:REPLY_LIMIT])]
+    if len(rows) > REPLY_LIMIT:
+        lines.append(f"…showing the first {REPLY_LIMIT}.")
+    elif footer is not None:
+        lines.append(footer(rows))
+    return "\n".join(lines)
+
+
+async def loans_reply(chat_id):
+    rows = linked_rows(
+        chat_id,
+        "borrowings",
+        Q(borrowings__actual_return_date__isnull=True),
+        "id",
+        "book__title",
+        "expected_return_date",
+        "is_paid",
+        order_by="expected_return_date",
+    )
+    return render(
+        [row async for row in rows],
+        "📚 Your loans:",
+        "📚 You have no open loans.",
+        lambda pk, title, due, is_paid: (
+            f"• {title}, due {due}" + ("" if is_paid else " (awaiting payment)")
+        ),
+    )
+
+
+async def overdue_reply(chat_id):
+    today = timezone.now().date()
+    # The loans `borrowings.stats.overdue_loans` counts.
+    rows = linked_rows(
+        chat_id,
+        "borrowings",
+        Q(
+            borrowings__is_paid=True,
+            borrowings__actual_return_date__isnull=True,
+            borrowings__expected_return_date__lt=today,
+        ),
+        "id",
+        "book__title",
+        "expected_return_date",
+        order_by="expected_return_date",
+    )
+    return render(
+        [row async for row in rows],
+        "⏰ Overdue loans:",
+        "✅ You have no overdue loans.",
+        lambda pk, title, due: (
+            f"• {title}, due {due} ({(today - due).days} days overdue)"
+        ),
+    )
+
+
+async def fines_reply(chat_id):
+    rows = linked_rows(
+        chat_id,
+        "borrowings__payments",
+        Q(borrowings__payments__type=Payment.Type.FINE)
+        & ~Q(borrowings__payments__status=Payment.Status.PAID),
+        "id",
+        "borrowing__book__title",
+        "money_to_pay",
+        "session_url",
+        order_by="created_at",
+    )
+    return render(
+        [row async for row in rows],
+        "💸 Unpaid fines:",
+        "✅ You have no unpaid fines.",
+        lambda pk, title, amount, url: (
+            f"• {title}: ${amount}, {url or 'payment link on its way'}"
+        ),
+        footer=lambda rows: f"Total: ${sum(row[2] for row in rows)}",
+    )
+
+
+REPLIES = {
+    "loans": loans_reply,
+    "overdue": overdue_reply,
+    "fines": fines_reply,
+}
+
+
+async def get_reply(chat_id, command):
+    """The reply to `command` in a chat, from the cache when possible."""
+    key = REPLY_KEY.format(chat_id=chat_id, command=command)
+    try:
+        reply = await cache.aget(key)
+    except Exception:
+        logger.exception("Bot loan reply cache is unavailable")
+        return await REPLIES[command](chat_id)
+    if reply is None:
+        reply = await REPLIES[command](chat_id)
+        try:
+            await cache.aset(key, reply, timeout=settings.TELEGRAM_LOANS_CACHE_TTL)
+        except Exception:
+            logger.exception("Failed to cache a bot loan reply")
+    return reply
+
+
+async def forget_replies(chat_id):
+    """Expire a chat's cached replies, e.g. once it is linked to a user."""
+    try:
+        await cache.adelete_many(
+            [REPLY_KEY.format(chat_id=chat_id, command=command) for command in COMMANDS]
+        )
+    except Exception:
+        logger.exception("Failed to invalidate bot loan replies")
+
+
+def invalidate_loans(**lookup):
+    """Expire the cached replies of the linked users matching `lookup`."""
+    try:
+        chat_ids = User.objects.filter(chat_id__isnull=False, **lookup).values_list(
+            "chat_id", flat=True
+        )
+        cache.delete_many(
+            [
+                REPLY_KEY.format(chat_id=chat_id, command=command)
+                for chat_id in chat_ids
+                for command in COMMANDS
+            ]
+        )
+    except Exception:
+        logger.exception("Failed to invalidate bot loan replies")
+
+
+def invalidate_loans_on_commit(**lookup):
+    transaction.on_commit(lambda: invalidate_loans(**lookup))
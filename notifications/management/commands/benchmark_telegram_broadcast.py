@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.fanout import Broadcaster
+from notifications.runtime import create_bot
+from notifications.stub_bot_api import StubBotAPI
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures Telegram broadcast throughput against a local stub "
+        "Bot API server, optionally next to the one-loop-per-message baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--recipients", type=int, default=5000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=0,
+            help="Global messages per second (0 = unlimited).",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.02,
+            help="Simulated Bot API latency in seconds.",
+        )
+        parser.add_argument(
+            "--flood-every",
+            type=int,
+            default=0,
+            help="Answer every Nth request with 429 retry_after=1.",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=int,
+            default=200,
+            help="Messages to send the old way, one event loop each (0 = skip).",
+        )
+
+    def handle(self, *args, **options):
+        loop = asyncio.new_event_loop()
+        stub = StubBotAPI(
+            latency=options["latency"], flood_every=options["flood_every"]
+        )
+        base_url = loop.run_until_complete(stub.start())
+        try:
+            if options["baseline"]:
+                rate = self.run_baseline(loop, base_url, options["baseline"])
+                self.stdout.write(f"baseline:  {rate:10.1f} msg/s")
+
+            rate, stats = loop.run_until_complete(self.run_broadcast(base_url, options))
+            self.stdout.write(f"broadcast: {rate:10.1f} msg/s {stats}")
+        finally:
+            loop.run_until_complete(stub.stop())
+            loop.close()
+
+    def run_baseline(self, loop, base_url, count):
+        async def send_one(chat_id):
+            bot = create_bot(api_server=base_url)
+            try:
+                await bot.send_message(chat_id=chat_id, text="benchmark")
+            finally:
+                await bot.session.close()
+
+        # The stub has to keep serving while each message gets its own
+        # short-lived loop, so every send runs in a separate thread.
+        start = time.perf_counter()
+        for chat_id in range(1, count + 1):
+            future = loop.run_in_executor(None, asyncio.run, send_one(chat_id))
+            loop.run_until_complete(future)
+        return count / (time.perf_counter() - start)
+
+    async def run_broadcast(self, base_url, options):
+        bot = create_bot(connection_limit=options["concurrency"], api_server=base_url)
+        broadcaster = Broadcaster(
+            bot,
+            concurrency=options["concurrency"],
+            rate=options["rate"],
+            chat_interval=0,
+        )
+        chat_ids = range(1, options["recipients"] + 1)
+        try:
+            start = time.perf_counter()
+            await broadcaster.send_many(chat_ids, "benchmark")
+            elapsed = time.perf_counter() - start
+        finally:
+            await bot.session.close()
+        return broadcaster.stats["sent"] / elapsed, broadcaster.stats
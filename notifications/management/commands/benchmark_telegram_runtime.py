@@ -0,0 +1,100 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from notifications.runtime import AsyncRuntime, create_bot
+from notifications.stub_bot_api import StubBotAPI
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports send_telegram_message throughput against a local stub Bot API, "
+        "before (event loop per call) and after (persistent async runtime)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Concurrent task threads, as with `celery worker --pool=threads`.",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.01,
+            help="Simulated Bot API latency in seconds.",
+        )
+
+    def handle(self, *args, **options):
+        stub = StubBotAPI(latency=options["latency"])
+        server = AsyncRuntime()
+        base_url = server.run(stub.start())
+        self.stdout.write(f"{'mode':>8} {'threads':>8} {'msg/s':>10} {'failed':>8}")
+        try:
+            for threads in sorted({1, options["threads"]}):
+                self.report(
+                    "before",
+                    threads,
+                    self.legacy_sender(base_url),
+                    options["messages"],
+                )
+
+                runtime = AsyncRuntime()
+                runtime._bot = create_bot(api_server=base_url)
+                try:
+                    self.report(
+                        "after",
+                        threads,
+                        self.runtime_sender(runtime),
+                        options["messages"],
+                    )
+                finally:
+                    runtime.stop()
+        finally:
+            server.run(stub.stop())
+            server.stop()
+
+    def report(self, mode, threads, send, count):
+        failed = 0
+
+        def call(chat_id):
+            nonlocal failed
+            try:
+                send(chat_id, "benchmark")
+            except Exception:
+                failed += 1
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(call, range(1, count + 1)))
+        rate = (count - failed) / (time.perf_counter() - start)
+        self.stdout.write(f"{mode:>8} {threads:>8} {rate:>10.1f} {failed:>8}")
+
+    def legacy_sender(self, base_url):
+        """The per-call loop handling send_telegram_message used before."""
+        bot = create_bot(api_server=base_url)
+
+        def send_message(chat_id, text):
+            async def send():
+                await bot.send_message(chat_id=chat_id, text=text)
+
+            try:
+                loop = asyncio.get_event_loop()
+                if loop.is_closed():
+                    raise RuntimeError
+            except (RuntimeError, AssertionError):
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+            loop.run_until_complete(send())
+
+        return send_message
+
+    def runtime_sender(self, runtime):
+        def send_message(chat_id, text):
+            runtime.run(runtime.bot.send_message(chat_id=chat_id, text=text))
+
+        return send_message
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import logging
+import statistics
+import time
+from collections import defaultdict
+
+import aiohttp
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiohttp import web
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from notifications.bot import create_dispatcher
+from notifications.runtime import create_bot
+from notifications.stub_bot_api import StubBotAPI
+from notifications.webhook import SECRET_HEADER, make_app
+
+# Far above real chat ids, so replayed logins never touch real ones.
+FIRST_CHAT_ID = 10**12
+
+
+def synthetic_updates(chats, rounds):
+    """Each chat starts a login and sends its email `rounds` times."""
+    updates = []
+    for round_ in range(rounds):
+        for text in ("/start", f"replay-{round_}@example.com"):
+            for chat in range(chats):
+                chat_id = FIRST_CHAT_ID + chat
+                update_id = len(updates) + 1
+                updates.append(
+                    {
+                        "update_id": update_id,
+                        "message": {
+                            "message_id": update_id,
+                            "date": int(time.time()),
+                            "chat": {"id": chat_id, "type": "private"},
+                            "from": {
+                                "id": chat_id,
+                                "is_bot": False,
+                                "first_name": "Replay",
+                            },
+                            "text": text,
+                        },
+                    }
+                )
+    return updates
+
+
+def by_chat(updates):
+    """Group updates by chat, keeping each chat's updates in order."""
+    chats = defaultdict(list)
+    for update in updates:
+        message = update.get("message") or update.get("edited_message") or {}
+        chats[message.get("chat", {}).get("id", update["update_id"])].append(update)
+    return list(chats.values())
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays Telegram updates against the bot's webhook, the way Telegram "
+        "delivers them (in order per chat, up to --concurrency at once), and "
+        "reports updates per second per replica. Without --url a replica is "
+        "started in-process, answering through a local stub Bot API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chats", type=int, default=200)
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument(
+            "--file", help="JSON lines of recorded updates to replay instead."
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
+            help="Requests in flight, as Telegram's max_connections.",
+        )
+        parser.add_argument("--workers", type=int, default=None)
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.01,
+            help="Simulated Bot API latency in seconds.",
+        )
+        parser.add_argument(
+            "--redis",
+            action="store_true",
+            help="Keep login state in TELEGRAM_FSM_REDIS_URL instead of memory.",
+        )
+        parser.add_argument(
+            "--url", help="Webhook of running replicas, e.g. through nginx."
+        )
+        parser.add_argument(
+            "--replicas",
+            type=int,
+            default=1,
+            help="Replicas serving --url, to report the rate of each.",
+        )
+        parser.add_argument(
+            "--secret", default=settings.TELEGRAM_WEBHOOK_SECRET or "replay-secret"
+        )
+
+    def handle(self, *args, **options):
+        # aiogram logs every handled update at INFO.
+        logging.getLogger("aiogram.event").setLevel(logging.WARNING)
+        if options["file"]:
+            with open(options["file"]) as lines:
+                updates = [json.loads(line) for line in lines if line.strip()]
+        else:
+            updates = synthetic_updates(options["chats"], options["rounds"])
+        if options["url"]:
+            asyncio.run(self.run_remote(updates, options))
+        else:
+            asyncio.run(self.run_local(updates, options))
+
+    async def run_local(self, updates, options):
+        stub = StubBotAPI(latency=options["latency"])
+        bot = create_bot(api_server=await stub.start())
+        dp = create_dispatcher(None if options["redis"] else MemoryStorage())
+        app = make_app(dp, bot, options["secret"], workers=options["workers"])
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        url = f"http://127.0.0.1:{port}{settings.TELEGRAM_WEBHOOK_PATH}"
+        try:
+            start = time.perf_counter()
+            latencies, retries = await self.replay(url, updates, options)
+            accepted = time.perf_counter() - start
+            await app["workers"].join()
+            handled = time.perf_counter() - start
+        finally:
+            await runner.cleanup()
+            await bot.session.close()
+            await dp.storage.close()
+            await stub.stop()
+
+        if app["workers"].handled != len(updates):
+            raise CommandError(
+                f"Handled {app['workers'].handled} of {len(updates)} updates."
+            )
+        self.report(len(updates), accepted, latencies, retries, 1)
+        self.stdout.write(
+            f"handled: {len(updates) / handled:,.0f} updates/s per replica with "
+            f"{len(app['workers'].queues)} workers, {stub.delivered} replies sent"
+        )
+
+    async def run_remote(self, updates, options):
+        start = time.perf_counter()
+        latencies, retries = await self.replay(options["url"], updates, options)
+        self.report(
+            len(updates),
+            time.perf_counter() - start,
+            latencies,
+            retries,
+            options["replicas"],
+        )
+
+    async def replay(self, url, updates, options):
+        latencies = []
+        retries = 0
+        slots = asyncio.Semaphore(options["concurrency"])
+        headers = {SECRET_HEADER: options["secret"]}
+
+        async def send_chat(session, chat_updates):
+            nonlocal retries
+            for update in chat_updates:
+                while True:
+                    async with slots:
+                        start = time.perf_counter()
+                        async with session.post(url, json=update) as response:
+                            status = response.status
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    if status == 200:
+                        break
+                    if status != 503:
+                        raise CommandError(f"Webhook answered {status}.")
+                    # A full replica; Telegram would deliver it again later.
+                    retries += 1
+                    await asyncio.sleep(0.05)
+
+        connector = aiohttp.TCPConnector(limit=options["concurrency"])
+        async with aiohttp.ClientSession(
+            connector=connector, headers=headers
+        ) as session:
+            await asyncio.gather(
+                *(send_chat(session, chat) for chat in by_chat(updates))
+            )
+        return latencies, retries
+
+    def report(self, count, elapsed, latencies, retries, replicas):
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"accepted: {count} updates in {elapsed:.2f}s, "
+            f"{count / elapsed / replicas:,.0f} updates/s per replica "
+            f"over {replicas}, p50 {statistics.median(latencies):.2f} ms, "
+            f"p99 {percentiles[98]:.2f} ms, {retries} retried after 503"
+        )
@@ -1,11 +1,22 @@
 import asyncio
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from notifications.bot import main
 
 
 
 class Command(BaseCommand):
     help = "Starts the Telegram bot"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--mode",
+            choices=("polling", "webhook"),
+            default=settings.TELEGRAM_BOT_MODE,
+        )
+
     def handle(self, *args, **options):
+        if options["mode"] == "webhook":
+            from notifications.webhook import main
+        else:
+            from notifications.bot import main
         asyncio.run(main())
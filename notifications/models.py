@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class ReminderRun(models.Model):
+    """Progress of the daily return-reminder job, one row per day."""
+
+    run_date = models.DateField(unique=True)
+    last_user_id = models.BigIntegerField(default=0)
+    batches = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Reminders for {self.run_date}"
@@ -0,0 +1,110 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+
+from borrowings.models import Borrowing
+
+
+def reminder_queryset(today):
+    """Open loans due tomorrow or already overdue."""
+    tomorrow = today + timedelta(days=1)
+    return Borrowing.objects.filter(
+        Q(expected_return_date=tomorrow) | Q(expected_return_date__lt=today),
+        actual_return_date__isnull=True,
+    )
+
+
+def chunk_users(today, after_user_id, chunk_size):
+    """
+    `(user_id, chat_id)` of the next `chunk_size` users with a linked chat
+    and a loan to remind about, after `after_user_id`.
+    """
+    return (
+        reminder_queryset(today)
+        .filter(user_id__gt=after_user_id, user__chat_id__isnull=False)
+        .order_by("user_id")
+        .values_list("user_id", "user__chat_id")
+        .distinct()[:chunk_size]
+    )
+
+
+def loans_for_users(today, user_ids):
+    # The chat ids come from `chunk_users`, so users need no join here.
+    return (
+        reminder_queryset(today)
+        .filter(user_id__in=user_ids)
+        .order_by("user_id", "expected_return_date", "id")
+        .values_list("user_id", "book__title", "expected_return_date")
+    )
+
+
+def build_digest(due_tomorrow, overdue):
+    """
+    Build one message for a user from `(title, expected_return_date)` pairs.
+    A single loan keeps the wording of the individual reminders.
+    """
+    parts = []
+
+    if len(due_tomorrow) == 1:
+        title, due_date = due_tomorrow[0]
+        parts.append(
+            f"📚 Reminder: Your book '{title}' is due tomorrow!\n"
+            f"Please return it to the library by {due_date}."
+        )
+    elif due_tomorrow:
+        titles = "\n".join(f"- '{title}'" for title, _ in due_tomorrow)
+        parts.append(
+            f"📚 Reminder: {len(due_tomorrow)} of your books are due tomorrow:\n"
+            f"{titles}\n"
+            f"Please return them to the library by {due_tomorrow[0][1]}."
+        )
+
+    if len(overdue) == 1:
+        title, due_date = overdue[0]
+        parts.append(
+            f"⚠️ Overdue Notice: Your book '{title}' is overdue!\n"
+            f"It was due on {due_date}.\n"
+            f"Please return it to the library as soon as possible."
+        )
+    elif overdue:
+        titles = "\n".join(
+            f"- '{title}' (due on {due_date})" for title, due_date in overdue
+        )
+        parts.append(
+            f"⚠️ Overdue Notice: {len(overdue)} of your books are overdue:\n"
+            f"{titles}\n"
+            f"Please return them to the library as soon as possible."
+        )
+
+    return "\n\n".join(parts)
+
+
+def iter_digest_chunks(today, after_user_id=0, chunk_size=None):
+    """
+    Yield `(messages, last_user_id)` for consecutive chunks of users with
+    loans due tomorrow or overdue, keyset-paginated on user id so that a
+    user's loans always land in the same chunk. `messages` is a list of
+    `[chat_id, text]` digests, one per user.
+    """
+    chunk_size = chunk_size or settings.REMINDER_CHUNK_SIZE
+    tomorrow = today + timedelta(days=1)
+
+    while True:
+        chat_ids = dict(chunk_users(today, after_user_id, chunk_size))
+        if not chat_ids:
+            return
+
+        due_tomorrow = defaultdict(list)
+        overdue = defaultdict(list)
+        for user_id, title, due_date in loans_for_users(today, list(chat_ids)):
+            target = due_tomorrow if due_date == tomorrow else overdue
+            target[user_id].append((title, due_date))
+
+        messages = [
+            [chat_id, build_digest(due_tomorrow[user_id], overdue[user_id])]
+            for user_id, chat_id in chat_ids.items()
+        ]
+        after_user_id = max(chat_ids)
+        yield messages, after_user_id
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+import threading
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def create_bot(connection_limit=None, api_server=None):
+    """Build a Bot whose single aiohttp session is shared by every send."""
+    session_kwargs = {
+        "limit": connection_limit or settings.TELEGRAM_BROADCAST_CONCURRENCY
+    }
+    api_server = api_server or settings.TELEGRAM_API_SERVER
+    if api_server:
+        session_kwargs["api"] = TelegramAPIServer.from_base(api_server)
+    return Bot(
+        token=settings.TELEGRAM_BOT_TOKEN,
+        session=AiohttpSession(**session_kwargs),
+    )
+
+
+class AsyncRuntime:
+    """
+    A long-lived event loop running in a daemon thread, plus one bot with a
+    pooled HTTP session bound to that loop. Synchronous code (Celery tasks,
+    the ORM) submits coroutines to it instead of spinning up its own loop.
+    """
+
+    def __init__(self):
+        self._reset()
+        # A forked child inherits the attributes but not the loop thread.
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.loop = None
+        self._thread = None
+        self._bot = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self.loop is not None
+
+    def start(self):
+        with self._lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=loop.run_forever, name="telegram-runtime", daemon=True
+            )
+            self._thread.start()
+            self.loop = loop
+
+    def stop(self):
+        with self._lock:
+            if self.loop is None:
+                return
+            loop, self.loop = self.loop, None
+            bot, self._bot = self._bot, None
+            try:
+                if bot is not None:
+                    asyncio.run_coroutine_threadsafe(bot.session.close(), loop).result(
+                        timeout=10
+                    )
+            finally:
+                loop.call_soon_threadsafe(loop.stop)
+                self._thread.join(timeout=10)
+                loop.close()
+                self._thread = None
+
+    @property
+    def bot(self):
+        self.start()
+        if self._bot is None:
+            with self._lock:
+                if self._bot is None:
+                    self._bot = create_bot()
+        return self._bot
+
+    def submit(self, coroutine):
+        """Schedule `coroutine` on the runtime loop and return a Future."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine, timeout=None):
+        """Run `coroutine` on the runtime loop and wait for its result."""
+        return self.submit(coroutine).result(timeout=timeout)
+
+
+runtime = AsyncRuntime()
+
+
+@worker_process_init.connect
+def start_runtime(**kwargs):
+    runtime.start()
+    logger.info("Telegram async runtime started")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_runtime(**kwargs):
+    runtime.stop()
@@ -1,9 +1,11 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from books.models import Book
+from books.signals import books_imported
 from borrowings.models import Borrowing
-from notifications.tasks import send_telegram_message
-from user.models import User
+from notifications.loans import invalidate_loans_on_commit
+from notifications.tasks import broadcast_telegram_message
+from payments.models import Payment
 
 
 @receiver(post_save, sender=Borrowing)
@@ -21,9 +23,7 @@ def borrowing_created(sender, instance, created, **kwargs):
             f"Book ID: {instance.book.id}\n"
             f"User ID: {user.id}"
         )
-        send_telegram_message.delay(user.chat_id, text)
-        for user in User.objects.exclude(chat_id__isnull=True):
-            send_telegram_message.delay(user.chat_id, text)
+        broadcast_telegram_message.delay(text, chat_ids=[user.chat_id])
 
 
 @receiver(post_save, sender=Book)
@@ -47,5 +47,19 @@ def book_created_or_updated(sender, instance, created, **kwargs):
             f"Daily Fee: ${instance.daily_fee}"
         )
 
-    for user in User.objects.exclude(chat_id__isnull=True):
-        send_telegram_message.delay(user.chat_id, text)
+    broadcast_telegram_message.delay(text)
+
+
+@receiver(books_imported)
+def books_imported_summary(sender, created, **kwargs):
+    broadcast_telegram_message.delay(f"📚 New Books Imported:\nCount: {created}")
+
+
+@receiver(post_save, sender=Borrowing)
+def borrowing_saved(sender, instance, **kwargs):
+    invalidate_loans_on_commit(pk=instance.user_id)
+
+
+@receiver(post_save, sender=Payment)
+def payment_saved(sender, instance, **kwargs):
+    invalidate_loans_on_commit(borrowings=instance.borrowing_id)
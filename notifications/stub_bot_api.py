@@ -0,0 +1,75 @@
+"""
+Minimal stand-in for the Telegram Bot API, used to measure broadcast
+throughput offline. Point a bot at it through TELEGRAM_API_SERVER.
+"""
+
+import asyncio
+import time
+
+from aiohttp import web
+
+
+class StubBotAPI:
+    def __init__(self, latency=0.0, flood_every=0, retry_after=1):
+        self.latency = latency
+        self.flood_every = flood_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.delivered = 0
+        self.message_id = 0
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        return app
+
+    async def handle(self, request):
+        self.requests += 1
+        method = request.match_info["method"]
+        data = await request.post()
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.flood_every and self.requests % self.flood_every == 0:
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": (
+                        f"Too Many Requests: retry after {self.retry_after}"
+                    ),
+                    "parameters": {"retry_after": self.retry_after},
+                },
+                status=429,
+            )
+
+        if method != "sendMessage":
+            return web.json_response({"ok": True, "result": True})
+
+        self.delivered += 1
+        self.message_id += 1
+        chat_id = int(data["chat_id"])
+        return web.json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": self.message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id, "type": "private"},
+                    "text": data.get("text", ""),
+                },
+            }
+        )
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start serving on the running loop and return the base URL."""
+        self.runner = web.AppRunner(self.make_app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
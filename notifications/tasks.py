@@ -1,69 +1,59 @@
-import asyncio
 import logging
-import os
-from datetime import datetime, timedelta
 
 from celery import shared_task
-from aiogram import Bot
-from dotenv import load_dotenv
 from django.utils import timezone
 
-from borrowings.models import Borrowing
-
-load_dotenv()
+from notifications import fanout, reminders
+from notifications.models import ReminderRun
+from notifications.runtime import runtime
 
 logger = logging.getLogger(__name__)
 
-bot = Bot(token=os.getenv("TELEGRAM_BOT_TOKEN"))
-
 
 @shared_task
 def send_telegram_message(chat_id: int, text: str):
-    async def send():
-        await bot.send_message(chat_id=chat_id, text=text)
-
     try:
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                raise RuntimeError
-        except (RuntimeError, AssertionError):
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        loop.run_until_complete(send())
+        runtime.run(runtime.bot.send_message(chat_id=chat_id, text=text))
     except Exception as e:
         logger.exception(f"Failed to send telegram message to chat_id={chat_id}")
         raise
 
 
 @shared_task
-def check_and_send_return_reminders():
-    today = timezone.now().date()
-    tomorrow = today + timedelta(days=1)
+def broadcast_telegram_message(text: str, chat_ids=()):
+    """Send one message to `chat_ids` and every user with a linked chat."""
+    stats = fanout.broadcast(text, chat_ids=chat_ids)
+    logger.info(f"Telegram broadcast finished: {stats}")
+    return stats
 
-    due_tomorrow = Borrowing.objects.filter(
-        expected_return_date=tomorrow,
-        actual_return_date__isnull=True,
-        user__chat_id__isnull=False,
-    ).select_related("user", "book")
 
-    for borrowing in due_tomorrow:
-        message = (
-            f"📚 Reminder: Your book '{borrowing.book.title}' is due tomorrow!\n"
-            f"Please return it to the library by {borrowing.expected_return_date}."
-        )
-        send_telegram_message.delay(borrowing.user.chat_id, message)
+@shared_task
+def send_telegram_messages(messages):
+    """Send a batch of `[chat_id, text]` pairs through one bot session."""
+    stats = fanout.send_batch(messages)
+    logger.info(f"Telegram batch finished: {stats}")
+    return stats
 
-    overdue = Borrowing.objects.filter(
-        expected_return_date__lt=today,
-        actual_return_date__isnull=True,
-        user__chat_id__isnull=False,
-    ).select_related("user", "book")
 
-    for borrowing in overdue:
-        message = (
-            f"⚠️ Overdue Notice: Your book '{borrowing.book.title}' is overdue!\n"
-            f"It was due on {borrowing.expected_return_date}.\n"
-            f"Please return it to the library as soon as possible."
-        )
-        send_telegram_message.delay(borrowing.user.chat_id, message)
+@shared_task(acks_late=True)
+def check_and_send_return_reminders():
+    """
+    Queue one digest per user with books due tomorrow or overdue, a chunk of
+    users per batch task. Progress is checkpointed after every chunk, so a
+    redelivered or re-run task resumes where the previous attempt stopped.
+    """
+    today = timezone.now().date()
+    run, _ = ReminderRun.objects.get_or_create(run_date=today)
+    if run.finished_at:
+        return
+
+    for messages, last_user_id in reminders.iter_digest_chunks(
+        today, after_user_id=run.last_user_id
+    ):
+        send_telegram_messages.delay(messages)
+        run.last_user_id = last_user_id
+        run.batches += 1
+        run.save(update_fields=["last_user_id", "batches"])
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=["finished_at"])
@@ -0,0 +1,124 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from config.testing import LOCMEM_CACHE
+from notifications import bot
+from notifications.loans import NOT_LINKED, get_reply
+
+User = get_user_model()
+
+CHAT_ID = 4242
+
+
+def make_message(text):
+    message = MagicMock()
+    message.text = text
+    message.chat.id = CHAT_ID
+    message.answer = AsyncMock()
+    return message
+
+
+class BotAuthTest(TransactionTestCase):
+    """Test suite for the Telegram bot login flow.
+
+    This test suite covers:
+    - Login state kept in the dispatcher's FSM storage
+    - Password checks on the dedicated executor
+    - Linking the chat with a single-column update
+    - Dropping replies cached before the chat was linked
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", password="userpass123"
+        )
+        self.state = FSMContext(
+            storage=MemoryStorage(),
+            key=StorageKey(bot_id=1, chat_id=CHAT_ID, user_id=CHAT_ID),
+        )
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bot-auth")
+        patcher = patch("notifications.bot.auth_executor", executor)
+        patcher.start()
+        self.addCleanup(executor.shutdown)
+        self.addCleanup(lambda: executor.submit(connections.close_all).result())
+        self.addCleanup(patcher.stop)
+
+    async def log_in(self, password):
+        await bot.start_handler(make_message("/start"), self.state)
+        await bot.handle_email(make_message(" user@example.com "), self.state)
+        self.assertEqual(await self.state.get_state(), bot.AuthForm.password.state)
+
+        message = make_message(password)
+        await bot.handle_password(message, self.state)
+        self.assertIsNone(await self.state.get_state())
+        return message.answer.call_args[0][0]
+
+    def test_login_links_chat(self):
+        """Test that a successful login stores the chat id with one UPDATE."""
+        with CaptureQueriesContext(connection) as queries:
+            reply = async_to_sync(self.log_in)("userpass123")
+
+        self.assertIn("Auth successful", reply)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.chat_id, CHAT_ID)
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertRegex(updates[0], r'SET "chat_id" = \d+ WHERE')
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_login_expires_cached_replies(self):
+        """Test that replies cached before a login are not served after it."""
+        cache.clear()
+        self.assertEqual(async_to_sync(get_reply)(CHAT_ID, "loans"), NOT_LINKED)
+
+        async_to_sync(self.log_in)("userpass123")
+
+        self.assertIn("no open loans", async_to_sync(get_reply)(CHAT_ID, "loans"))
+
+    @override_settings(CACHES=LOCMEM_CACHE)
+    def test_login_survives_a_cache_outage(self):
+        """Test that a login still links the chat while the cache is down."""
+        with patch.object(cache, "adelete_many", side_effect=ConnectionError):
+            with self.assertLogs("notifications.loans", level="ERROR"):
+                reply = async_to_sync(self.log_in)("userpass123")
+
+        self.assertIn("Auth successful", reply)
+
+    async def test_invalid_credentials(self):
+        """Test that a wrong password leaves the chat unlinked."""
+        reply = await self.log_in("wrong-password")
+
+        self.assertIn("Invalid credentials", reply)
+        await self.user.arefresh_from_db()
+        self.assertIsNone(self.user.chat_id)
+
+    async def test_passwords_checked_on_auth_executor(self):
+        """Test that credentials are checked off the default executor."""
+        threads = []
+
+        def authenticate(**credentials):
+            threads.append(threading.current_thread().name)
+
+        with patch("notifications.bot.authenticate", side_effect=authenticate):
+            await self.log_in("userpass123")
+
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("bot-auth"))
+
+    async def test_message_without_login(self):
+        """Test that a message outside a login asks for /start."""
+        message = make_message("hello")
+        await bot.handle_unknown(message)
+
+        self.assertIn("/start", message.answer.call_args[0][0])
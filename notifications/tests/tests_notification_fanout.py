@@ -0,0 +1,108 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from notifications import fanout
+from notifications.runtime import create_bot, runtime
+from notifications.stub_bot_api import StubBotAPI
+
+User = get_user_model()
+
+
+def make_bot():
+    bot = MagicMock()
+    bot.send_message = AsyncMock()
+    bot.session.close = AsyncMock()
+    return bot
+
+
+class BroadcasterTests(TestCase):
+    """Test suite for the Telegram fan-out engine.
+
+    This test suite covers:
+    - Flood-control retries
+    - Permanent delivery errors
+    - Recipient streaming and de-duplication
+    - Delivery through the stub Bot API server
+    """
+
+    def test_retry_after_is_honoured(self):
+        """Test that a 429 response is retried and then delivered."""
+        bot = make_bot()
+        method = SendMessage(chat_id=1, text="hi")
+        bot.send_message.side_effect = [
+            TelegramRetryAfter(method=method, message="flood", retry_after=0),
+            None,
+        ]
+        broadcaster = fanout.Broadcaster(bot, rate=0, chat_interval=0)
+
+        asyncio.run(broadcaster.send_many([1], "hi"))
+
+        self.assertEqual(bot.send_message.await_count, 2)
+        self.assertEqual(broadcaster.stats, {"sent": 1, "failed": 0, "retried": 1})
+
+    def test_forbidden_chat_is_not_retried(self):
+        """Test that a chat which blocked the bot is skipped."""
+        bot = make_bot()
+        method = SendMessage(chat_id=1, text="hi")
+        bot.send_message.side_effect = TelegramForbiddenError(
+            method=method, message="blocked"
+        )
+        broadcaster = fanout.Broadcaster(bot, rate=0, chat_interval=0)
+
+        asyncio.run(broadcaster.send_many([1, 2], "hi"))
+
+        self.assertEqual(bot.send_message.await_count, 2)
+        self.assertEqual(broadcaster.stats["failed"], 2)
+
+    @override_settings(
+        TELEGRAM_BROADCAST_RATE=0,
+        TELEGRAM_CHAT_INTERVAL=0,
+        TELEGRAM_BROADCAST_CHUNK_SIZE=2,
+    )
+    def test_broadcast_streams_linked_users_once(self):
+        """Test that every linked chat gets exactly one message."""
+        for chat_id in (1, 2, 3):
+            User.objects.create_user(
+                email=f"user{chat_id}@example.com",
+                password="testpass123",
+                chat_id=chat_id,
+            )
+        User.objects.create_user(email="nochat@example.com", password="testpass123")
+        bot = make_bot()
+
+        runtime.stop()
+        with patch("notifications.runtime.create_bot", return_value=bot):
+            stats = fanout.broadcast("hi", chat_ids=[1, 1, 99])
+        runtime.stop()
+
+        sent_to = sorted(
+            call.kwargs["chat_id"] for call in bot.send_message.await_args_list
+        )
+        self.assertEqual(sent_to, [1, 2, 3, 99])
+        self.assertEqual(stats["sent"], 4)
+
+    def test_broadcast_through_stub_server(self):
+        """Test delivery through the stub Bot API, including a 429."""
+        stub = StubBotAPI(flood_every=3, retry_after=1)
+
+        async def run():
+            base_url = await stub.start()
+            bot = create_bot(api_server=base_url)
+            broadcaster = fanout.Broadcaster(bot, rate=0, chat_interval=0)
+            try:
+                await broadcaster.send_many(range(1, 6), "hi")
+            finally:
+                await bot.session.close()
+                await stub.stop()
+            return broadcaster.stats
+
+        stats = asyncio.run(run())
+
+        self.assertEqual(stats["sent"], 5)
+        self.assertGreaterEqual(stats["retried"], 1)
+        self.assertEqual(stub.delivered, 5)
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiogram.filters import CommandObject
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.models import Borrowing
+from config.testing import LOCMEM_CACHE
+from notifications import bot
+from notifications.loans import get_reply
+from payments.events import complete_checkout_session
+from payments.models import Payment
+
+User = get_user_model()
+
+CHAT_ID = 4242
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+@patch("payments.tasks.create_checkout_session.delay")
+class LoanCommandsTest(TestCase):
+    """Test suite for the bot's /loans, /overdue and /fines commands.
+
+    This test suite covers:
+    - One projected query per reply, then cached replies
+    - Invalidation when a borrowing or payment changes
+    - Overdue loans and unpaid fines of the linked user only
+    - Chats that are not linked to a user
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="userpass123", chat_id=CHAT_ID
+        )
+        self.other = User.objects.create_user(
+            email="other@example.com", password="otherpass123", chat_id=CHAT_ID + 1
+        )
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee="2.00",
+        )
+
+    def borrow(self, user=None, days=7, paid=True):
+        borrowing = Borrowing.objects.create(
+            book=self.book,
+            user=user or self.user,
+            expected_return_date=self.today + timedelta(days=days),
+        )
+        if paid:
+            Borrowing.objects.filter(pk=borrowing.pk).update(is_paid=True)
+        return borrowing
+
+    def reply(self, command, chat_id=CHAT_ID):
+        return async_to_sync(get_reply)(chat_id, command)
+
+    def test_loans_are_cached_until_a_loan_changes(self, delay):
+        """Test that /loans runs one query, then none until a loan is saved."""
+        self.borrow()
+        self.borrow(user=self.other)
+
+        with self.assertNumQueries(1):
+            reply = self.reply("loans")
+        self.assertEqual(reply.count("• Test Book"), 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.reply("loans"), reply)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.borrow(days=14, paid=False)
+        self.assertIn("(awaiting payment)", self.reply("loans"))
+
+    def test_overdue_loans(self, delay):
+        """Test that /overdue lists only paid loans past their due date."""
+        late = self.borrow()
+        Borrowing.objects.filter(pk=late.pk).update(
+            expected_return_date=self.today - timedelta(days=3)
+        )
+        self.borrow()
+
+        reply = self.reply("overdue")
+
+        self.assertEqual(reply.count("•"), 1)
+        self.assertIn("3 days overdue", reply)
+
+    def test_fines_until_paid(self, delay):
+        """Test that /fines lists unpaid fines and drops them once paid."""
+        borrowing = self.borrow()
+        Payment.objects.create(
+            borrowing=borrowing,
+            money_to_pay="4.00",
+            type=Payment.Type.FINE,
+            session_id="cs_fine",
+            session_url="https://checkout.example.com/fine",
+        )
+        Payment.objects.create(
+            borrowing=borrowing, money_to_pay="14.00", status=Payment.Status.PAID
+        )
+
+        reply = self.reply("fines")
+        self.assertIn("Test Book: $4.00, https://checkout.example.com/fine", reply)
+        self.assertIn("Total: $4.00", reply)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            complete_checkout_session({"id": "cs_fine"})
+        self.assertIn("no unpaid fines", self.reply("fines"))
+
+    def test_chat_not_linked(self, delay):
+        """Test that an unknown chat is asked to log in."""
+        User.objects.filter(pk=self.user.pk).update(chat_id=None)
+
+        self.assertIn("/start", self.reply("loans"))
+        self.assertIn("no open loans", self.reply("loans", chat_id=CHAT_ID + 1))
+
+    def test_bot_command_answers(self, delay):
+        """Test that the bot answers the command with its reply."""
+        message = MagicMock()
+        message.chat.id = CHAT_ID
+        message.answer = AsyncMock()
+
+        async_to_sync(bot.loans_handler)(
+            message, CommandObject(prefix="/", command="fines")
+        )
+
+        message.answer.assert_awaited_once_with("✅ You have no unpaid fines.")
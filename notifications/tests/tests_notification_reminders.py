@@ -0,0 +1,153 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.models import Borrowing
+from notifications.models import ReminderRun
+from notifications.tasks import check_and_send_return_reminders
+
+User = get_user_model()
+
+
+@patch("notifications.signals.broadcast_telegram_message.delay")
+@patch("notifications.tasks.send_telegram_messages.delay")
+class ReturnRemindersTests(TestCase):
+    """Test suite for the daily return-reminder pipeline.
+
+    This test suite covers:
+    - Per-user digests for due-tomorrow and overdue loans
+    - Chunked batch tasks
+    - Resuming from a checkpoint
+    """
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.tomorrow = self.today + timedelta(days=1)
+        self.yesterday = self.today - timedelta(days=1)
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=1,
+        )
+        self.other_book = Book.objects.create(
+            title="Other Book",
+            author="Test Author",
+            cover="SOFT",
+            inventory=5,
+            daily_fee=1,
+        )
+
+    def create_user(self, chat_id):
+        return User.objects.create_user(
+            email=f"user{chat_id}@example.com",
+            password="testpass123",
+            chat_id=chat_id,
+        )
+
+    def create_borrowing(self, user, book, expected_return_date):
+        borrowing = Borrowing.objects.create(
+            user=user,
+            book=book,
+            expected_return_date=self.tomorrow,
+        )
+        Borrowing.objects.filter(id=borrowing.id).update(
+            expected_return_date=expected_return_date
+        )
+        return borrowing
+
+    def sent_messages(self, mock_send):
+        return [message for call in mock_send.call_args_list for message in call[0][0]]
+
+    def test_single_loan_messages(self, mock_send, _):
+        """Test that a single loan keeps the individual reminder wording."""
+        due_user = self.create_user(1)
+        overdue_user = self.create_user(2)
+        self.create_borrowing(due_user, self.book, self.tomorrow)
+        self.create_borrowing(overdue_user, self.book, self.yesterday)
+
+        check_and_send_return_reminders()
+
+        self.assertEqual(
+            self.sent_messages(mock_send),
+            [
+                [
+                    1,
+                    f"📚 Reminder: Your book 'Test Book' is due tomorrow!\n"
+                    f"Please return it to the library by {self.tomorrow}.",
+                ],
+                [
+                    2,
+                    f"⚠️ Overdue Notice: Your book 'Test Book' is overdue!\n"
+                    f"It was due on {self.yesterday}.\n"
+                    f"Please return it to the library as soon as possible.",
+                ],
+            ],
+        )
+
+    def test_loans_are_grouped_into_one_digest(self, mock_send, _):
+        """Test that all of a user's loans end up in one message."""
+        user = self.create_user(1)
+        self.create_borrowing(user, self.book, self.tomorrow)
+        self.create_borrowing(user, self.other_book, self.tomorrow)
+        self.create_borrowing(user, self.book, self.yesterday)
+
+        check_and_send_return_reminders()
+
+        messages = self.sent_messages(mock_send)
+        self.assertEqual(len(messages), 1)
+        chat_id, text = messages[0]
+        self.assertEqual(chat_id, 1)
+        self.assertIn("2 of your books are due tomorrow", text)
+        self.assertIn("- 'Other Book'", text)
+        self.assertIn("Your book 'Test Book' is overdue", text)
+
+    def test_returned_and_unlinked_loans_are_skipped(self, mock_send, _):
+        """Test that returned books and users without a chat get nothing."""
+        user = self.create_user(1)
+        borrowing = self.create_borrowing(user, self.book, self.yesterday)
+        Borrowing.objects.filter(id=borrowing.id).update(actual_return_date=self.today)
+        unlinked = User.objects.create_user(
+            email="nochat@example.com", password="testpass123"
+        )
+        self.create_borrowing(unlinked, self.book, self.yesterday)
+
+        check_and_send_return_reminders()
+
+        self.assertEqual(self.sent_messages(mock_send), [])
+
+    @override_settings(REMINDER_CHUNK_SIZE=2)
+    def test_users_are_sent_in_chunks(self, mock_send, _):
+        """Test that each chunk of users becomes one batch task."""
+        for chat_id in range(1, 6):
+            self.create_borrowing(self.create_user(chat_id), self.book, self.yesterday)
+
+        check_and_send_return_reminders()
+
+        self.assertEqual(mock_send.call_count, 3)
+        self.assertEqual(
+            [chat_id for chat_id, _ in self.sent_messages(mock_send)],
+            [1, 2, 3, 4, 5],
+        )
+        run = ReminderRun.objects.get(run_date=self.today)
+        self.assertEqual(run.batches, 3)
+        self.assertIsNotNone(run.finished_at)
+
+    def test_interrupted_run_resumes_from_checkpoint(self, mock_send, _):
+        """Test that a re-run skips users already handled and finished runs."""
+        users = [self.create_user(chat_id) for chat_id in range(1, 4)]
+        for user in users:
+            self.create_borrowing(user, self.book, self.yesterday)
+        ReminderRun.objects.create(run_date=self.today, last_user_id=users[0].id)
+
+        check_and_send_return_reminders()
+        check_and_send_return_reminders()
+
+        self.assertEqual(
+            [chat_id for chat_id, _ in self.sent_messages(mock_send)], [2, 3]
+        )
@@ -1,8 +1,12 @@
-from unittest.mock import patch, MagicMock
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock, AsyncMock
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from books.models import Book
 from borrowings.models import Borrowing
+from notifications.runtime import runtime
 from notifications.tasks import send_telegram_message
 from notifications.signals import borrowing_created, book_created_or_updated
 from django.utils import timezone
@@ -19,8 +23,19 @@ class NotificationTasksTests(TestCase):
     - Integration with Telegram bot
     """
 
-    @patch("notifications.tasks.bot.send_message")
-    def test_send_telegram_message(self, mock_send_message):
+    def setUp(self):
+        """Start every test with a fresh runtime bound to a mocked bot."""
+        self.bot = MagicMock()
+        self.bot.send_message = AsyncMock(return_value=MagicMock())
+        self.bot.session.close = AsyncMock()
+
+        runtime.stop()
+        patcher = patch("notifications.runtime.create_bot", return_value=self.bot)
+        self.mock_create_bot = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(runtime.stop)
+
+    def test_send_telegram_message(self):
         """Test that telegram message is sent with correct parameters.
         
         Verifies:
@@ -31,11 +46,49 @@ class NotificationTasksTests(TestCase):
         chat_id = 123456
         text = "Test message"
 
-        mock_send_message.return_value = MagicMock()
-
         send_telegram_message(chat_id, text)
 
-        mock_send_message.assert_called_once_with(chat_id=chat_id, text=text)
+        self.bot.send_message.assert_called_once_with(chat_id=chat_id, text=text)
+
+    def test_runtime_is_reused_between_messages(self):
+        """Test that consecutive sends share one event loop and one bot.
+        
+        Verifies:
+        - The bot (and its HTTP session) is created only once
+        - The event loop is not replaced between sends
+        - Stopping the runtime closes the bot session
+        """
+        send_telegram_message(1, "first")
+        loop = runtime.loop
+        send_telegram_message(2, "second")
+
+        self.assertIs(runtime.loop, loop)
+        self.assertEqual(self.mock_create_bot.call_count, 1)
+        self.assertEqual(self.bot.send_message.await_count, 2)
+
+        runtime.stop()
+        self.bot.session.close.assert_awaited_once()
+        self.assertFalse(runtime.is_running)
+
+    def test_bot_is_created_once_across_threads(self):
+        """Test that concurrent first uses of the runtime share one bot."""
+        barrier = threading.Barrier(8)
+
+        def create_bot():
+            time.sleep(0.01)
+            return self.bot
+
+        self.mock_create_bot.side_effect = create_bot
+
+        def use_bot():
+            barrier.wait()
+            return runtime.bot
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bots = list(executor.map(lambda _: use_bot(), range(8)))
+
+        self.assertEqual(self.mock_create_bot.call_count, 1)
+        self.assertTrue(all(bot is self.bot for bot in bots))
 
 
 class NotificationSignalsTests(TestCase):
@@ -69,13 +122,13 @@ class NotificationSignalsTests(TestCase):
             daily_fee=10.00,
         )
 
-    @patch("notifications.signals.send_telegram_message.delay")
+    @patch("notifications.signals.broadcast_telegram_message.delay")
     def test_borrowing_created_signal(self, mock_send_message):
         """Test that borrowing creation triggers appropriate notifications.
         
         Verifies:
-        - Correct number of notifications are sent
-        - Notifications are sent to correct user
+        - One broadcast job is queued per borrowing save
+        - The borrower's chat is passed to the broadcast
         - Book title is included in notification messages
         """
         # Create a borrowing
@@ -88,20 +141,19 @@ class NotificationSignalsTests(TestCase):
         # Trigger the signal manually
         borrowing_created(Borrowing, borrowing, True)
 
-        # Verify the message was sent
-        self.assertEqual(mock_send_message.call_count, 4)
+        # Verify one broadcast per save was queued
+        self.assertEqual(mock_send_message.call_count, 2)
         calls = mock_send_message.call_args_list
         for call_args in calls:
-            self.assertEqual(call_args[0][0], self.user.chat_id)
-            self.assertIn(self.book.title, call_args[0][1])
+            self.assertIn(self.book.title, call_args[0][0])
+            self.assertEqual(call_args[1]["chat_ids"], [self.user.chat_id])
 
-    @patch("notifications.signals.send_telegram_message.delay")
+    @patch("notifications.signals.broadcast_telegram_message.delay")
     def test_book_created_signal(self, mock_send_message):
         """Test that book creation triggers appropriate notifications.
         
         Verifies:
-        - Correct number of notifications are sent
-        - Notifications are sent to correct user
+        - One broadcast job is queued per book save
         - New book title is included in notification messages
         """
         new_book = Book.objects.create(
@@ -117,16 +169,14 @@ class NotificationSignalsTests(TestCase):
 
         self.assertEqual(mock_send_message.call_count, 2)
         args = mock_send_message.call_args[0]
-        self.assertEqual(args[0], self.user.chat_id)
-        self.assertIn(new_book.title, args[1])
+        self.assertIn(new_book.title, args[0])
 
-    @patch("notifications.signals.send_telegram_message.delay")
+    @patch("notifications.signals.broadcast_telegram_message.delay")
     def test_book_updated_signal(self, mock_send_message):
         """Test that book updates trigger appropriate notifications.
         
         Verifies:
-        - Correct number of notifications are sent
-        - Notifications are sent to correct user
+        - One broadcast job is queued per book save
         - Updated book title is included in notification messages
         """
         self.book.title = "Updated Book"
@@ -136,5 +186,4 @@ class NotificationSignalsTests(TestCase):
 
         self.assertEqual(mock_send_message.call_count, 2)
         args = mock_send_message.call_args[0]
-        self.assertEqual(args[0], self.user.chat_id)
-        self.assertIn("Updated Book", args[1])
+        self.assertIn("Updated Book", args[0])
@@ -0,0 +1,100 @@
+import asyncio
+
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import Update
+from aiohttp.test_utils import TestClient, TestServer
+from django.test import SimpleTestCase
+
+from notifications.bot import create_dispatcher
+from notifications.runtime import create_bot
+from notifications.stub_bot_api import StubBotAPI
+from notifications.webhook import SECRET_HEADER, UpdateWorkers, chat_key, make_app
+
+SECRET = "webhook-secret"
+
+
+def make_update(update_id, chat_id, text="/start"):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Reader"},
+            "text": text,
+        },
+    }
+
+
+class WebhookTest(SimpleTestCase):
+    """Test suite for the Telegram bot webhook.
+
+    This test suite covers:
+    - Secret token and payload checks
+    - Handling accepted updates on the worker pool
+    - Keeping one chat's updates on one worker
+    - Refusing updates while a worker is full
+    """
+
+    def post_updates(self, updates, secret=SECRET):
+        """Post `updates` to a webhook app and wait until they are handled."""
+
+        async def run():
+            stub = StubBotAPI()
+            bot = create_bot(api_server=await stub.start())
+            app = make_app(create_dispatcher(MemoryStorage()), bot, SECRET, workers=2)
+            client = TestClient(TestServer(app, access_log=None))
+            await client.start_server()
+            try:
+                statuses = []
+                for update in updates:
+                    response = await client.post(
+                        "/telegram/webhook/",
+                        json=update,
+                        headers={SECRET_HEADER: secret},
+                    )
+                    statuses.append(response.status)
+                await app["workers"].join()
+            finally:
+                await client.close()
+                await bot.session.close()
+                await stub.stop()
+            return statuses, stub.delivered
+
+        return asyncio.run(run())
+
+    def test_updates_are_handled(self):
+        """Test that accepted updates are answered through the Bot API."""
+        statuses, delivered = self.post_updates(
+            [make_update(1, 10), make_update(2, 11, "hello")]
+        )
+
+        self.assertEqual(statuses, [200, 200])
+        self.assertEqual(delivered, 2)
+
+    def test_wrong_secret_is_rejected(self):
+        """Test that updates without the secret token are not handled."""
+        statuses, delivered = self.post_updates([make_update(1, 10)], secret="wrong")
+
+        self.assertEqual(statuses, [401])
+        self.assertEqual(delivered, 0)
+
+    def test_malformed_update_is_rejected(self):
+        """Test that a body that is not an update answers 400."""
+        statuses, delivered = self.post_updates([{"message": "hi"}])
+
+        self.assertEqual(statuses, [400])
+        self.assertEqual(delivered, 0)
+
+    def test_chat_updates_share_a_worker(self):
+        """Test that updates are queued by chat and refused when full."""
+
+        async def run():
+            pool = UpdateWorkers(None, None, workers=4, queue_size=1)
+            first = Update.model_validate(make_update(1, 42))
+            second = Update.model_validate(make_update(2, 42, "hello"))
+            other = Update.model_validate(make_update(3, 43))
+            return pool.submit(first), pool.submit(second), pool.submit(other)
+
+        self.assertEqual(chat_key(Update.model_validate(make_update(1, 42))), 42)
+        self.assertEqual(asyncio.run(run()), (True, False, True))
@@ -0,0 +1,153 @@
+"""
+Webhook mode for the Telegram bot: an aiohttp app that accepts updates
+pushed by Telegram and hands them to a pool of worker tasks. Any number of
+replicas can run behind nginx, since login state lives in Redis.
+"""
+
+import asyncio
+import hmac
+import logging
+
+from aiogram.types import Update
+from aiohttp import web
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from pydantic import ValidationError
+
+from notifications.bot import create_dispatcher
+from notifications.runtime import create_bot
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def chat_key(update):
+    """The chat an update belongs to, or its own id when it has none."""
+    message = update.message or update.edited_message
+    if update.callback_query is not None:
+        message = update.callback_query.message
+    return message.chat.id if message is not None else update.update_id
+
+
+class UpdateWorkers:
+    """
+    Feeds updates to the dispatcher from `workers` tasks. Updates of one
+    chat always go to the same worker, so a login's steps run in order.
+    """
+
+    def __init__(self, dispatcher, bot, workers, queue_size):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.queues = [asyncio.Queue(maxsize=queue_size) for _ in range(workers)]
+        self.tasks = []
+        self.handled = 0
+
+    def start(self):
+        self.tasks = [asyncio.create_task(self.work(queue)) for queue in self.queues]
+
+    async def stop(self):
+        """Handle what is already queued, then stop the workers."""
+        for queue in self.queues:
+            await queue.put(None)
+        await asyncio.gather(*self.tasks)
+
+    def submit(self, update):
+        """Queue `update`, returning False when its worker is full."""
+        queue = self.queues[chat_key(update) % len(self.queues)]
+        try:
+            queue.put_nowait(update)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def join(self):
+        for queue in self.queues:
+            await queue.join()
+
+    async def work(self, queue):
+        while True:
+            update = await queue.get()
+            try:
+                if update is None:
+                    return
+                await self.dispatcher.feed_update(self.bot, update)
+            except Exception:
+                logger.exception("Failed to handle update %s", update.update_id)
+            finally:
+                self.handled += update is not None
+                queue.task_done()
+
+
+def make_app(dispatcher, bot, secret, workers=None, queue_size=None):
+    """
+    The webhook app. Updates are acknowledged once queued; a full queue
+    answers 503 so Telegram delivers the update again later.
+    """
+    if not secret:
+        raise ImproperlyConfigured(
+            "TELEGRAM_WEBHOOK_SECRET is required in webhook mode."
+        )
+
+    pool = UpdateWorkers(
+        dispatcher,
+        bot,
+        workers or settings.TELEGRAM_WEBHOOK_WORKERS,
+        queue_size or settings.TELEGRAM_WEBHOOK_QUEUE_SIZE,
+    )
+
+    async def handle(request):
+        token = request.headers.get(SECRET_HEADER, "")
+        if not hmac.compare_digest(token.encode(), secret.encode()):
+            return web.Response(status=401)
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": bot})
+        except (ValueError, ValidationError):
+            return web.Response(status=400)
+        if not pool.submit(update):
+            return web.Response(status=503)
+        return web.Response()
+
+    async def health(request):
+        return web.Response(text="ok")
+
+    async def workers_context(app):
+        pool.start()
+        yield
+        await pool.stop()
+
+    app = web.Application()
+    app["workers"] = pool
+    app.router.add_post(settings.TELEGRAM_WEBHOOK_PATH, handle)
+    app.router.add_get("/health", health)
+    app.cleanup_ctx.append(workers_context)
+    return app
+
+
+async def main():
+    dp = create_dispatcher()
+    bot = create_bot()
+    app = make_app(dp, bot, settings.TELEGRAM_WEBHOOK_SECRET)
+
+    if settings.TELEGRAM_WEBHOOK_URL:
+        # Idempotent, so every replica may register the same URL on start.
+        await bot.set_webhook(
+            settings.TELEGRAM_WEBHOOK_URL.rstrip("/") + settings.TELEGRAM_WEBHOOK_PATH,
+            secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+            max_connections=settings.TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(
+        runner, settings.TELEGRAM_WEBHOOK_HOST, settings.TELEGRAM_WEBHOOK_PORT
+    )
+    try:
+        await site.start()
+        logger.info("Telegram webhook listening on %s", site.name)
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        await bot.session.close()
+        await dp.storage.close()
@@ -0,0 +1,136 @@
+import logging
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from books.inventory import release_copy, reserve_copy
+from borrowings import stats
+from borrowings.models import Borrowing
+from notifications.loans import invalidate_loans_on_commit
+from payments.models import Payment, StripeEvent
+
+logger = logging.getLogger(__name__)
+
+
+def record_event(event, payload):
+    """
+    Store a verified webhook event and return the id of the row to apply.
+
+    Redeliveries hit the unique `event_id` and return the existing row only
+    while it is still unprocessed, so an event whose task was lost is queued
+    again; events already applied return None.
+    """
+    try:
+        with transaction.atomic():
+            return StripeEvent.objects.create(
+                event_id=event["id"], type=event["type"], payload=payload
+            ).pk
+    except IntegrityError:
+        return (
+            StripeEvent.objects.filter(event_id=event["id"], processed_at__isnull=True)
+            .values_list("pk", flat=True)
+            .first()
+        )
+
+
+def complete_checkout_session(session):
+    # The row lock serialises concurrent events for the same session.
+    payment = (
+        Payment.objects.select_for_update(of=("self",))
+        .filter(session_id=session.get("id"))
+        .values(
+            "pk",
+            "status",
+            "type",
+            "money_to_pay",
+            "borrowing_id",
+            "borrowing__user_id",
+            "borrowing__book_id",
+            "borrowing__has_copy",
+        )
+        .first()
+    )
+    if payment is None or payment["status"] == Payment.Status.PAID:
+        return
+
+    user_id, book_id = payment["borrowing__user_id"], payment["borrowing__book_id"]
+    Payment.objects.filter(pk=payment["pk"]).update(status=Payment.Status.PAID)
+
+    paid = Borrowing.objects.filter(pk=payment["borrowing_id"], is_paid=False).update(
+        is_paid=True
+    )
+    stats.record_payment_paid(
+        user_id,
+        book_id,
+        payment["money_to_pay"],
+        is_fine=payment["type"] == Payment.Type.FINE,
+        loan_paid=bool(paid),
+    )
+    invalidate_loans_on_commit(pk=user_id)
+    # A loan whose earlier payment failed gave its copy back.
+    if (
+        paid
+        and not payment["borrowing__has_copy"]
+        and not reserve_copy(payment["borrowing_id"], book_id)
+    ):
+        logger.warning(
+            "Borrowing %s was paid but book %s is out of stock",
+            payment["borrowing_id"],
+            book_id,
+        )
+
+
+def fail_payment(**lookup):
+    """
+    Mark a pending payment failed and put back the copy its loan reserved.
+
+    Fines leave the returned loan alone. Returns False if no pending payment
+    matched.
+    """
+    payment = (
+        Payment.objects.select_for_update(of=("self",))
+        .filter(status=Payment.Status.PENDING, **lookup)
+        .values(
+            "pk", "type", "borrowing_id", "borrowing__user_id", "borrowing__book_id"
+        )
+        .first()
+    )
+    if payment is None:
+        return False
+
+    Payment.objects.filter(pk=payment["pk"]).update(status=Payment.Status.FAILED)
+    if payment["type"] == Payment.Type.PAYMENT:
+        release_copy(payment["borrowing_id"], payment["borrowing__book_id"])
+    invalidate_loans_on_commit(pk=payment["borrowing__user_id"])
+    return True
+
+
+def expire_checkout_session(session):
+    fail_payment(session_id=session.get("id"))
+
+
+HANDLERS = {
+    "checkout.session.completed": complete_checkout_session,
+    "checkout.session.expired": expire_checkout_session,
+    "checkout.session.async_payment_failed": expire_checkout_session,
+}
+
+
+@transaction.atomic
+def apply_event(event_pk):
+    """Apply a stored event once; returns False if it was already applied."""
+    event = (
+        StripeEvent.objects.select_for_update()
+        .filter(pk=event_pk, processed_at__isnull=True)
+        .only("type", "payload")
+        .first()
+    )
+    if event is None:
+        return False
+
+    handler = HANDLERS.get(event.type)
+    if handler is not None:
+        handler(event.payload["data"]["object"])
+
+    StripeEvent.objects.filter(pk=event.pk).update(processed_at=timezone.now())
+    return True
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+
+import aiohttp
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.models import StripeEvent
+from payments.stripe_utils import sign_webhook_payload
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires signed `checkout.session.completed` events, including "
+        "redeliveries, at a running webhook endpoint and reports latency, "
+        "throughput and how many events were recorded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default=f"{settings.DOMAIN}/api/payments/webhook/")
+        parser.add_argument("--events", type=int, default=5000)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--duplicates",
+            type=float,
+            default=0.2,
+            help="Share of events delivered a second time, as Stripe retries do.",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the recorded events instead of deleting them afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        secret = settings.STRIPE_WEBHOOK_SECRET
+        if not secret:
+            raise CommandError("STRIPE_WEBHOOK_SECRET is not set.")
+
+        prefix = f"evt_load_{uuid.uuid4().hex[:8]}_"
+        events = [
+            json.dumps(
+                {
+                    "id": f"{prefix}{i}",
+                    "object": "event",
+                    "type": "checkout.session.completed",
+                    "data": {"object": {"id": f"cs_load_{i}"}},
+                }
+            )
+            for i in range(options["events"])
+        ]
+        deliveries = events + random.sample(
+            events, int(len(events) * options["duplicates"])
+        )
+        random.shuffle(deliveries)
+
+        start = time.perf_counter()
+        timings, statuses = asyncio.run(
+            self.fire(options["url"], deliveries, secret, options["concurrency"])
+        )
+        elapsed = time.perf_counter() - start
+
+        percentiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f"requests: {len(deliveries)} in {elapsed:.2f}s "
+            f"({len(deliveries) / elapsed:.1f} req/s)\n"
+            f"latency ms: p50 {percentiles[49]:.2f} p95 {percentiles[94]:.2f} "
+            f"p99 {percentiles[98]:.2f}\n"
+            f"statuses: {dict(statuses)}"
+        )
+
+        recorded = StripeEvent.objects.filter(event_id__startswith=prefix)
+        self.stdout.write(f"recorded: {recorded.count()} of {len(events)} events")
+        if not options["keep"]:
+            recorded.delete()
+
+    async def fire(self, url, deliveries, secret, concurrency):
+        timings = []
+        statuses = Counter()
+        queue = asyncio.Queue()
+        for payload in deliveries:
+            queue.put_nowait(payload)
+
+        async def worker(session):
+            while not queue.empty():
+                payload = queue.get_nowait()
+                headers = {
+                    "Content-Type": "application/json",
+                    "Stripe-Signature": sign_webhook_payload(payload, secret),
+                }
+                start = time.perf_counter()
+                try:
+                    async with session.post(url, data=payload, headers=headers) as r:
+                        await r.read()
+                        statuses[r.status] += 1
+                except aiohttp.ClientError as exc:
+                    statuses[type(exc).__name__] += 1
+                timings.append((time.perf_counter() - start) * 1000)
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        return timings, statuses
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from payments.events import apply_event
+from payments.models import StripeEvent
+from payments.tasks import apply_stripe_event
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-applies stored Stripe webhook events. By default every event "
+        "that was recorded but never applied is queued again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "event_ids", nargs="*", help="Stripe event ids (evt_...) to replay."
+        )
+        parser.add_argument("--type", help="Only replay events of this type.")
+        parser.add_argument(
+            "--since", help="Only replay events received at or after this time."
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Also replay events that were already applied.",
+        )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Apply events in this process instead of queueing tasks.",
+        )
+
+    def handle(self, *args, **options):
+        events = StripeEvent.objects.order_by("received_at", "pk")
+        if options["event_ids"]:
+            events = events.filter(event_id__in=options["event_ids"])
+        if options["type"]:
+            events = events.filter(type=options["type"])
+        if options["since"]:
+            since = parse_datetime(options["since"])
+            if since is None:
+                raise CommandError(f"Invalid --since value: {options['since']}")
+            events = events.filter(received_at__gte=since)
+        if options["force"]:
+            # Handlers are idempotent, so re-opening an applied event is safe.
+            events.filter(processed_at__isnull=False).update(processed_at=None)
+        events = events.filter(processed_at__isnull=True)
+
+        replayed = 0
+        for event_pk in events.values_list("pk", flat=True).iterator():
+            if options["sync"]:
+                apply_event(event_pk)
+            else:
+                apply_stripe_event.delay(event_pk)
+            replayed += 1
+
+        action = "Applied" if options["sync"] else "Queued"
+        self.stdout.write(self.style.SUCCESS(f"{action} {replayed} event(s)."))
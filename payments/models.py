@@ -7,6 +7,7 @@ class Payment(models.Model):
     class Status(models.TextChoices):
         PENDING = "PENDING", "Pending"
         PAID = "PAID", "Paid"
+        FAILED = "FAILED", "Failed"
 
     class Type(models.TextChoices):
         PAYMENT = "PAYMENT", "Payment"
@@ -19,8 +20,9 @@ class Payment(models.Model):
     borrowing = models.ForeignKey(
         Borrowing, on_delete=models.CASCADE, related_name="payments"
     )
-    session_url = models.URLField(max_length=1000)
-    session_id = models.CharField(max_length=255)
+    # Filled in by `payments.tasks.create_checkout_session`.
+    session_url = models.URLField(max_length=1000, blank=True)
+    session_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
     money_to_pay = models.DecimalField(max_digits=8, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -29,3 +31,16 @@ class Payment(models.Model):
             f"{self.type}, user: {self.borrowing.user.id}, "
             f"book: {self.borrowing.book.title}"
         )
+
+
+class StripeEvent(models.Model):
+    """A verified Stripe webhook event, stored once and applied asynchronously."""
+
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.type} ({self.event_id})"
@@ -1,11 +1,19 @@
+import hashlib
+import hmac
+import time
+
 import stripe
 from decimal import Decimal
 from django.conf import settings
+from django.db import transaction
 from django.urls import reverse
 
+from borrowings.stats import record_fine
 from payments.models import Payment
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
+if settings.STRIPE_API_BASE:
+    stripe.api_base = settings.STRIPE_API_BASE
 
 FINE_MULTIPLIER = 2
 
@@ -39,33 +47,61 @@ def get_cancel_url(request):
 
 
 def create_stripe_payment_session(borrowing, request, is_fine=False, overdue_days=0):
+    """
+    Record a pending payment and queue creation of its Checkout session.
+
+    The session URL is filled in by a Celery task once the transaction
+    commits; clients poll the payment or get the link pushed to Telegram.
+    """
+    from payments.tasks import create_checkout_session
+
     total_amount, payment_type = get_total_amount_and_type(borrowing, is_fine, overdue_days)
 
-    session = stripe.checkout.Session.create(
+    payment = Payment.objects.create(
+        borrowing=borrowing,
+        money_to_pay=total_amount,
+        type=payment_type,
+    )
+    if is_fine:
+        record_fine(borrowing.user_id, borrowing.book_id, total_amount)
+
+    success_url = get_success_url(request, borrowing)
+    cancel_url = get_cancel_url(request)
+    transaction.on_commit(
+        lambda: create_checkout_session.delay(payment.id, success_url, cancel_url)
+    )
+
+    return payment
+
+
+def create_checkout_session(payment, success_url, cancel_url):
+    # The key is stable per payment, so a retried task gets the session
+    # Stripe already created instead of a second one.
+    return stripe.checkout.Session.create(
         payment_method_types=["card"],
         line_items=[
             {
                 "price_data": {
                     "currency": "usd",
-                    "unit_amount": int(total_amount * 100),
+                    "unit_amount": int(payment.money_to_pay * 100),
                     "product_data": {
-                        "name": f"Payment for Borrowing ID {borrowing.id}"
+                        "name": f"Payment for Borrowing ID {payment.borrowing_id}"
                     },
                 },
                 "quantity": 1,
             }
         ],
         mode="payment",
-        success_url=get_success_url(request, borrowing),
-        cancel_url=get_cancel_url(request),
+        success_url=success_url,
+        cancel_url=cancel_url,
+        idempotency_key=f"checkout-session-{payment.id}",
     )
 
-    payment = Payment.objects.create(
-        borrowing=borrowing,
-        session_url=session.url,
-        session_id=session.id,
-        money_to_pay=total_amount,
-        type=payment_type,
-    )
 
-    return payment
+def sign_webhook_payload(payload, secret, timestamp=None):
+    """Build a `Stripe-Signature` header for `payload`, as Stripe would."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signature = hmac.new(
+        secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={signature}"
@@ -0,0 +1,93 @@
+"""
+Minimal stand-in for the Stripe Checkout Sessions API, used by tests and
+local development. Point the SDK at it through STRIPE_API_BASE.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class StubStripeAPI:
+    def __init__(self, fail_first=0, latency=0.0):
+        # Failures are answered with 429s: Stripe does not store those
+        # against the idempotency key, so a retry with the same key succeeds.
+        self.fail_first = fail_first
+        self.latency = latency
+        self.requests = []
+        self.sessions = {}
+        self._responses = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def handle(self, path, headers, body):
+        params = parse_qs(body)
+        key = headers.get("Idempotency-Key")
+        with self._lock:
+            self.requests.append((path, key, params))
+
+            if path != "/v1/checkout/sessions":
+                return 404, {"error": {"type": "invalid_request_error"}}
+            if key in self._responses:
+                return self._responses[key]
+            if len(self.requests) <= self.fail_first:
+                return 429, {
+                    "error": {
+                        "type": "invalid_request_error",
+                        "code": "rate_limit",
+                        "message": "Too many requests",
+                    }
+                }
+
+            session_id = f"cs_test_{len(self.sessions) + 1}"
+            session = {
+                "id": session_id,
+                "object": "checkout.session",
+                "mode": params.get("mode", [""])[0],
+                "amount_total": int(
+                    params.get("line_items[0][price_data][unit_amount]", [0])[0]
+                ),
+                "success_url": params.get("success_url", [""])[0],
+                "url": f"{self.base_url}/pay/{session_id}",
+            }
+            self.sessions[session_id] = session
+            if key:
+                self._responses[key] = (200, session)
+            return 200, session
+
+    def make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode()
+                if stub.latency:
+                    threading.Event().wait(stub.latency)
+                status, payload = stub.handle(self.path, self.headers, body)
+
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.send_header("Stripe-Should-Retry", "false")
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,73 @@
+import logging
+
+import stripe
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+
+from notifications.loans import invalidate_loans_on_commit
+from notifications.tasks import send_telegram_message
+from payments import events, stripe_utils
+from payments.models import Payment
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    stripe.error.APIConnectionError,
+    stripe.error.APIError,
+    stripe.error.RateLimitError,
+)
+# Seconds before the first retry, doubled on every further attempt
+RETRY_BACKOFF = 1
+
+
+@shared_task(bind=True, max_retries=settings.STRIPE_SESSION_MAX_RETRIES)
+def create_checkout_session(self, payment_id, success_url, cancel_url):
+    """
+    Create the Stripe Checkout session of a pending payment.
+
+    Transient Stripe errors are retried with exponential backoff; once
+    retries run out, or on any other Stripe error, the payment is marked
+    failed so polling clients stop waiting.
+    """
+    payment = Payment.objects.select_related("borrowing__user").get(pk=payment_id)
+    if payment.session_id or payment.status != Payment.Status.PENDING:
+        return payment.session_id
+
+    try:
+        session = stripe_utils.create_checkout_session(payment, success_url, cancel_url)
+    except RETRYABLE_ERRORS as exc:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=exc, countdown=RETRY_BACKOFF * 2**self.request.retries)
+        mark_failed(payment_id)
+        raise
+    except stripe.error.StripeError:
+        mark_failed(payment_id)
+        raise
+
+    created = Payment.objects.filter(pk=payment_id, session_id__isnull=True).update(
+        session_id=session.id, session_url=session.url
+    )
+
+    if created:
+        invalidate_loans_on_commit(pk=payment.borrowing.user_id)
+
+    chat_id = payment.borrowing.user.chat_id
+    if created and chat_id:
+        send_telegram_message.delay(
+            chat_id,
+            f"💳 Your payment of ${payment.money_to_pay} is ready:\n{session.url}",
+        )
+    return session.id
+
+
+@transaction.atomic
+def mark_failed(payment_id):
+    logger.error(f"Failed to create a Stripe Checkout session for payment {payment_id}")
+    events.fail_payment(pk=payment_id)
+
+
+@shared_task(acks_late=True)
+def apply_stripe_event(event_pk):
+    """Apply a stored Stripe webhook event; redeliveries are no-ops."""
+    return events.apply_event(event_pk)
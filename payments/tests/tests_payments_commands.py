@@ -0,0 +1,70 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.models import Payment, StripeEvent
+
+User = get_user_model()
+
+
+class ReplayStripeEventsCommandTest(TestCase):
+    """Test suite for the replay_stripe_events management command."""
+
+    def setUp(self):
+        """Set up a pending payment and a stored, unapplied event for it."""
+        user = User.objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=10.00,
+        )
+        borrowing = Borrowing.objects.create(
+            user=user,
+            book=self.book,
+            expected_return_date=timezone.now().date() + timedelta(days=7),
+        )
+        self.payment = Payment.objects.create(
+            borrowing=borrowing, session_id="cs_test_1", money_to_pay=70.00
+        )
+        self.event = StripeEvent.objects.create(
+            event_id="evt_1",
+            type="checkout.session.completed",
+            payload={"data": {"object": {"id": "cs_test_1"}}},
+        )
+
+    @patch("payments.management.commands.replay_stripe_events.apply_stripe_event")
+    def test_unprocessed_events_are_queued(self, mock_task):
+        """Test that only events which were never applied are queued."""
+        StripeEvent.objects.create(
+            event_id="evt_2",
+            type="checkout.session.completed",
+            payload={},
+            processed_at=timezone.now(),
+        )
+
+        call_command("replay_stripe_events", stdout=StringIO())
+
+        mock_task.delay.assert_called_once_with(self.event.pk)
+
+    def test_sync_replay_applies_event_once(self):
+        """Test that a synchronous replay applies the event and a forced one is a no-op."""
+        call_command("replay_stripe_events", "--sync", stdout=StringIO())
+        call_command("replay_stripe_events", "--sync", "--force", stdout=StringIO())
+
+        self.payment.refresh_from_db()
+        self.book.refresh_from_db()
+        self.event.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.PAID)
+        self.assertEqual(self.book.inventory, 4)
+        self.assertIsNotNone(self.event.processed_at)
@@ -1,3 +1,4 @@
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -64,3 +65,15 @@ class PaymentModelTest(TestCase):
     def test_payment_type_choices(self):
         """Test that payment type is one of the valid choices."""
         self.assertIn(self.payment.type, [type[0] for type in Payment.Type.choices])
+
+    def test_session_id_is_unique(self):
+        """Test that a Stripe session belongs to at most one payment."""
+        Payment.objects.create(borrowing=self.borrowing, money_to_pay=70.00)
+        Payment.objects.create(borrowing=self.borrowing, money_to_pay=70.00)
+
+        with self.assertRaises(IntegrityError):
+            Payment.objects.create(
+                borrowing=self.borrowing,
+                session_id="test_session_id",
+                money_to_pay=70.00,
+            )
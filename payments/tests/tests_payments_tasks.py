@@ -0,0 +1,119 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import stripe
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from books.models import Book
+from borrowings.models import Borrowing
+from payments.models import Payment
+from payments.stub_stripe_api import StubStripeAPI
+from payments.tasks import create_checkout_session
+
+User = get_user_model()
+
+SUCCESS_URL = "http://testserver/api/borrow/borrowings/1/"
+CANCEL_URL = "http://testserver/api/payments/cancel/"
+
+
+@patch("payments.tasks.RETRY_BACKOFF", 0)
+@patch("payments.tasks.send_telegram_message.delay")
+class CreateCheckoutSessionTaskTest(TestCase):
+    """Test suite for the Checkout session task against a stub Stripe API."""
+
+    def setUp(self):
+        """Start a stub Stripe API and create a pending payment."""
+        self.stub = StubStripeAPI()
+        for name, value in (
+            ("api_base", self.stub.start()),
+            ("api_key", "sk_test_stub"),
+        ):
+            patcher = patch.object(stripe, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.stub.stop)
+
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            password="testpass123",
+            chat_id=123456,
+        )
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=5,
+            daily_fee=10.00,
+        )
+        self.borrowing = Borrowing.objects.create(
+            user=self.user,
+            book=self.book,
+            expected_return_date=timezone.now().date() + timedelta(days=7),
+            has_copy=True,
+        )
+        self.payment = Payment.objects.create(
+            borrowing=self.borrowing,
+            money_to_pay=70.00,
+        )
+
+    def run_task(self):
+        return create_checkout_session.apply(
+            args=(self.payment.id, SUCCESS_URL, CANCEL_URL)
+        )
+
+    def test_session_is_created_and_pushed(self, mock_push):
+        """Test that the session is stored and its link sent to Telegram."""
+        result = self.run_task()
+
+        self.payment.refresh_from_db()
+        self.assertEqual(result.get(), "cs_test_1")
+        self.assertEqual(self.payment.session_id, "cs_test_1")
+        self.assertEqual(
+            self.payment.session_url, self.stub.sessions["cs_test_1"]["url"]
+        )
+        self.assertEqual(self.stub.sessions["cs_test_1"]["amount_total"], 7000)
+        mock_push.assert_called_once()
+        self.assertEqual(mock_push.call_args[0][0], 123456)
+        self.assertIn(self.payment.session_url, mock_push.call_args[0][1])
+
+    def test_retries_reuse_the_idempotency_key(self, _):
+        """Test that transient errors are retried without duplicate sessions."""
+        self.stub.fail_first = 2
+
+        self.run_task()
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.session_id, "cs_test_1")
+        keys = {key for _, key, _ in self.stub.requests}
+        self.assertEqual(len(self.stub.requests), 3)
+        self.assertEqual(keys, {f"checkout-session-{self.payment.id}"})
+        self.assertEqual(len(self.stub.sessions), 1)
+
+    def test_completed_payment_is_not_sent_again(self, mock_push):
+        """Test that a redelivered task does not call Stripe twice."""
+        self.run_task()
+        self.run_task()
+
+        self.assertEqual(len(self.stub.requests), 1)
+        mock_push.assert_called_once()
+
+    def test_exhausted_retries_mark_payment_failed(self, mock_push):
+        """Test that a failed payment gives back the copy its loan reserved."""
+        self.stub.fail_first = 100
+
+        with patch.object(create_checkout_session, "max_retries", 1):
+            with self.assertLogs("payments.tasks", level="ERROR"):
+                result = self.run_task()
+
+        self.assertTrue(result.failed())
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.FAILED)
+        self.assertEqual(len(self.stub.requests), 2)
+        mock_push.assert_not_called()
+
+        self.book.refresh_from_db()
+        self.borrowing.refresh_from_db()
+        self.assertEqual(self.book.inventory, 6)
+        self.assertFalse(self.borrowing.has_copy)
@@ -1,18 +1,43 @@
-from django.test import TestCase
+import threading
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.utils import timezone
 from datetime import timedelta
+from unittest.mock import patch
 import json
 
-from payments.models import Payment
+from payments.events import apply_event
+from payments.models import Payment, StripeEvent
+from payments.stripe_utils import sign_webhook_payload
 from borrowings.models import Borrowing
 from books.models import Book
 
 User = get_user_model()
 
+WEBHOOK_SECRET = "whsec_test"
+
+
+def signed_event(session_id, event_id=None, type="checkout.session.completed"):
+    """Build a signed Checkout session webhook request."""
+    payload = json.dumps(
+        {
+            "id": event_id or f"evt_{session_id}",
+            "object": "event",
+            "type": type,
+            "data": {"object": {"id": session_id}},
+        }
+    )
+    return {
+        "data": payload,
+        "content_type": "application/json",
+        "HTTP_STRIPE_SIGNATURE": sign_webhook_payload(payload, WEBHOOK_SECRET),
+    }
+
 
 class PaymentViewSetTest(TestCase):
     """Test suite for PaymentViewSet endpoints."""
@@ -73,6 +98,34 @@ class PaymentViewSetTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["results"]), 1)
 
+    def test_payment_list_with_cursor(self):
+        """Test that payments can be paged by cursor without a count."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse("payments:payment-list")
+        response = self.client.get(url, {"cursor": ""})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertEqual(response.data["results"][0]["id"], self.payment.id)
+        self.assertIsNone(response.data["next"])
+
+    def test_payment_export_for_staff(self):
+        """Test that staff can stream every payment as CSV."""
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("payments:payment-export")
+        response = self.client.get(url, {"format": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "borrowing_id", "user_id"])
+        self.assertEqual(
+            lines[1].split(",")[:4],
+            [str(self.payment.id), str(self.borrowing.id), str(self.user.id), "PENDING"],
+        )
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_payment_list_for_unauthorized(self):
         """Test that unauthorized users cannot access payment list."""
         url = reverse("payments:payment-list")
@@ -80,6 +133,8 @@ class PaymentViewSetTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@patch("payments.views.apply_stripe_event.delay", side_effect=apply_event)
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET)
 class StripeWebhookViewTest(TestCase):
     """Test suite for Stripe webhook endpoint."""
 
@@ -102,6 +157,7 @@ class StripeWebhookViewTest(TestCase):
             user=self.user,
             book=self.book,
             expected_return_date=timezone.now().date() + timedelta(days=7),
+            has_copy=True,
         )
         self.payment = Payment.objects.create(
             status=Payment.Status.PENDING,
@@ -112,7 +168,12 @@ class StripeWebhookViewTest(TestCase):
             money_to_pay=70.00,
         )
 
-    def test_stripe_webhook_invalid_payload(self):
+    def post_event(self, **request):
+        """Deliver a webhook and run the tasks it queues on commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse("payments:stripe-webhook"), **request)
+
+    def test_stripe_webhook_invalid_payload(self, mock_apply):
         """Test webhook endpoint rejects invalid payload."""
         url = reverse("payments:stripe-webhook")
         payload = {"type": "invalid"}
@@ -123,6 +184,165 @@ class StripeWebhookViewTest(TestCase):
             HTTP_STRIPE_SIGNATURE="invalid_signature",
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(StripeEvent.objects.exists())
+        mock_apply.assert_not_called()
+
+    def test_stripe_webhook_records_event_and_defers_work(self, mock_apply):
+        """Test that the webhook stores the event and queues it for later."""
+        mock_apply.side_effect = None
+        response = self.post_event(**signed_event("test_session_id"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        event = StripeEvent.objects.get()
+        self.assertEqual(event.event_id, "evt_test_session_id")
+        self.assertEqual(event.type, "checkout.session.completed")
+        self.assertIsNone(event.processed_at)
+        mock_apply.assert_called_once_with(event.pk)
+
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.PENDING)
+
+    def test_stripe_webhook_completes_payment(self, _):
+        """Test that a completed session marks the loan paid and keeps its copy."""
+        response = self.post_event(**signed_event("test_session_id"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.payment.refresh_from_db()
+        self.borrowing.refresh_from_db()
+        self.book.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.PAID)
+        self.assertTrue(self.borrowing.is_paid)
+        self.assertEqual(self.book.inventory, 5)
+        self.assertIsNotNone(StripeEvent.objects.get().processed_at)
+
+    def test_stripe_webhook_replay_takes_one_copy(self, mock_apply):
+        """Test that a redelivered event is acknowledged but not re-applied."""
+        self.post_event(**signed_event("test_session_id"))
+        response = self.post_event(**signed_event("test_session_id"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        self.assertEqual(mock_apply.call_count, 1)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 5)
+
+    def test_stripe_webhook_requeues_unprocessed_event(self, mock_apply):
+        """Test that a redelivery queues an event whose task was lost."""
+        mock_apply.side_effect = None
+        self.post_event(**signed_event("test_session_id"))
+        self.post_event(**signed_event("test_session_id"))
+
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        self.assertEqual(mock_apply.call_count, 2)
+
+    def test_stripe_webhook_expired_session(self, _):
+        """Test that an expired session fails the payment and restocks once."""
+        self.post_event(
+            **signed_event("test_session_id", type="checkout.session.expired")
+        )
+        self.post_event(
+            **signed_event(
+                "test_session_id", event_id="evt_2", type="checkout.session.expired"
+            )
+        )
+
+        self.payment.refresh_from_db()
+        self.borrowing.refresh_from_db()
+        self.book.refresh_from_db()
+        self.assertEqual(self.payment.status, Payment.Status.FAILED)
+        self.assertFalse(self.borrowing.has_copy)
+        self.assertEqual(self.book.inventory, 6)
+
+    def test_stripe_webhook_out_of_stock(self, _):
+        """Test that paying a loan that gave its copy back never oversells."""
+        Borrowing.objects.filter(id=self.borrowing.id).update(has_copy=False)
+        Book.objects.filter(id=self.book.id).update(inventory=0)
+
+        with self.assertLogs("payments.events", level="WARNING"):
+            response = self.post_event(**signed_event("test_session_id"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+
+    def test_apply_event_queries(self, mock_apply):
+        """Test that applying an event takes a fixed, small number of queries."""
+        mock_apply.side_effect = None
+        self.post_event(**signed_event("test_session_id"))
+        event = StripeEvent.objects.get()
+
+        # Lock event, lock payment, mark paid, mark borrowing paid, update the
+        # user and book stats and mark the event processed, in one
+        # transaction.
+        with self.assertNumQueries(9):
+            self.assertTrue(apply_event(event.pk))
+        with self.assertNumQueries(3):
+            self.assertFalse(apply_event(event.pk))
+
+
+@patch("payments.views.apply_stripe_event.delay", side_effect=apply_event)
+@patch("notifications.signals.broadcast_telegram_message.delay")
+@override_settings(STRIPE_WEBHOOK_SECRET=WEBHOOK_SECRET)
+class StripeWebhookContentionTest(TransactionTestCase):
+    """Test suite for concurrent deliveries of the Stripe webhook."""
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+        self.book = Book.objects.create(
+            title="Test Book",
+            author="Test Author",
+            cover="HARD",
+            inventory=0,
+            daily_fee=10.00,
+        )
+        # Every copy is already reserved by one of the loans.
+        self.session_ids = []
+        for i in range(5):
+            borrowing = Borrowing.objects.create(
+                user=user,
+                book=self.book,
+                expected_return_date=timezone.now().date() + timedelta(days=7),
+                has_copy=True,
+            )
+            Payment.objects.create(
+                borrowing=borrowing,
+                session_url="http://example.com/session",
+                session_id=f"session_{i}",
+                money_to_pay=70.00,
+            )
+            self.session_ids.append(f"session_{i}")
+
+    def test_concurrent_webhooks_keep_inventory_exact(self, *_):
+        """Test that duplicated, racing deliveries apply each payment once."""
+        url = reverse("payments:stripe-webhook")
+        requests = [signed_event(session_id) for session_id in self.session_ids] * 3
+        barrier = threading.Barrier(len(requests))
+
+        def deliver(request):
+            try:
+                barrier.wait()
+                APIClient().post(url, **request)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=deliver, args=(request,)) for request in requests
+        ]
+        with self.assertNoLogs("payments.events", level="WARNING"):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.inventory, 0)
+        self.assertEqual(Borrowing.objects.filter(is_paid=True).count(), 5)
+        self.assertEqual(Payment.objects.filter(status=Payment.Status.PAID).count(), 5)
+        self.assertEqual(
+            StripeEvent.objects.filter(processed_at__isnull=False).count(), 5
+        )
 
 
 class PaymentCancelViewTest(TestCase):
@@ -1,11 +1,18 @@
+import json
+
 import stripe
 from django.conf import settings
+from django.db import transaction
 from rest_framework import status, permissions, viewsets
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from config.async_views import AsyncListModelMixin, AsyncViewSetMixin
+from config.exports import ExportMixin
+from payments.events import record_event
 from payments.models import Payment
 from payments.serializers import PaymentSerializer
+from payments.tasks import apply_stripe_event
 
 
 class IsAdminOrOwner(permissions.BasePermission):
@@ -13,18 +20,41 @@ class IsAdminOrOwner(permissions.BasePermission):
         return request.user.is_staff or obj.borrowing.user == request.user
 
 
-class PaymentViewSet(viewsets.ReadOnlyModelViewSet):
+class PaymentViewSet(
+    AsyncViewSetMixin,
+    ExportMixin,
+    AsyncListModelMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     serializer_class = PaymentSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrOwner]
 
+    export_filename = "payments"
+    export_fields = (
+        ("id", "id"),
+        ("borrowing_id", "borrowing_id"),
+        ("user_id", "borrowing__user_id"),
+        ("status", "status"),
+        ("type", "type"),
+        ("money_to_pay", "money_to_pay"),
+        ("session_id", "session_id"),
+        ("created_at", "created_at"),
+    )
+
     def get_queryset(self):
         user = self.request.user
+        queryset = Payment.objects.order_by("-id")
         if user.is_staff:
-            return Payment.objects.all()
-        return Payment.objects.filter(borrowing__user=user)
+            return queryset
+        return queryset.filter(borrowing__user=user)
 
 
 class StripeWebhookView(APIView):
+    """
+    Verifies a Stripe event, records it once and acknowledges right away;
+    `payments.tasks.apply_stripe_event` applies it in the background.
+    """
+
     authentication_classes = []
     permission_classes = []
 
@@ -40,20 +70,9 @@ class StripeWebhookView(APIView):
         except stripe.error.SignatureVerificationError:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        if event["type"] == "checkout.session.completed":
-            session = event["data"]["object"]
-            session_id = session.get("id")
-            payment = Payment.objects.filter(session_id=session_id).first()
-            if payment and payment.status != Payment.Status.PAID:
-                payment.status = Payment.Status.PAID
-                payment.save()
-
-                borrowing = payment.borrowing
-                if borrowing and not borrowing.is_paid:
-                    borrowing.is_paid = True
-                    borrowing.save()
-                    borrowing.book.inventory -= 1
-                    borrowing.book.save()
+        event_pk = record_event(event, json.loads(payload))
+        if event_pk is not None:
+            transaction.on_commit(lambda: apply_stripe_event.delay(event_pk))
 
         return Response(status=status.HTTP_200_OK)
 
@@ -0,0 +1,82 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from user.tokens import AUTH_CLAIMS
+
+logger = logging.getLogger(__name__)
+
+AUTH_STATE_KEY = "user:{pk}:auth-state"
+
+
+def get_auth_state(user):
+    return {"is_active": user.is_active, **{c: getattr(user, c) for c in AUTH_CLAIMS}}
+
+
+def publish_auth_state(pk, state):
+    """
+    Record a user's current flags for as long as a token issued before the
+    change can live, so those tokens are checked against them.
+    """
+    try:
+        cache.set(
+            AUTH_STATE_KEY.format(pk=pk),
+            state,
+            timeout=settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"].total_seconds(),
+        )
+    except Exception:
+        logger.exception(f"Failed to publish the auth state of user {pk}")
+
+
+def claims_user(pk, state):
+    """A `User` with only its id and flags loaded; other fields load on access."""
+    User = get_user_model()
+    values = {"id": pk, **state}
+    return User.from_db(
+        router.db_for_read(User),
+        list(values),
+        [values[f.attname] for f in User._meta.concrete_fields if f.attname in values],
+    )
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Builds `request.user` from the flags in the access token instead of
+    loading the user row.
+
+    Saving or deleting a user publishes their flags to the cache for an
+    access token's lifetime. Those flags, when present, take precedence over
+    the token's, so a deactivated user or a changed role takes effect at once
+    without a query. Tokens issued without the claims, or a cache outage,
+    fall back to loading the user.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in AUTH_CLAIMS):
+            return super().get_user(validated_token)
+        try:
+            pk = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            state = cache.get(AUTH_STATE_KEY.format(pk=pk))
+        except Exception:
+            logger.exception("Failed to read the auth state cache")
+            return super().get_user(validated_token)
+
+        if state is None:
+            state = {
+                "is_active": True,
+                **{claim: validated_token[claim] for claim in AUTH_CLAIMS},
+            }
+        elif not state["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return claims_user(pk, state)
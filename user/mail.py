@@ -0,0 +1,118 @@
+import contextlib
+import logging
+import time
+from datetime import timedelta
+from smtplib import SMTPRecipientsRefused
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from user.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(to, subject, body):
+    """Store an email and have a worker send it once the transaction commits."""
+    from user.tasks import send_queued_emails
+
+    email = OutgoingEmail.objects.create(to=to, subject=subject, body=body)
+    transaction.on_commit(send_queued_emails.delay)
+    return email
+
+
+def pending_emails():
+    """Unsent emails with attempts left that no live worker has claimed."""
+    claim_expired = timezone.now() - timedelta(seconds=settings.EMAIL_CLAIM_TIMEOUT)
+    return OutgoingEmail.objects.filter(
+        Q(claimed_at__isnull=True) | Q(claimed_at__lt=claim_expired),
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_MAX_ATTEMPTS,
+    ).order_by("id")
+
+
+def claim_batch(batch_size):
+    """Claim up to `batch_size` pending emails in a short transaction."""
+    with transaction.atomic():
+        batch = list(pending_emails().select_for_update(skip_locked=True)[:batch_size])
+        OutgoingEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+            claimed_at=timezone.now()
+        )
+    return batch
+
+
+def charge_attempt(email_ids, error):
+    OutgoingEmail.objects.filter(pk__in=email_ids).update(
+        attempts=F("attempts") + 1, last_error=str(error), claimed_at=None
+    )
+
+
+def release_claims(emails):
+    OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+        claimed_at=None
+    )
+
+
+def send_queued(batch_size=None, rate=None):
+    """
+    Send up to `batch_size` queued emails over one SMTP connection, at most
+    `rate` per second, and return how many were sent.
+
+    The batch is claimed and committed before anything is sent, so concurrent
+    workers take different batches and no transaction stays open across SMTP
+    sessions. Each email is marked sent as soon as it is. An address the
+    server refuses is charged an attempt and skipped; any other delivery error
+    charges the failed email, hands the rest of the batch back and is raised
+    for a retry. A connection that fails to open hands back the whole batch.
+    """
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    rate = settings.EMAIL_RATE if rate is None else rate
+    interval = 1 / rate if rate else 0
+
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0
+
+    sent, error = 0, None
+    connection = get_connection()
+    try:
+        connection.open()
+    except OSError:
+        # Nothing was sent; hand the whole batch back for the retry.
+        release_claims(batch)
+        raise
+    try:
+        next_slot = time.monotonic()
+        for position, email in enumerate(batch):
+            delay = next_slot - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_slot = max(next_slot, time.monotonic()) + interval
+            message = EmailMessage(
+                subject=email.subject, body=email.body, to=[email.to]
+            )
+            try:
+                connection.send_messages([message])
+            except SMTPRecipientsRefused as exc:
+                logger.warning(f"Queued email {email.pk} was refused: {exc}")
+                charge_attempt([email.pk], exc)
+                continue
+            except OSError as exc:
+                error = exc
+                charge_attempt([email.pk], exc)
+                release_claims(batch[position + 1 :])
+                break
+            OutgoingEmail.objects.filter(pk=email.pk).update(sent_at=timezone.now())
+            sent += 1
+    finally:
+        # The server may already have dropped a failed session.
+        with contextlib.suppress(OSError):
+            connection.close()
+
+    if error is not None:
+        logger.warning(f"Sent {sent} queued emails before failing: {error}")
+        raise error
+    return sent
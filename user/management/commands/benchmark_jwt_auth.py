@@ -0,0 +1,65 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.tokens import ClaimsRefreshToken
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests the borrowing summary, borrowing list and payment list with "
+        "a token that loads the user row and with one carrying the user's "
+        "flags, reporting queries and latency per request. The user is "
+        "rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email="jwt-auth-benchmark@example.com", password=None, is_verified=True
+            )
+            tokens = {
+                "row": AccessToken.for_user(user),
+                "claims": ClaimsRefreshToken.for_user(user).access_token,
+            }
+            urls = (
+                reverse("user:summary"),
+                reverse("borrowings:borrowing-list"),
+                reverse("payments:payment-list"),
+            )
+
+            self.stdout.write(
+                f"{'endpoint':>28} {'token':>7} {'queries':>8} {'p50 ms':>8}"
+            )
+            for url in urls:
+                for name, token in tokens.items():
+                    client = APIClient(SERVER_NAME=settings.ALLOWED_HOSTS[0])
+                    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+                    client.get(url)
+                    timings = []
+                    with CaptureQueriesContext(connection) as queries:
+                        for _ in range(options["requests"]):
+                            start = time.perf_counter()
+                            response = client.get(url)
+                            timings.append((time.perf_counter() - start) * 1000)
+                    if response.status_code != 200:
+                        raise CommandError(f"{url} answered {response.status_code}.")
+                    self.stdout.write(
+                        f"{url:>28} {name:>7} "
+                        f"{len(queries) / options['requests']:>8.1f} "
+                        f"{statistics.median(timings):>8.2f}"
+                    )
+            transaction.set_rollback(True)
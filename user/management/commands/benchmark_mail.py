@@ -0,0 +1,106 @@
+import threading
+import time
+
+from django.core.mail import EmailMessage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from user.mail import queue_email, send_queued
+from user.smtp_sink import SMTPSink
+
+MODES = ("threads", "queued")
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends a burst of verification-sized emails to a local SMTP sink, "
+        "once with a thread and connection per email and once through the "
+        "queue in batches over one connection each, reporting emails per "
+        "second. Queued rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+        parser.add_argument("--emails", type=int, default=500)
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--rate", type=float, default=0, help="Emails per second; 0 is unbounded."
+        )
+        parser.add_argument(
+            "--connect-latency",
+            type=float,
+            default=0.05,
+            help="Seconds the sink takes to open a session.",
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.002,
+            help="Seconds the sink takes per message.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'mode':>8} {'emails':>7} {'seconds':>8} {'emails/s':>9} "
+            f"{'sessions':>9} {'threads':>8}"
+        )
+        for mode in options["modes"]:
+            sink = SMTPSink(
+                latency=options["latency"],
+                connect_latency=options["connect_latency"],
+            )
+            port = sink.start()
+            try:
+                with override_settings(
+                    EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                    EMAIL_HOST="127.0.0.1",
+                    EMAIL_PORT=port,
+                    EMAIL_USE_TLS=False,
+                    EMAIL_HOST_USER="",
+                    EMAIL_HOST_PASSWORD="",
+                ):
+                    start = time.perf_counter()
+                    threads = getattr(self, f"send_{mode}")(options)
+                    elapsed = time.perf_counter() - start
+            finally:
+                sink.stop()
+
+            self.stdout.write(
+                f"{mode:>8} {len(sink.messages):>7} {elapsed:>8.2f} "
+                f"{len(sink.messages) / elapsed:>9.1f} {sink.connections:>9} "
+                f"{threads:>8}"
+            )
+
+    def send_threads(self, options):
+        """The previous sender: a new thread, and SMTP session, per email."""
+        threads = [
+            # Failed sends show up as missing emails.
+            threading.Thread(
+                target=self.message(i).send, kwargs={"fail_silently": True}
+            )
+            for i in range(options["emails"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(threads)
+
+    def send_queued(self, options):
+        with transaction.atomic():
+            for i in range(options["emails"]):
+                message = self.message(i)
+                queue_email(message.to[0], message.subject, message.body)
+            while send_queued(options["batch_size"], options["rate"]):
+                pass
+            transaction.set_rollback(True)
+        return 0
+
+    def message(self, i):
+        return EmailMessage(
+            subject="Verify your email",
+            body=f"Hi user{i}@example.com Use the link below to verify your "
+            f"email \nhttp://localhost/api/user/email-verify/?token={'x' * 150}",
+            to=[f"user{i}@example.com"],
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from user.tokens import copy_blacklist_to_cache, flush_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired rows from the token_blacklist tables in batches. "
+        "With --copy-blacklist, first blacklists the table's unexpired tokens "
+        "in the cache, which is where refreshes now check for them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int)
+        parser.add_argument("--copy-blacklist", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["copy_blacklist"]:
+            copied = copy_blacklist_to_cache()
+            self.stdout.write(f"Copied {copied} blacklisted tokens to the cache.")
+        deleted = flush_expired_tokens(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired tokens."))
@@ -0,0 +1,124 @@
+import statistics
+import threading
+import time
+import uuid
+
+import redis
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from user.tokens import ClaimsRefreshToken, blacklist_jti, is_blacklisted
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the blacklist check and write of a token refresh against the "
+        "Redis cache from many threads, reporting the rate reached and the "
+        "server CPU each refresh costs, compares them with the "
+        "token_blacklist tables, and times full refreshes through the "
+        "refresh endpoint. Rows written to the tables are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--refreshes", type=int, default=50_000)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--table-refreshes", type=int, default=2_000)
+        parser.add_argument("--endpoint-refreshes", type=int, default=1_000)
+        parser.add_argument(
+            "--target", type=float, default=10_000, help="Refreshes per second."
+        )
+
+    def handle(self, *args, **options):
+        server = redis.Redis.from_url(settings.CACHES["default"]["LOCATION"])
+        cpu_before = self.server_cpu(server)
+        cache_rate, latencies = self.run_cache(options["refreshes"], options["threads"])
+        server_ms = (self.server_cpu(server) - cpu_before) * 1000 / len(latencies)
+
+        percentiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"cache blacklist: {cache_rate:,.0f} refreshes/s over "
+            f"{options['threads']} threads, p50 {statistics.median(latencies):.3f} "
+            f"ms, p99 {percentiles[98]:.3f} ms"
+        )
+        # This process is usually the bottleneck; the server's own CPU time
+        # bounds what it could take from many web workers.
+        self.stdout.write(
+            f"  Redis CPU {server_ms * 1000:.1f} us per refresh, so one core "
+            f"serves about {1000 / server_ms:,.0f} refreshes/s "
+            f"(target {options['target']:,.0f}/s)"
+        )
+
+        with transaction.atomic():
+            user = User.objects.create_user(
+                email="token-blacklist-load-test@example.com", password=None
+            )
+            table_rate = self.run_tables(user, options["table_refreshes"])
+            self.stdout.write(f"table blacklist: {table_rate:,.0f} refreshes/s")
+            endpoint_rate = self.run_endpoint(user, options["endpoint_refreshes"])
+            self.stdout.write(
+                f"refresh endpoint: {endpoint_rate:,.0f} refreshes/s in one thread"
+            )
+            transaction.set_rollback(True)
+
+    def server_cpu(self, server):
+        info = server.info("cpu")
+        return info["used_cpu_user"] + info["used_cpu_sys"]
+
+    def run_cache(self, refreshes, threads):
+        """Check then blacklist a fresh token id per refresh, as a rotation does."""
+        exp = int(time.time()) + 60
+        per_thread = refreshes // threads
+        latencies = []
+
+        def worker():
+            timings = []
+            for _ in range(per_thread):
+                jti = uuid.uuid4().hex
+                start = time.perf_counter()
+                if is_blacklisted(jti):
+                    raise CommandError(f"{jti} was already blacklisted.")
+                if not blacklist_jti(jti, exp):
+                    raise CommandError(f"{jti} was blacklisted twice.")
+                timings.append((time.perf_counter() - start) * 1000)
+            latencies.extend(timings)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if len(latencies) != per_thread * threads:
+            raise CommandError("A worker thread failed.")
+        return len(latencies) / elapsed, latencies
+
+    def run_tables(self, user, refreshes):
+        """The same check and write with simplejwt's token_blacklist tables."""
+        tokens = [RefreshToken.for_user(user) for _ in range(refreshes)]
+        start = time.perf_counter()
+        for token in tokens:
+            token.check_blacklist()
+            token.blacklist()
+            token.set_jti()
+            token.outstand()
+        return refreshes / (time.perf_counter() - start)
+
+    def run_endpoint(self, user, refreshes):
+        client = APIClient(SERVER_NAME=settings.ALLOWED_HOSTS[0])
+        url = reverse("user:token_refresh")
+        refresh = str(ClaimsRefreshToken.for_user(user))
+        start = time.perf_counter()
+        for _ in range(refreshes):
+            response = client.post(url, {"refresh": refresh})
+            if response.status_code != 200:
+                raise CommandError(f"Refresh answered {response.status_code}.")
+            refresh = response.data["refresh"]
+        return refreshes / (time.perf_counter() - start)
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 01:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("user", "0003_user_is_verified"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("chat_id__isnull", False)),
+                fields=["chat_id"],
+                name="user_chat_id_idx",
+            ),
+        ),
+    ]
@@ -51,3 +51,39 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(
+                fields=["chat_id"],
+                condition=models.Q(chat_id__isnull=False),
+                name="user_chat_id_idx",
+            ),
+        ]
+
+
+class OutgoingEmail(models.Model):
+    """An email queued for delivery by the `send_queued_emails` task."""
+
+    to = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Set while a worker is sending the email; expires after
+    # EMAIL_CLAIM_TIMEOUT, so a crashed worker's batch is taken up again.
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=models.Q(sent_at__isnull=True),
+                name="user_outgoingemail_pending_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to}"
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import get_auth_state, publish_auth_state
+from user.models import User
+
+
+@receiver(post_save, sender=User)
+def publish_saved_auth_state(sender, instance, **kwargs):
+    pk, state = instance.pk, get_auth_state(instance)
+    transaction.on_commit(lambda: publish_auth_state(pk, state))
+
+
+@receiver(post_delete, sender=User)
+def publish_deleted_auth_state(sender, instance, **kwargs):
+    pk, state = instance.pk, {"is_active": False}
+    transaction.on_commit(lambda: publish_auth_state(pk, state))
@@ -0,0 +1,95 @@
+"""
+Minimal SMTP server that accepts and keeps every message, used by tests and
+the mail benchmark. Point EMAIL_HOST and EMAIL_PORT at it.
+"""
+
+import socketserver
+import threading
+
+
+class SMTPSink:
+    def __init__(self, fail_attempts=(), latency=0.0, connect_latency=0.0, refused=()):
+        # Delivery attempts, counted from 1, answered with a temporary error.
+        self.fail_attempts = set(fail_attempts)
+        # Recipient addresses the server rejects outright.
+        self.refused = set(refused)
+        # Seconds spent on each message, and on each new session as a stand-in
+        # for the TLS handshake and login of a real server.
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.messages = []
+        self.connections = 0
+        self._attempts = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def accept(self, sender, recipients, data):
+        with self._lock:
+            self._attempts += 1
+            if self._attempts in self.fail_attempts:
+                return "451 Try again later"
+            self.messages.append((sender, recipients, data))
+            return "250 OK"
+
+    def make_handler(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(f"{line}\r\n".encode())
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                if sink.connect_latency:
+                    threading.Event().wait(sink.connect_latency)
+                self.reply("220 smtp-sink ready")
+                sender, recipients = None, []
+                for line in self.rfile:
+                    command = line.decode().strip()
+                    verb = command[:4].upper()
+                    if verb in ("EHLO", "HELO"):
+                        self.reply("250 smtp-sink")
+                    elif verb == "MAIL":
+                        sender, recipients = command[10:], []
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        if command[8:].strip("<>") in sink.refused:
+                            self.reply("550 No such user")
+                            continue
+                        recipients.append(command[8:])
+                        self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = []
+                        for data_line in self.rfile:
+                            if data_line in (b".\r\n", b".\n"):
+                                break
+                            data.append(data_line)
+                        if sink.latency:
+                            threading.Event().wait(sink.latency)
+                        self.reply(sink.accept(sender, recipients, b"".join(data)))
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("250 OK")
+
+        return Handler
+
+    def start(self):
+        server_class = type(
+            "Server",
+            (socketserver.ThreadingTCPServer,),
+            {"daemon_threads": True, "request_queue_size": 1024},
+        )
+        self._server = server_class(("127.0.0.1", 0), self.make_handler())
+        self.port = self._server.server_address[1]
+        threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        return self.port
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
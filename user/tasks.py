@@ -0,0 +1,23 @@
+from celery import shared_task
+from django.conf import settings
+
+from user import mail, tokens
+
+
+@shared_task(
+    autoretry_for=(OSError,),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    max_retries=settings.EMAIL_MAX_ATTEMPTS,
+)
+def send_queued_emails():
+    """Send a batch of queued emails, queueing another while a backlog remains."""
+    sent = mail.send_queued()
+    if sent == settings.EMAIL_BATCH_SIZE:
+        send_queued_emails.delay()
+    return sent
+
+
+@shared_task
+def flush_expired_tokens():
+    return tokens.flush_expired_tokens()
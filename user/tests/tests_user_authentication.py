@@ -0,0 +1,116 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.testing import LOCMEM_CACHE
+from user.authentication import ClaimsJWTAuthentication
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ClaimsAuthenticationTest(TestCase):
+    """Test suite for authenticating from the flags in the JWT.
+
+    This test suite covers:
+    - Flags issued in obtained and refreshed tokens
+    - Requests authenticated without loading the user row
+    - Deactivated, deleted and changed users taking effect at once
+    - Falling back to the user row for older tokens and cache outages
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="userpass123", is_verified=True
+        )
+        self.summary_url = reverse("user:summary")
+
+    def obtain(self):
+        response = self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": "user@example.com", "password": "userpass123"},
+        )
+        return response.data
+
+    def authorize(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def save(self, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save()
+
+    def test_tokens_carry_flags(self):
+        """Test that obtained access tokens carry the user's flags."""
+        access = AccessToken(self.obtain()["access"])
+
+        self.assertEqual(access["is_staff"], False)
+        self.assertEqual(access["is_superuser"], False)
+        self.assertEqual(access["is_verified"], True)
+
+    def test_request_without_user_query(self):
+        """Test that a request makes no query to authenticate."""
+        self.authorize(self.obtain()["access"])
+        self.client.get(self.summary_url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.summary_url)
+        self.assertEqual(response.status_code, 200)
+
+        # A token issued without the claims loads the user as before.
+        self.authorize(AccessToken.for_user(self.user))
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(self.summary_url).status_code, 200)
+
+    def test_deactivated_and_deleted_users_are_rejected(self):
+        """Test that existing tokens stop working once a user is deactivated."""
+        self.authorize(self.obtain()["access"])
+
+        self.user.is_active = False
+        self.save(self.user)
+        self.assertEqual(self.client.get(self.summary_url).status_code, 401)
+
+        self.user.is_active = True
+        self.save(self.user)
+        self.assertEqual(self.client.get(self.summary_url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertEqual(self.client.get(self.summary_url).status_code, 401)
+
+    def test_changed_flags_take_precedence(self):
+        """Test that a saved role change overrides the token's claims."""
+        access = AccessToken(self.obtain()["access"])
+
+        self.user.is_staff = True
+        self.save(self.user)
+        user = ClaimsJWTAuthentication().get_user(access)
+
+        self.assertTrue(user.is_staff)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.email, "user@example.com")
+
+    def test_refresh_reissues_current_flags(self):
+        """Test that a refreshed access token has the user's current flags."""
+        refresh = self.obtain()["refresh"]
+        User.objects.filter(pk=self.user.pk).update(is_verified=False)
+
+        response = self.client.post(reverse("user:token_refresh"), {"refresh": refresh})
+
+        self.assertEqual(AccessToken(response.data["access"])["is_verified"], False)
+
+    def test_cache_outage_loads_user(self):
+        """Test that authentication falls back to the row without the cache."""
+        self.authorize(self.obtain()["access"])
+        self.client.get(self.summary_url)
+
+        with patch("user.authentication.cache.get", side_effect=ConnectionError):
+            with self.assertNumQueries(2):
+                response = self.client.get(self.summary_url)
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,165 @@
+import time
+from datetime import timedelta
+from smtplib import SMTPDataError
+from unittest.mock import patch
+
+from django.core.mail.backends.smtp import EmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from user.mail import queue_email, send_queued
+from user.models import OutgoingEmail
+from user.smtp_sink import SMTPSink
+from user.tasks import send_queued_emails
+
+
+class QueuedMailTest(TestCase):
+    """Test suite for the queued mail sender.
+
+    This test suite covers:
+    - Signup enqueuing its verification email instead of sending it
+    - Batches sent over one SMTP connection
+    - Recording partial batches and retrying failed deliveries
+    - Skipping refused addresses and batches claimed by a lost worker
+    - The send rate limit
+    """
+
+    def setUp(self):
+        self.sink = SMTPSink()
+        port = self.sink.start()
+        self.addCleanup(self.sink.stop)
+        smtp = override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=port,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER="",
+            EMAIL_HOST_PASSWORD="",
+            EMAIL_RATE=0,
+        )
+        smtp.enable()
+        self.addCleanup(smtp.disable)
+
+    def queue(self, count):
+        for i in range(count):
+            queue_email(f"user{i}@example.com", "Hello", f"Message {i}")
+
+    @patch("user.tasks.send_queued_emails.delay")
+    def test_signup_enqueues_verification_email(self, mock_delay):
+        """Test that signing up queues the email and sends nothing inline."""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().post(
+                reverse("user:signup"),
+                {
+                    "email": "new@example.com",
+                    "password": "newpass123",
+                    "password2": "newpass123",
+                },
+            )
+
+        self.assertEqual(response.status_code, 201)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to, "new@example.com")
+        self.assertIn("?token=", email.body)
+        mock_delay.assert_called_once()
+        self.assertEqual(self.sink.messages, [])
+
+    @patch("user.tasks.send_queued_emails.delay")
+    def test_batch_uses_one_connection(self, mock_delay):
+        """Test that a batch goes out over a single SMTP connection."""
+        self.queue(5)
+
+        with override_settings(EMAIL_BATCH_SIZE=3):
+            self.assertEqual(send_queued_emails(), 3)
+            mock_delay.assert_called_once()
+            self.assertEqual(send_queued_emails(), 2)
+
+        self.assertEqual(self.sink.connections, 2)
+        self.assertEqual(len(self.sink.messages), 5)
+        self.assertEqual(self.sink.messages[0][1], ["<user0@example.com>"])
+        self.assertFalse(OutgoingEmail.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(send_queued(), 0)
+
+    @patch("user.tasks.send_queued_emails.delay")
+    def test_failed_delivery_is_retried(self, _):
+        """Test that a failure keeps what was sent and the rest is retried."""
+        self.queue(3)
+        self.sink.fail_attempts = {2, 3}
+
+        with self.assertRaises(SMTPDataError):
+            send_queued()
+        self.assertEqual(len(self.sink.messages), 1)
+        self.assertEqual(OutgoingEmail.objects.filter(sent_at__isnull=False).count(), 1)
+        failed = OutgoingEmail.objects.get(attempts=1)
+        self.assertIn("Try again later", failed.last_error)
+
+        with self.assertRaises(SMTPDataError):
+            send_queued()
+        self.assertEqual(send_queued(), 2)
+        self.assertEqual(len(self.sink.messages), 3)
+
+        with override_settings(EMAIL_MAX_ATTEMPTS=1):
+            queue_email("late@example.com", "Hello", "Body")
+            self.sink.fail_attempts = {6}
+            with self.assertRaises(SMTPDataError):
+                send_queued()
+            # Out of attempts, so the email is left unsent.
+            self.assertEqual(send_queued(), 0)
+
+    def test_refused_address_is_skipped(self):
+        """Test that a refused address is charged without ending the batch."""
+        self.queue(3)
+        self.sink.refused = {"user1@example.com"}
+
+        with self.assertLogs("user.mail", level="WARNING"):
+            self.assertEqual(send_queued(), 2)
+
+        self.assertEqual(len(self.sink.messages), 2)
+        refused = OutgoingEmail.objects.get(to="user1@example.com")
+        self.assertIsNone(refused.sent_at)
+        self.assertEqual(refused.attempts, 1)
+        self.assertIn("No such user", refused.last_error)
+
+    def test_failed_connection_hands_the_batch_back(self):
+        """Test that a connection that fails to open releases its batch."""
+        self.queue(2)
+
+        with patch.object(EmailBackend, "open", side_effect=ConnectionRefusedError):
+            with self.assertRaises(ConnectionRefusedError):
+                send_queued()
+
+        self.assertFalse(
+            OutgoingEmail.objects.filter(claimed_at__isnull=False).exists()
+        )
+        self.assertFalse(OutgoingEmail.objects.filter(attempts__gt=0).exists())
+        self.assertEqual(send_queued(), 2)
+
+    def test_sent_emails_survive_a_lost_worker(self):
+        """Test that a crash mid-batch keeps what was sent and holds the rest."""
+        self.queue(3)
+
+        with patch.object(
+            EmailBackend, "send_messages", side_effect=[1, RuntimeError("lost")]
+        ):
+            with self.assertRaises(RuntimeError):
+                send_queued()
+
+        self.assertEqual(OutgoingEmail.objects.filter(sent_at__isnull=False).count(), 1)
+        # Still claimed by the lost worker, until the claim expires.
+        self.assertEqual(send_queued(), 0)
+        OutgoingEmail.objects.update(claimed_at=timezone.now() - timedelta(seconds=601))
+        self.assertEqual(send_queued(), 2)
+        self.assertEqual(len(self.sink.messages), 2)
+
+    def test_rate_limit(self):
+        """Test that sends are spaced out to the configured rate."""
+        self.queue(6)
+
+        start = time.monotonic()
+        self.assertEqual(send_queued(rate=50), 6)
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 5 / 50)
+        self.assertEqual(len(self.sink.messages), 6)
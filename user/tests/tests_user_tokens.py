@@ -0,0 +1,137 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+from config.testing import LOCMEM_CACHE
+from user.tokens import (
+    ClaimsRefreshToken,
+    blacklist_jti,
+    flush_expired_tokens,
+    is_blacklisted,
+)
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TokenBlacklistTest(TestCase):
+    """Test suite for the cache-backed refresh token blacklist.
+
+    This test suite covers:
+    - Issuing and rotating tokens without token_blacklist rows
+    - Rejecting rotated tokens on refresh and verify
+    - Refreshing with a single user query
+    - Refusing refreshes and verifies while the blacklist is unavailable
+    - Batched flushing and copying of the legacy tables
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="user@example.com", password="userpass123", is_verified=True
+        )
+        self.refresh_url = reverse("user:token_refresh")
+
+    def obtain(self):
+        return self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": "user@example.com", "password": "userpass123"},
+        ).data
+
+    def refresh(self, token):
+        return self.client.post(self.refresh_url, {"refresh": token})
+
+    def test_rotated_token_is_rejected(self):
+        """Test that a refresh token works once and writes no rows."""
+        refresh = self.obtain()["refresh"]
+
+        response = self.refresh(refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh(response.data["refresh"]).status_code, 200)
+        self.assertEqual(self.refresh(refresh).status_code, 401)
+
+        verify = self.client.post(reverse("user:token_verify"), {"token": refresh})
+        self.assertEqual(verify.status_code, 400)
+        self.assertFalse(OutstandingToken.objects.exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+    def test_refresh_loads_the_user_once(self):
+        """Test that a refresh reads the user row once and nothing else."""
+        refresh = self.obtain()["refresh"]
+
+        with self.assertNumQueries(1):
+            response = self.refresh(refresh)
+        self.assertEqual(response.status_code, 200)
+
+        self.user.delete()
+        self.assertEqual(self.refresh(response.data["refresh"]).status_code, 401)
+
+    def test_blacklist_once_until_expiry(self):
+        """Test that blacklisting is once only and skips expired tokens."""
+        token = ClaimsRefreshToken.for_user(self.user)
+        token.blacklist()
+        self.assertTrue(is_blacklisted(token["jti"]))
+        with self.assertRaises(TokenError):
+            token.blacklist()
+
+        blacklist_jti("expired", int(timezone.now().timestamp()) - 1)
+        self.assertFalse(is_blacklisted("expired"))
+
+    def test_refresh_refused_without_blacklist(self):
+        """Test that refreshes fail closed while the cache is unreachable."""
+        refresh = self.obtain()["refresh"]
+
+        with patch("user.tokens.cache.has_key", side_effect=ConnectionError):
+            self.assertEqual(self.refresh(refresh).status_code, 401)
+        self.assertEqual(self.refresh(refresh).status_code, 200)
+
+    def test_verify_refused_without_blacklist(self):
+        """Test that verifies fail closed, not with a 500, without the cache."""
+        refresh = self.obtain()["refresh"]
+        verify_url = reverse("user:token_verify")
+
+        with patch("user.tokens.cache.has_key", side_effect=ConnectionError):
+            with self.assertLogs("user.tokens", level="ERROR"):
+                response = self.client.post(verify_url, {"token": refresh})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(
+            self.client.post(verify_url, {"token": refresh}).status_code, 200
+        )
+
+    def test_flush_and_copy_legacy_rows(self):
+        """Test that expired rows are flushed in batches and live ones copied."""
+        now = timezone.now()
+        for i, days in enumerate((-2, -1, -1, 1)):
+            token = OutstandingToken.objects.create(
+                jti=f"jti-{i}", token="", expires_at=now + timedelta(days=days)
+            )
+            BlacklistedToken.objects.create(token=token)
+
+        out = StringIO()
+        with self.assertNumQueries(10):
+            call_command(
+                "flush_expired_tokens", batch_size=2, copy_blacklist=True, stdout=out
+            )
+
+        self.assertIn("Copied 1 blacklisted tokens", out.getvalue())
+        self.assertIn("Deleted 3 expired tokens", out.getvalue())
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list("jti", flat=True)), ["jti-3"]
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+        self.assertTrue(is_blacklisted("jti-3"))
+        self.assertEqual(flush_expired_tokens(), 0)
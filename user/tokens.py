@@ -0,0 +1,192 @@
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+    TokenVerifySerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken, Token, UntypedToken
+
+logger = logging.getLogger(__name__)
+
+BLACKLIST_KEY = "jwt:blacklist:{jti}"
+
+# User flags carried in every token, so requests can be authorised from the
+# token alone (see `user.authentication.ClaimsJWTAuthentication`).
+AUTH_CLAIMS = ("is_staff", "is_superuser", "is_verified")
+
+
+def set_auth_claims(token, user):
+    for claim in AUTH_CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+def is_blacklisted(jti):
+    return cache.has_key(BLACKLIST_KEY.format(jti=jti))
+
+
+def read_blacklist(jti):
+    """
+    `is_blacklisted`, refusing the token if the cache cannot be read rather
+    than letting a rotated token be reused.
+    """
+    try:
+        return is_blacklisted(jti)
+    except Exception:
+        logger.exception("Failed to read the token blacklist")
+        raise TokenError(_("Token blacklist is unavailable"))
+
+
+def blacklist_jti(jti, exp):
+    """
+    Blacklist a token id until `exp`, after which the token is expired anyway.
+    Returns False if it already was.
+    """
+    timeout = exp - int(time.time())
+    if timeout <= 0:
+        return True
+    return cache.add(BLACKLIST_KEY.format(jti=jti), 1, timeout=timeout)
+
+
+def flush_expired_tokens(batch_size=None):
+    """
+    Delete expired rows from the `token_blacklist` tables a batch at a time,
+    so no single statement holds locks on a large table for long. Returns the
+    number of outstanding tokens deleted.
+    """
+    batch_size = batch_size or settings.TOKEN_FLUSH_BATCH_SIZE
+    expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+    deleted = 0
+    while ids := list(expired.order_by().values_list("id", flat=True)[:batch_size]):
+        OutstandingToken.objects.filter(id__in=ids).only("id").delete()
+        deleted += len(ids)
+    return deleted
+
+
+def copy_blacklist_to_cache():
+    """Blacklist, in the cache, the unexpired tokens blacklisted in the table."""
+    rows = BlacklistedToken.objects.filter(
+        token__expires_at__gt=timezone.now()
+    ).values_list("token__jti", "token__expires_at")
+    copied = 0
+    for jti, expires_at in rows.iterator():
+        blacklist_jti(jti, int(expires_at.timestamp()))
+        copied += 1
+    return copied
+
+
+class CacheBlacklistMixin:
+    """
+    Keeps blacklisted refresh tokens in the cache, each until it expires,
+    instead of the `token_blacklist` tables: issuing and rotating a token
+    writes no rows, and checking one is a single key lookup.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        # Skip `BlacklistMixin`, which records every issued token.
+        return Token.for_user.__func__(cls, user)
+
+    def check_blacklist(self):
+        if read_blacklist(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        # Atomic, so of two concurrent refreshes with one token only one wins.
+        if not blacklist_jti(self.payload[api_settings.JTI_CLAIM], self.payload["exp"]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def outstand(self):
+        return None
+
+
+class ClaimsRefreshToken(CacheBlacklistMixin, RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_auth_claims(token, user)
+        return token
+
+    @property
+    def access_token(self):
+        # The refresh token's claims may be a day old; use the current flags.
+        user = (
+            get_user_model()
+            .objects.filter(
+                **{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}
+            )
+            .first()
+        )
+        return self.access_token_for(user)
+
+    def access_token_for(self, user):
+        """An access token carrying the flags of `user`, as already loaded."""
+        access = super().access_token
+        if user is not None:
+            set_auth_claims(access, user)
+        return access
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        # `TokenRefreshSerializer.validate`, issuing the access token from the
+        # user it checks rather than loading that user a second time.
+        refresh = self.token_class(attrs["refresh"])
+
+        user = (
+            get_user_model()
+            .objects.filter(
+                **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}
+            )
+            .first()
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+
+        data = {"access": str(refresh.access_token_for(user))}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data["refresh"] = str(refresh)
+
+        return data
+
+
+class ClaimsTokenVerifySerializer(TokenVerifySerializer):
+    def validate(self, attrs):
+        token = UntypedToken(attrs["token"])
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti and read_blacklist(jti):
+            raise ValidationError("Token is blacklisted")
+        return {}
+
+
+class ClaimsTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = ClaimsRefreshToken
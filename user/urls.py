@@ -5,12 +5,19 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
-from user.views import ManageUserView, SignUp, VerifyEmail, ResendVerificationEmail
+from user.views import (
+    ManageUserView,
+    ResendVerificationEmail,
+    SignUp,
+    UserSummaryView,
+    VerifyEmail,
+)
 
 app_name = "user"
 
 urlpatterns = [
     path("me/", ManageUserView.as_view(), name="manage"),
+    path("me/summary/", UserSummaryView.as_view(), name="summary"),
     path("register/", SignUp.as_view(), name="signup"),
     path("email-verify/", VerifyEmail.as_view(), name="email-verify"),
     path(
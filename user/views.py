@@ -10,12 +10,14 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.conf import settings
 import time
 
+from borrowings.serializers import BorrowingStatsSerializer
+from borrowings.stats import get_user_stats
 from user.serializers import (
     UserSerializer,
     EmailVerificationSerializer,
     ResendVerificationSerializer,
 )
-from user.utils import Util
+from user.mail import queue_email
 from user.permissions import IsValidateOrDontHaveAccess
 
 
@@ -27,7 +29,18 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     permission_classes = (IsValidateOrDontHaveAccess, IsAuthenticated)
 
     def get_object(self):
-        return self.request.user
+        # request.user is built from the token's claims; load the whole row.
+        return User.objects.get(pk=self.request.user.pk)
+
+
+class UserSummaryView(generics.RetrieveAPIView):
+    """Active and overdue loans, total paid and pending fines of the user."""
+
+    serializer_class = BorrowingStatsSerializer
+    permission_classes = (IsValidateOrDontHaveAccess, IsAuthenticated)
+
+    def get_object(self):
+        return get_user_stats(self.request.user.id)
 
 
 def create_confirm_mail_with_token(user, request):
@@ -49,12 +62,7 @@ def create_confirm_mail_with_token(user, request):
     email_body = (
         f"Hi {user_email} Use the link below to verify your email \n" + absurl
     )
-    data = {
-        "email_body": email_body,
-        "to_email": user["email"],
-        "email_subject": "Verify your email",
-    }
-    Util.send_email(data=data)
+    queue_email(user["email"], "Verify your email", email_body)
 
 
 class SignUp(GenericAPIView):